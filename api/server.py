@@ -2,10 +2,11 @@
 
 from urllib.parse import urlencode, urlunparse
 
-from flask import Flask, render_template, request
+from flask import Flask, jsonify, render_template, request
 
 from error.stampifier_error import StampifierError
 from stampifier import Stampifier
+from utils.api_client import get_api_metrics
 
 app = Flask(__name__, static_folder='assets/')
 
@@ -62,3 +63,11 @@ def stampify_url():
     except StampifierError as err:
         return render_template('error_screen.html',
                                message=err.message)
+
+
+@app.route('/api_metrics', methods=['GET'])
+def api_metrics():
+    """Latency and error metrics of the Google Cloud APIs
+    for the process serving the request"""
+
+    return jsonify(get_api_metrics())
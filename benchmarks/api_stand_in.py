@@ -0,0 +1,326 @@
+"""
+This script runs a local stand-in for the Vision and Natural Language APIs
+
+In record mode every request which has no recording yet is forwarded
+to the real API and its successful response is stored. In replay mode
+the recorded responses are served without any network call, so the
+pipeline can be benchmarked and load tested without using API quota.
+Recordings are keyed by the path and the JSON body of the request (the
+api key is not part of the key and is never stored). The images of a
+Vision request are recorded one by one: the retriever groups them in
+batches whose size depends on the latency of the API, so a replay with
+injected latency asks for other groups than the ones recorded.
+
+Latency and errors (503, which the clients retry) can be injected to
+reproduce a slow or failing API.
+
+Command to run this script:
+
+$python3 -m benchmarks.api_stand_in record recordings/
+$python3 -m benchmarks.api_stand_in replay recordings/ --latency 0.5
+$python3 -m benchmarks.api_stand_in replay recordings/ --error-rate 0.1
+
+and point the pipeline at it with:
+
+STAMPIFY_VISION_API_ENDPOINT=http://127.0.0.1:8090/v1/images:annotate
+STAMPIFY_NATURAL_LANGUAGE_API_ENDPOINT=http://127.0.0.1:8090/v1beta2/documents:analyzeEntities
+"""  # noqa
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+RECORD_MODE = 'record'
+REPLAY_MODE = 'replay'
+
+# paths served by the stand-in and the real API they are recorded from
+UPSTREAM_HOSTS = {
+    '/v1/images:annotate': 'https://vision.googleapis.com',
+    '/v1beta2/documents:analyzeEntities': 'https://language.googleapis.com'
+}
+UPSTREAM_TIMEOUT = (3.05, 30)
+# paths whose 'requests' are recorded one by one
+SPLIT_REQUEST_PATHS = frozenset(('/v1/images:annotate',))
+
+
+def get_recording_key(path, body):
+    """Returns the key of the recording for a request, the JSON
+    body is canonicalized so that the order of its keys does not
+    matter"""
+
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode('utf-8')
+    except ValueError:
+        pass
+    return hashlib.sha256(path.encode('utf-8') + b'\0' + body).hexdigest()
+
+
+class ResponseRecordings:
+    """This class stores one JSON file per recorded response"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """Returns the recorded body for the key, None if there is none"""
+
+        try:
+            with open(self.__get_path(key), 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def put(self, key, body):
+        """Stores the body for the key"""
+
+        path = self.__get_path(key)
+        temporary_path = '{}.{}.tmp'.format(path, threading.get_ident())
+        with open(temporary_path, 'wb') as file:
+            file.write(body)
+        os.replace(temporary_path, path)
+
+    def __get_path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers the POST requests of the API clients"""
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Writes the recorded (or freshly recorded) response"""
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        path = urlsplit(self.path).path
+        stand_in = self.server.stand_in
+
+        stand_in.sleep()
+        if stand_in.should_fail():
+            self.__reply(503, b'{"error": {"message": "injected error"}}')
+            return
+
+        if path not in UPSTREAM_HOSTS:
+            self.__reply(404, b'{"error": {"message": "unknown api"}}')
+            return
+
+        status, response_body = stand_in.get_response(path, self.path, body)
+        self.__reply(status, response_body)
+
+    def __reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class ApiStandIn:
+    """Runs the stand-in server in a daemon thread
+
+    Usage:
+        with ApiStandIn('recordings/', latency=0.2) as stand_in:
+            os.environ[VISION_ENDPOINT_VARIABLE] \\
+                = stand_in.get_url('/v1/images:annotate')
+            ...
+    """
+
+    def __init__(self, recordings_dir, mode=REPLAY_MODE,
+                 latency=0, latency_jitter=0, error_rate=0,
+                 host='127.0.0.1', port=0, seed=None,
+                 upstream_hosts=None):
+        self.recordings = ResponseRecordings(recordings_dir)
+        self.upstream_hosts = upstream_hosts or UPSTREAM_HOSTS
+        self.mode = mode
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'replayed': 0, 'recorded': 0,
+                      'missing': 0, 'injected_errors': 0}
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """Starts serving in a daemon thread"""
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the server"""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def get_url(self, path):
+        """Returns the url of the path on the stand-in"""
+
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}{}'.format(host, port, path)
+
+    def sleep(self):
+        """Waits for the injected latency"""
+
+        with self._lock:
+            delay = self.latency + self._random.uniform(
+                -self.latency_jitter, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self):
+        """Returns True if an error is injected for this request"""
+
+        with self._lock:
+            if self._random.random() >= self.error_rate:
+                return False
+            self.stats['injected_errors'] += 1
+            return True
+
+    def get_response(self, path, path_with_query, body):
+        """Returns the status and body to reply with, recording the
+        response of the real API in record mode"""
+
+        if path in SPLIT_REQUEST_PATHS:
+            try:
+                request_body = json.loads(body)
+            except ValueError:
+                request_body = None
+            if isinstance(request_body, dict) \
+                    and isinstance(request_body.get('requests'), list):
+                return self.__get_split_response(
+                    path, path_with_query, request_body)
+
+        key = get_recording_key(path, body)
+        response_body = self.recordings.get(key)
+        if response_body is not None:
+            self.__count('replayed')
+            return 200, response_body
+
+        if self.mode != RECORD_MODE:
+            self.__count('missing')
+            return 404, b'{"error": {"message": "no recording"}}'
+
+        response = self.__post_upstream(path, path_with_query, body)
+        if response.status_code == 200:
+            self.recordings.put(key, response.content)
+            self.__count('recorded')
+        return response.status_code, response.content
+
+    def __get_split_response(self, path, path_with_query, request_body):
+        """Returns the status and body for a request whose 'requests'
+        are recorded one by one, only the missing ones are sent to
+        the real API in record mode"""
+
+        single_request_bodies = [
+            json.dumps(dict(request_body, requests=[single_request]))
+            for single_request in request_body['requests']]
+        keys = [get_recording_key(path, single_request_body.encode('utf-8'))
+                for single_request_body in single_request_bodies]
+        responses = [self.recordings.get(key) for key in keys]
+        missing_indices = [index for index, response in enumerate(responses)
+                           if response is None]
+
+        if not missing_indices:
+            self.__count('replayed')
+        elif self.mode != RECORD_MODE:
+            self.__count('missing')
+            return 404, b'{"error": {"message": "no recording"}}'
+        else:
+            response = self.__post_upstream(
+                path, path_with_query, json.dumps(dict(
+                    request_body,
+                    requests=[request_body['requests'][index]
+                              for index in missing_indices])))
+            if response.status_code != 200:
+                return response.status_code, response.content
+
+            for index, single_response in zip(
+                    missing_indices, response.json()['responses']):
+                responses[index] = json.dumps(single_response).encode('utf-8')
+                self.recordings.put(keys[index], responses[index])
+            self.__count('recorded')
+
+        return 200, b'{"responses": [' + b', '.join(responses) + b']}'
+
+    def __post_upstream(self, path, path_with_query, body):
+        # the query has the api key of the client
+        return requests.post(self.upstream_hosts[path] + path_with_query,
+                             data=body, timeout=UPSTREAM_TIMEOUT)
+
+    def __count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+
+def get_user_input():
+    """This method implements Command Line Interface"""
+
+    parser = argparse.ArgumentParser(
+        description='Record and replay the Google Cloud APIs')
+    parser.add_argument('mode', choices=(RECORD_MODE, REPLAY_MODE))
+    parser.add_argument('recordings_dir', type=str,
+                        help='Directory of the recorded responses.')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Seconds added to every response.')
+    parser.add_argument('--latency-jitter', type=float, default=0,
+                        help='Latency varies by up to this many seconds.')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Share of the requests answered with 503.')
+    parser.add_argument('--seed', type=int, default=None)
+
+    return parser.parse_args()
+
+
+def main():
+    """Serves until interrupted, then prints the counters"""
+
+    args = get_user_input()
+    stand_in = ApiStandIn(args.recordings_dir, args.mode,
+                          latency=args.latency,
+                          latency_jitter=args.latency_jitter,
+                          error_rate=args.error_rate,
+                          host=args.host, port=args.port, seed=args.seed)
+    stand_in.start()
+    for path in UPSTREAM_HOSTS:
+        print('Serving {}'.format(stand_in.get_url(path)))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stand_in.stop()
+        print(stand_in.stats)
+
+
+if __name__ == '__main__':
+    main()
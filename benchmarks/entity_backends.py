@@ -0,0 +1,101 @@
+"""
+This script compares the entity backends of TextEntityRetriever
+
+For every text file it reports the latency of each backend and how
+much the entities found by the backends agree (jaccard similarity of
+the lowercased entities, and the share of the remote entities which
+are also found locally).
+
+Command to run this script:
+
+$python3 -m benchmarks.entity_backends article_1.txt article_2.txt
+$python3 -m benchmarks.entity_backends article.txt --repeat 5
+
+The remote backend needs GOOGLE_CLOUD_API_KEY to be set.
+"""
+
+import argparse
+import statistics
+import time
+
+from summarization.text_entity_detection import (LOCAL_BACKEND,
+                                                 REMOTE_BACKEND,
+                                                 get_entity_retriever)
+
+BACKENDS = (REMOTE_BACKEND, LOCAL_BACKEND)
+
+
+def get_user_input():
+    """This method implements Command Line Interface"""
+
+    parser = argparse.ArgumentParser(
+        description='Compare the entity backends')
+    parser.add_argument('text_files', type=str, nargs='+',
+                        help='Files with the text of a webpage.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs for every backend.')
+
+    return parser.parse_args()
+
+
+def time_backend(backend, text, repeat):
+    """Returns the entities found by the backend
+    and the latency of each run in seconds"""
+
+    entity_retriever = get_entity_retriever(backend)
+    # the first call loads the model or opens the connection
+    entities = entity_retriever.get_entities_from_text(text)
+
+    latencies = list()
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        entity_retriever.get_entities_from_text(text)
+        latencies.append(time.perf_counter() - start_time)
+
+    return entities, latencies
+
+
+def get_agreement(remote_entities, local_entities):
+    """Returns the jaccard similarity and the recall of
+    the remote entities by the local entities"""
+
+    remote_entities = {entity.lower() for entity in remote_entities}
+    local_entities = {entity.lower() for entity in local_entities}
+
+    if not remote_entities and not local_entities:
+        return 1.0, 1.0
+
+    common_entities = remote_entities & local_entities
+    jaccard = len(common_entities) / len(remote_entities | local_entities)
+    recall = len(common_entities) / len(remote_entities) \
+        if remote_entities else 1.0
+
+    return jaccard, recall
+
+
+def main():
+    """Runs the benchmark and prints one line per file and backend"""
+
+    args = get_user_input()
+
+    for text_file in args.text_files:
+        with open(text_file) as file:
+            text = file.read()
+
+        entities_for_backend = dict()
+        for backend in BACKENDS:
+            entities, latencies = time_backend(backend, text, args.repeat)
+            entities_for_backend[backend] = entities
+            print('{}\t{}\tentities: {}\tmedian: {:.3f}s\tmax: {:.3f}s'
+                  .format(text_file, backend, len(entities),
+                          statistics.median(latencies), max(latencies)))
+
+        jaccard, recall = get_agreement(
+            entities_for_backend[REMOTE_BACKEND],
+            entities_for_backend[LOCAL_BACKEND])
+        print('{}\tagreement\tjaccard: {:.2f}\trecall: {:.2f}'
+              .format(text_file, jaccard, recall))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+This script measures the end to end latency of stampifying webpages
+
+The Vision and Natural Language APIs are served by the local stand-in
+of benchmarks.api_stand_in, from recordings made once with --record,
+so repeated runs use no API quota. Latency and errors can be injected
+to see how the pipeline behaves when the APIs are slow.
+
+The on-disk caches are kept in a temporary directory, apart from the
+caches of the service. Before every run the stamp cache, the caches of
+the API results, of the image downloads (colors and sizes) and of the
+sentence embeddings are cleared, unless --warm is given. The webpages
+themselves are fetched through the HTML cache of the extractor.
+
+Command to run this script:
+
+$python3 -m benchmarks.pipeline recordings/ https://example.com/a --record
+$python3 -m benchmarks.pipeline recordings/ https://example.com/a --repeat 5
+$python3 -m benchmarks.pipeline recordings/ https://example.com/a --latency 2
+
+Recording needs GOOGLE_CLOUD_API_KEY to be set, replaying
+needs it to be set to any value.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.api_stand_in import RECORD_MODE, REPLAY_MODE, ApiStandIn
+from extraction.image_size_prober import (IMAGE_SIZE_CACHE,
+                                          IMAGE_SIZE_ERROR_CACHE)
+from stampifier import STAMP_CACHE, Stampifier
+from summarization.image_color_detection import (IMAGE_COLOR_CACHE,
+                                                 IMAGE_COLOR_ERROR_CACHE)
+from summarization.model_registry import MODEL_REGISTRY
+from summarization.text_entity_detection import (
+    NATURAL_LANGUAGE_ENDPOINT_VARIABLE, PARAGRAPH_ENTITY_CACHE)
+from summarization.web_entity_detection import (DESCRIPTION_CACHE,
+                                                DESCRIPTION_ERROR_CACHE,
+                                                VISION_ENDPOINT_VARIABLE)
+from utils.api_client import get_api_metrics
+from utils.cache_utils import CACHE_DIR_VARIABLE
+
+# caches of the API results and of the image downloads
+API_CACHES = (PARAGRAPH_ENTITY_CACHE, DESCRIPTION_CACHE,
+              DESCRIPTION_ERROR_CACHE, IMAGE_COLOR_CACHE,
+              IMAGE_COLOR_ERROR_CACHE, IMAGE_SIZE_CACHE,
+              IMAGE_SIZE_ERROR_CACHE)
+
+
+def get_user_input():
+    """This method implements Command Line Interface"""
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the stampification of webpages')
+    parser.add_argument('recordings_dir', type=str,
+                        help='Directory of the recorded API responses.')
+    parser.add_argument('urls', type=str, nargs='+',
+                        help='Webpages to stampify.')
+    parser.add_argument('--record', action='store_true',
+                        help='Call the real APIs for missing recordings.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs for every webpage.')
+    parser.add_argument('--max-pages', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Seconds added to every API response.')
+    parser.add_argument('--latency-jitter', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Share of the API requests failing with 503.')
+    parser.add_argument('--warm', action='store_true',
+                        help='Keep the caches between runs.')
+
+    return parser.parse_args()
+
+
+def time_stampify(url, max_pages, warm):
+    """Returns the seconds taken to stampify the webpage"""
+
+    if not warm:
+        STAMP_CACHE.clear()
+        for cache in API_CACHES:
+            cache.clear()
+        # the model (and its cache) is loaded by the first run
+        if MODEL_REGISTRY.is_loaded(MODEL_REGISTRY.SENTENCE_EMBEDDING):
+            MODEL_REGISTRY.get_sentence_embedding_model() \
+                .embedding_cache.clear()
+
+    start_time = time.perf_counter()
+    Stampifier(url, max_pages, enable_animations=False).stampify()
+    return time.perf_counter() - start_time
+
+
+def main():
+    """Runs the benchmark and prints one line per webpage"""
+
+    args = get_user_input()
+    # the caches open their files on first use, so none
+    # of the caches of the service is cleared by the runs
+    cache_dir = tempfile.mkdtemp(prefix='stampify-benchmark-')
+    os.environ[CACHE_DIR_VARIABLE] = cache_dir
+
+    stand_in = ApiStandIn(
+        args.recordings_dir, RECORD_MODE if args.record else REPLAY_MODE,
+        latency=args.latency, latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate)
+
+    try:
+        with stand_in:
+            os.environ[VISION_ENDPOINT_VARIABLE] \
+                = stand_in.get_url('/v1/images:annotate')
+            os.environ[NATURAL_LANGUAGE_ENDPOINT_VARIABLE] \
+                = stand_in.get_url('/v1beta2/documents:analyzeEntities')
+
+            for url in args.urls:
+                # the first run fetches the webpage and loads the models
+                time_stampify(url, args.max_pages, args.warm)
+                latencies = [time_stampify(url, args.max_pages, args.warm)
+                             for _ in range(args.repeat)]
+                print('{}\tmedian: {:.3f}s\tmax: {:.3f}s'.format(
+                    url, statistics.median(latencies), max(latencies)))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print('stand-in: {}'.format(stand_in.stats))
+    for name, metrics in get_api_metrics().items():
+        print('{}: {}'.format(name, metrics))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+This script benchmarks the text media matching on random contents
+
+For every size n it builds n sentences and n images with random
+embeddings and content indices, then reports the time taken to form
+the preference matrices by TextMediaMatchingHelper and by the
+reference implementation (the per-cell loop and list sorts it
+replaced), and checks that both give the same preferences.
+
+It then compares the matching strategies of TextMediaMatcher on n
+sentences and (media ratio * n) images: the latency and the total
+score of the matched pairs with stable matching (after pruning) and
+with optimal assignment.
+
+Command to run this script:
+
+$python3 -m benchmarks.text_media_matching
+$python3 -m benchmarks.text_media_matching --sizes 10 100 400 --repeat 5
+$python3 -m benchmarks.text_media_matching --media-ratio 0.5
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from data_models.image import Image
+from summarization.sentence_with_attributes import SentenceWithAttributes
+from summarization.text_media_matching.text_media_matcher import \
+    TextMediaMatcher
+from summarization.text_media_matching.text_media_matching_helper import \
+    TextMediaMatchingHelper
+
+DISTANCE_METRIC_TYPES = ("absolute-difference", "signed-difference")
+
+
+def get_user_input():
+    """This method implements Command Line Interface"""
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the text media matching')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10, 50, 100, 200, 400],
+                        help='Numbers of sentences and of images.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs for every size.')
+    parser.add_argument('--dimension', type=int, default=768,
+                        help='Dimension of the embeddings.')
+    parser.add_argument('--media-ratio', type=float, default=1.5,
+                        help='Number of images per sentence when '
+                        'comparing the matching strategies.')
+    parser.add_argument('--seed', type=int, default=0)
+
+    return parser.parse_args()
+
+
+def get_random_contents(size, dimension, random_state, image_count=None):
+    """Returns size sentences and size (or image_count)
+    images spread over a page"""
+
+    if image_count is None:
+        image_count = size
+
+    sentences = list()
+    for index in range(size):
+        sentences.append(SentenceWithAttributes(
+            "sentence {}".format(index),
+            paragraph_index=int(random_state.randint(0, 4 * size)),
+            sentence_index_in_para=int(random_state.randint(0, 5)),
+            sentence_weight=float(random_state.rand()),
+            font_style=None,
+            embedding=random_state.randn(dimension).astype(np.float32)))
+
+    images = list()
+    for index in range(image_count):
+        image = Image("image {}".format(index), 0, 0, False)
+        image.content_index = int(random_state.randint(0, 4 * size))
+        image.img_description_embedding \
+            = random_state.randn(dimension).astype(np.float32)
+        image.img_attribute_embedding \
+            = random_state.randn(dimension).astype(np.float32)
+        images.append(image)
+
+    return sentences, images
+
+
+def form_reference_preference_matrix(helper):
+    """Forms the preferences of the helper cell by cell"""
+
+    helper._cosine_similarity_preprocessing()
+
+    for i in range(helper.set_size):
+        for j in range(helper.set_size):
+            signed_difference = (
+                helper.media_contents[j].content_index
+                - helper.text_contents[i].get_weighted_index())
+            if helper.distance_metric_type == "absolute-difference":
+                distance_score = 1.0 + abs(signed_difference)
+            else:
+                distance_score = signed_difference
+            with np.errstate(divide="ignore", invalid="ignore"):
+                helper.similarity_matrix[i][j] = (
+                    1.0 + helper.similarity_matrix[i][j]) / distance_score
+
+    for i in range(helper.set_size):
+        helper.media_preference_for_sentence[i].sort(
+            key=lambda x: helper.similarity_matrix[i][x], reverse=True)
+        helper.sentence_preference_for_media[i].sort(
+            key=lambda x: helper.similarity_matrix[x][i], reverse=True)
+
+
+def time_function(function, repeat):
+    """Returns the median seconds taken by function()"""
+
+    latencies = list()
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start_time)
+    return statistics.median(latencies)
+
+
+def get_total_score(sentences, images, matched_contents):
+    """Returns the sum of the scores of the matched pairs"""
+
+    helper = TextMediaMatchingHelper(
+        sentences, images,
+        matching_strategy=TextMediaMatchingHelper.OPTIMAL_ASSIGNMENT)
+    helper._cosine_similarity_preprocessing()
+    helper._form_score_matrix()
+
+    row_for_sentence = {id(sentence): row
+                        for row, sentence in enumerate(sentences)}
+    column_for_image = {id(image): column
+                        for column, image in enumerate(images)}
+    return float(sum(
+        helper.similarity_matrix[row_for_sentence[id(sentence)],
+                                 column_for_image[id(image)]]
+        for sentence, image in matched_contents))
+
+
+def benchmark_preference_matrices(args, random_state):
+    """Prints one line per size and metric"""
+
+    for size in args.sizes:
+        sentences, images = get_random_contents(
+            size, args.dimension, random_state)
+
+        for distance_metric_type in DISTANCE_METRIC_TYPES:
+            def get_helper():
+                return TextMediaMatchingHelper(
+                    sentences, images, distance_metric_type)
+
+            reference_helper = get_helper()
+            form_reference_preference_matrix(reference_helper)
+            helper = get_helper()
+            helper._form_preference_matrix()
+            is_identical = \
+                helper.media_preference_for_sentence \
+                == reference_helper.media_preference_for_sentence \
+                and helper.sentence_preference_for_media \
+                == reference_helper.sentence_preference_for_media
+
+            reference_time = time_function(
+                lambda: form_reference_preference_matrix(get_helper()),
+                args.repeat)
+            vectorized_time = time_function(
+                lambda: get_helper()._form_preference_matrix(), args.repeat)
+
+            print('n={}\t{}\treference: {:.4f}s\tvectorized: {:.4f}s'
+                  '\tidentical: {}'.format(
+                      size, distance_metric_type, reference_time,
+                      vectorized_time, is_identical))
+
+
+def benchmark_matching_strategies(args, random_state):
+    """Prints one line per size and matching strategy"""
+
+    for size in args.sizes:
+        image_count = max(1, int(round(size * args.media_ratio)))
+        sentences, images = get_random_contents(
+            size, args.dimension, random_state, image_count)
+
+        for matching_strategy in (TextMediaMatcher.STABLE_MATCHING,
+                                  TextMediaMatcher.OPTIMAL_ASSIGNMENT):
+            def match():
+                return TextMediaMatcher(
+                    sentences, images,
+                    matching_strategy=matching_strategy
+                )._get_matched_and_unmatched_contents()
+
+            matched_contents = match()["matched_contents"]
+            latency = time_function(match, args.repeat)
+
+            print('n={}	images={}	{}	latency: {:.4f}s	pairs: {}'
+                  '	total score: {:.4f}'.format(
+                      size, image_count, matching_strategy, latency,
+                      len(matched_contents),
+                      get_total_score(sentences, images, matched_contents)))
+
+
+def main():
+    """Runs the benchmarks"""
+
+    args = get_user_input()
+    random_state = np.random.RandomState(args.seed)
+
+    benchmark_preference_matrices(args, random_state)
+    benchmark_matching_strategies(args, random_state)
+
+
+if __name__ == '__main__':
+    main()
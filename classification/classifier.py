@@ -11,6 +11,7 @@ class Classifier:
     Detemines if a webpage is stampable based on the following
     max(media_count,text_count) + embedded_content_count >= min_pages
     '''
+    FAILURE_SOURCE = "Classifier"
 
     def __init__(
             self,
@@ -45,7 +46,7 @@ class Classifier:
         if not self.is_stampifiable:
             raise WebsiteNotStampifiableError(
                 message="Website cannot be stampified!",
-                failure_source="Classifier")
+                failure_source=self.FAILURE_SOURCE)
 
     def is_webpage_topic_plural(self):
         '''
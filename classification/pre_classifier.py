@@ -0,0 +1,85 @@
+''' module to define the first pass web-page stampifiable classifier'''
+
+from nltk.tokenize import sent_tokenize
+
+from classification.classifier import Classifier
+from data_models.contents import ContentType
+
+
+class ContentCounts:
+    '''Counts the extracted contents without any preprocessing
+
+    Exposes the same count getters as PreprocessedContents so
+    that the Classifier rule can be applied to raw Contents.
+    Every count is an upper bound of the corresponding count
+    after preprocessing:
+    * summary sentences are a subset of the sentences in the
+        normal text, so the sentence count of the normal text
+        is used in place of the summary sentence count
+    * title text, media, embedded and quoted contents are
+        split exactly as the preprocessor splits them
+    '''
+
+    def __init__(self, contents):
+        self.title_text_content_count = 0
+        self.normal_text_content_count = 0
+        self.media_content_count = 0
+        self.embedded_content_count = 0
+        self.quoted_content_count = 0
+
+        self._count_contents(contents.content_list)
+
+    def _count_contents(self, content_list):
+        for content in content_list:
+            if content.content_type == ContentType.TEXT:
+                if content.is_title_text():
+                    self.title_text_content_count += 1
+                else:
+                    self.normal_text_content_count \
+                        += len(sent_tokenize(content.text_string))
+
+            elif content.content_type == ContentType.IMAGE:
+                self.media_content_count += 1
+
+            elif content.content_type == ContentType.QUOTE:
+                self.quoted_content_count += 1
+
+            elif content.content_type.is_embedded_content():
+                self.embedded_content_count += 1
+
+    def get_title_text_content_count(self):
+        return self.title_text_content_count
+
+    def get_normal_text_content_count(self):
+        return self.normal_text_content_count
+
+    def get_media_content_count(self):
+        return self.media_content_count
+
+    def get_embedded_content_count(self):
+        return self.embedded_content_count
+
+    def get_quoted_content_count(self):
+        return self.quoted_content_count
+
+
+class PreClassifier(Classifier):
+    '''First pass of the stampifiable classification
+
+    Applies the Classifier rule on the counts of the raw
+    extracted Contents, before any summarization, Google API
+    call or embedding is done. Since the counts are upper
+    bounds, a page rejected here would also be rejected by
+    the Classifier after preprocessing.
+    '''
+    FAILURE_SOURCE = "PreClassifier"
+
+    def __init__(
+            self,
+            contents,
+            max_pages,
+            webpage_title):
+        super(PreClassifier, self).__init__(
+            ContentCounts(contents),
+            max_pages,
+            webpage_title)
@@ -23,6 +23,10 @@ class Image(_Content):
         self.img_width = img_width
         self.img_description_embedding = None
         self.img_attribute_embedding = None
+        # row of the embedding in the matrices of PreprocessedContents
+        self.embedding_index = None
         self.has_text_on_image = False
         self.image_colors = None
+        # why the image is not summarized, None if it is
+        self.filter_reason = None
         self.is_gif = is_gif
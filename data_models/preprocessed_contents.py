@@ -1,7 +1,23 @@
 ''' Class definition for Pre processed contents'''
+from utils.embedding_utils import get_normalized_embedding_matrix
 
 
 class PreprocessedContents:
+    ''' The contents of a webpage ready to be summarized
+
+    The embeddings of every kind (title text, normal text, media
+    descriptions, media attributes and quotes) are stored as the
+    rows of one contiguous float32 matrix of unit norm. Every content
+    holds its row in embedding_index (a media has the same row in
+    both of its matrices) and its embedding attributes are views of
+    that row, missing embeddings are rows of zeros and stay None.
+    '''
+    TITLE_TEXT_EMBEDDINGS = "title-text"
+    NORMAL_TEXT_EMBEDDINGS = "normal-text"
+    MEDIA_DESCRIPTION_EMBEDDINGS = "media-description"
+    MEDIA_ATTRIBUTE_EMBEDDINGS = "media-attribute"
+    QUOTE_EMBEDDINGS = "quote"
+
     def __init__(
             self,
             title_text,
@@ -16,6 +32,7 @@ class PreprocessedContents:
         self.quoted_content = quoted_content
 
         self._calculate_content_counts()
+        self._set_embedding_matrices()
 
     def _calculate_content_counts(self):
         # calculate all counts once so we
@@ -27,6 +44,59 @@ class PreprocessedContents:
         self.embedded_content_count = len(self.embedded_content)
         self.quoted_content_count = len(self.quoted_content)
 
+    def _set_embedding_matrices(self):
+        ''' stacks the embeddings of every kind in a matrix
+        and makes the contents point to their rows
+        '''
+        # (contents, name of the embedding attribute) of every kind
+        contents_for_kind = {
+            self.TITLE_TEXT_EMBEDDINGS: (self.title_text, "embedding"),
+            self.NORMAL_TEXT_EMBEDDINGS: (self.normal_text, "embedding"),
+            self.MEDIA_DESCRIPTION_EMBEDDINGS:
+                (self.media, "img_description_embedding"),
+            self.MEDIA_ATTRIBUTE_EMBEDDINGS:
+                (self.media, "img_attribute_embedding"),
+            self.QUOTE_EMBEDDINGS: (self.quoted_content, "embedding")
+        }
+
+        # the dimension is needed for kinds without any embedding
+        dimension = next((
+            len(getattr(content, attribute))
+            for contents, attribute in contents_for_kind.values()
+            for content in contents
+            if getattr(content, attribute) is not None), 0)
+
+        self.embedding_matrices = dict()
+        for kind, (contents, attribute) in contents_for_kind.items():
+            embeddings = [getattr(content, attribute)
+                          for content in contents]
+            matrix = get_normalized_embedding_matrix(embeddings, dimension)
+            self.embedding_matrices[kind] = matrix
+
+            for row, (content, embedding) in enumerate(
+                    zip(contents, embeddings)):
+                content.embedding_index = row
+                if embedding is not None:
+                    setattr(content, attribute, matrix[row])
+
+    def get_embedding_matrix(self, kind, contents=None):
+        ''' returns the matrix of the embeddings of the kind, or its
+        rows for the given contents. it is a view of the matrix
+        when the rows of the contents follow each other
+        '''
+        matrix = self.embedding_matrices[kind]
+        if contents is None:
+            return matrix
+
+        rows = [content.embedding_index for content in contents]
+        if not rows:
+            return matrix[:0]
+
+        first_row = rows[0]
+        if rows == list(range(first_row, first_row + len(rows))):
+            return matrix[first_row:first_row + len(rows)]
+        return matrix[rows]
+
     def get_title_text_content_count(self):
         return self.title_text_content_count
 
@@ -11,3 +11,5 @@ class Quote(_Content):
         self.q_content = q_content
         self.cite = cite
         self.embedding = None
+        # row of the embedding in the matrices of PreprocessedContents
+        self.embedding_index = None
@@ -8,6 +8,10 @@ class Text(_Content):
     TITLE_CONTENT_TYPES = [
         "h1", "h2", "h3", "h4", "h5", "h6", "title"
     ]
+    # this limit is based on how many characters
+    # we can display as title so it is readable
+    # and still does not block out other content
+    MAX_TITLE_LENGTH = 100
 
     def __init__(self, text_str, text_type='', is_bold=False):
         super(Text, self).__init__(ContentType.TEXT)
@@ -21,3 +25,9 @@ class Text(_Content):
 
         return self.type in self.TITLE_CONTENT_TYPES \
             or self.is_bold
+
+    def is_title_text(self):
+        """Checks if the text can be used as a stamp title"""
+
+        return self.is_important_text() \
+            and len(self.text_string) < self.MAX_TITLE_LENGTH
@@ -39,6 +39,21 @@ class WebsiteConnectionError(StampifierError):
         super().__init__('Cannot connect to URL!')
 
 
+class WebsiteTimeoutError(StampifierError):
+    """Raise when the website does not respond in time"""
+
+    def __init__(self):
+        super().__init__('Timed out while fetching URL!')
+
+
+class WebsiteTooLargeError(StampifierError):
+    """Raise when the website is larger than the allowed size"""
+
+    def __init__(self, max_bytes):
+        super().__init__('Website is larger than {} bytes!'
+                         .format(max_bytes))
+
+
 class BadRequestError(StampifierError):
     '''Exception raised when the API call was not completed successfully'''
 
@@ -49,6 +64,15 @@ class BadRequestError(StampifierError):
         )
 
 
+class ApiUnavailableError(StampifierError):
+    '''Exception raised when an API cannot be reached or keeps failing'''
+
+    def __init__(self, api_name, reason):
+        super(ApiUnavailableError, self).__init__(
+            "The {} API is unavailable: {}".format(api_name, reason)
+        )
+
+
 class IncorrectInputError(StampifierError):
     ''' Exception raised when the input format is wrong'''
     def __init__(self, message):
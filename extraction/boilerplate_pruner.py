@@ -0,0 +1,101 @@
+"""This script removes boilerplate (navigation, ads, comments etc.)
+    from the parsed DOM in a single traversal"""
+
+import re
+
+import bs4
+from bs4 import Comment
+
+TAG_REASON = 'tag'
+COMMENT_REASON = 'comment'
+AD_REASON = 'ad'
+KEYWORD_REASON = 'keyword'
+
+
+class BoilerplatePruner:
+    """This class decides for every node of the DOM whether it is
+    boilerplate and removes all boilerplate nodes in one traversal.
+
+    A node is removed along with its subtree when
+    * it is a comment
+    * its tag name is one of the decomposable tags
+    * one of its classes matches the pattern for ads
+    * one of its classes or its id contains one of the keywords
+    """
+
+    def __init__(self, decomposable_tags, keywords, pattern_for_ads):
+        self.decomposable_tags = frozenset(decomposable_tags)
+        self.pattern_for_ads = pattern_for_ads
+        # one compiled alternation replaces a regex per keyword
+        self.pattern_for_keywords = re.compile(
+            '|'.join(re.escape(keyword) for keyword in keywords))
+
+    def prune(self, soup):
+        """Removes the boilerplate from the soup and returns the
+        count of removed nodes for each reason"""
+
+        removal_counts = {TAG_REASON: 0, COMMENT_REASON: 0,
+                          AD_REASON: 0, KEYWORD_REASON: 0}
+        removable_nodes = list()
+
+        # nodes are only collected during the traversal, since
+        # the children of a removed node are never visited, none
+        # of the collected nodes is inside another collected node
+        stack = [soup]
+        while stack:
+            node = stack.pop()
+            for child in node.contents:
+                reason = self.get_removal_reason(child)
+                if reason:
+                    removal_counts[reason] += 1
+                    removable_nodes.append(child)
+                elif isinstance(child, bs4.element.Tag):
+                    stack.append(child)
+
+        for node in removable_nodes:
+            if isinstance(node, bs4.element.Tag):
+                node.decompose()
+            else:
+                node.extract()
+
+        return removal_counts
+
+    def get_removal_reason(self, node):
+        """Returns why the node should be removed,
+        None if it should be kept"""
+
+        if isinstance(node, Comment):
+            return COMMENT_REASON
+
+        if not isinstance(node, bs4.element.Tag):
+            return None
+
+        if node.name in self.decomposable_tags:
+            return TAG_REASON
+
+        classes = self.__get_classes(node)
+
+        if any(self.pattern_for_ads.search(_class) for _class in classes):
+            return AD_REASON
+
+        if any(self.pattern_for_keywords.search(_class)
+               for _class in classes):
+            return KEYWORD_REASON
+
+        node_id = node.get('id')
+        if isinstance(node_id, str) \
+                and self.pattern_for_keywords.search(node_id):
+            return KEYWORD_REASON
+
+        return None
+
+    @staticmethod
+    def __get_classes(node):
+        """Returns the classes of the node as a list"""
+
+        classes = node.get('class')
+        if not classes:
+            return []
+        if isinstance(classes, str):
+            return [classes]
+        return classes
@@ -0,0 +1,69 @@
+"""This script dispatches the nodes of the DOM to the content
+    extractors which can extract content from them"""
+
+import bs4
+
+
+class ContentExtractorDispatcher:
+    """This class maps tag names and class signatures to the content
+    extractors that can match them.
+
+    The candidates for a node keep the order of the given content
+    extractors, so the first extractor returning content for a node
+    is the same one as when every extractor is tried in order.
+    """
+
+    def __init__(self, content_extractors):
+        self.content_extractors = tuple(content_extractors)
+
+        extractors_for_tag = dict()
+        extractors_for_class = dict()
+        extractors_for_strings = list()
+
+        for precedence, content_extractor \
+                in enumerate(self.content_extractors):
+            for tag_name in content_extractor.TAG_NAMES:
+                extractors_for_tag.setdefault(tag_name, []) \
+                    .append(precedence)
+            for class_name in content_extractor.CLASS_NAMES:
+                extractors_for_class.setdefault(class_name, []) \
+                    .append(precedence)
+            if content_extractor.EXTRACTS_STRINGS:
+                extractors_for_strings.append(precedence)
+
+        self._extractors_for_tag = {
+            tag_name: tuple(precedences)
+            for tag_name, precedences in extractors_for_tag.items()}
+        self._extractors_for_class = {
+            class_name: tuple(precedences)
+            for class_name, precedences in extractors_for_class.items()}
+        self._extractors_for_strings = tuple(
+            self.content_extractors[precedence]
+            for precedence in extractors_for_strings)
+
+    def get_candidate_extractors(self, node):
+        """Returns the content extractors which can match the node
+        in their order of precedence"""
+
+        if isinstance(node, bs4.element.Tag):
+            precedences = self._extractors_for_tag.get(node.name, ())
+
+            classes = node.get('class') if self._extractors_for_class \
+                else None
+            if classes:
+                if isinstance(classes, str):
+                    classes = [classes]
+                for _class in classes:
+                    class_precedences \
+                        = self._extractors_for_class.get(_class)
+                    if class_precedences:
+                        precedences = tuple(sorted(
+                            set(precedences) | set(class_precedences)))
+
+            return [self.content_extractors[precedence]
+                    for precedence in precedences]
+
+        if isinstance(node, bs4.element.NavigableString):
+            return self._extractors_for_strings
+
+        return ()
@@ -13,6 +13,8 @@ from extraction.content_extractors.interface_content_extractor import \
 class EInstagramPostExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting
     embedded instagram post"""
+    TAG_NAMES = ('iframe',)
+    CLASS_NAMES = ('instagram-media', 'instagram-media-rendered')
 
     def validate_and_extract(self, node: bs4.element):
         """Validates if a tag is instagram post tag and
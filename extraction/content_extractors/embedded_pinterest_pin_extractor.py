@@ -11,6 +11,7 @@ from extraction.content_extractors.interface_content_extractor import \
 class EPinterestPinExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting
      embedded pinterest pins"""
+    TAG_NAMES = ('a',)
 
     def validate_and_extract(self, node: bs4.element):
         if isinstance(node, bs4.element.Tag) \
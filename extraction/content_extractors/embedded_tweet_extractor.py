@@ -10,6 +10,7 @@ from extraction.content_extractors.interface_content_extractor import \
 
 class ETweetExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting embedded tweets"""
+    CLASS_NAMES = ('twitter-tweet', 'twitter-tweet-rendered')
 
     def validate_and_extract(self, node: bs4.element):
         if isinstance(node, bs4.element.Tag) \
@@ -13,6 +13,7 @@ from extraction.content_extractors.interface_content_extractor import \
 class EYouTubeVideoExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting
     embedded youtube video"""
+    TAG_NAMES = ('iframe',)
 
     def validate_and_extract(self, node: bs4.element):
         if isinstance(node, bs4.element.Tag) \
@@ -12,6 +12,7 @@ from utils import url_utils
 
 class ImageExtractor(IContentExtractor):
     """This class inherits IContentExtractor to extract Images"""
+    TAG_NAMES = ('img', 'figure')
 
     def validate_and_extract(self, node: bs4.element):
         if isinstance(node, bs4.element.Tag):
@@ -45,7 +46,7 @@ class ImageExtractor(IContentExtractor):
         if node.has_attr('title'):
             image_title = node['title']
 
-        image_height, image_width = utils.get_media_size(node)
+        image_width, image_height = utils.get_media_size(node)
         is_image_gif = image_url.endswith('.gif')
 
         if caption_tag:
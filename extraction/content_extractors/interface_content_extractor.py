@@ -4,7 +4,20 @@ import bs4
 
 
 class IContentExtractor:
-    """Interface for content extractors"""
+    """Interface for content extractors
+
+    The class attributes describe the only nodes the extractor can
+    extract content from, they are used to dispatch nodes to the
+    extractors without calling every extractor on every node:
+    * TAG_NAMES : names of the tags the extractor can match
+    * CLASS_NAMES : classes of the tags the extractor can match
+        irrespective of the tag name
+    * EXTRACTS_STRINGS : True if the extractor can match
+        navigable strings
+    """
+    TAG_NAMES = ()
+    CLASS_NAMES = ()
+    EXTRACTS_STRINGS = False
 
     def validate_and_extract(self, node: bs4.element):
         """Extract content from BeautifulSoup tags."""
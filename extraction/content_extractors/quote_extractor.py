@@ -11,6 +11,7 @@ from extraction.utils import string_utils as utils
 
 class QuoteExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting quote"""
+    TAG_NAMES = ('q',)
 
     def validate_and_extract(self, node: bs4.element):
         if isinstance(node, bs4.element.Tag) \
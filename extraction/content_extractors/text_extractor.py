@@ -14,15 +14,26 @@ MAX_CHILD = 3
 
 class TextExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting text"""
+    TAG_NAMES = tuple(TEXT_TAGS)
+    EXTRACTS_STRINGS = True
+
+    def __init__(self):
+        # stripped text of the subtrees seen during an extraction
+        # keyed by the id of the root node of the subtree
+        self.__subtree_text = dict()
 
     def validate_and_extract(self, node: bs4.element):
         """Validates if a tag is text tag and
         returns the extracted data from the text tag in Text object"""
 
         if isinstance(node, bs4.element.Tag):
-            text_data = node.get_text().strip()
-            if (node.name in TEXT_TAGS) \
-                    and not utils.empty_text(text_data):
+            # check the tag name first so no text
+            # is built for tags which cannot match
+            if node.name not in TEXT_TAGS:
+                return None
+
+            text_data = self.__get_subtree_text(node)
+            if not utils.empty_text(text_data):
                 text_type = node.name
                 is_bold = (node.find('strong') or node.find('b')) \
                     and len(node.contents) <= MAX_CHILD
@@ -34,3 +45,24 @@ class TextExtractor(IContentExtractor):
             return text_content
 
         return None
+
+    def __get_subtree_text(self, node):
+        """Returns the stripped text of the subtree of the node
+
+        The text of each node is computed at most once. The DFS only
+        visits the children of a text tag when its text is empty, and
+        every node below a node with empty text has empty text too, so
+        it is looked up from the parent instead of being rebuilt."""
+
+        node_key = id(node)
+        if node_key in self.__subtree_text:
+            return self.__subtree_text[node_key]
+
+        if node.parent is not None \
+                and self.__subtree_text.get(id(node.parent)) == '':
+            text_data = ''
+        else:
+            text_data = node.get_text().strip()
+
+        self.__subtree_text[node_key] = text_data
+        return text_data
@@ -16,6 +16,7 @@ VIDEO_EXTENSIONS_PATTERN = re.compile(r'^.*\.(mp4|ogg|mov|webm)')
 
 class VideoExtractor(IContentExtractor):
     """This class inherits IContentExtractor for extracting video"""
+    TAG_NAMES = ('video', 'embed')
 
     def validate_and_extract(self, node: bs4.element):
         video_urls = list()
@@ -34,7 +35,7 @@ class VideoExtractor(IContentExtractor):
                 self.__append_video_url(video_urls, node['src'])
 
             if video_urls:
-                height, width = e_utils.get_media_size(node)
+                width, height = e_utils.get_media_size(node)
                 return Video(video_urls, height, width)
 
         return None
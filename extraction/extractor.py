@@ -1,33 +1,42 @@
 """This script is used to scrape data from URL, extract data from the DOM
     and store the extracted data."""
 
+import logging
 import re
 
-import requests
-from bs4 import BeautifulSoup, Comment
-from requests.exceptions import InvalidSchema, MissingSchema
+from bs4 import BeautifulSoup
 
 from data_models import contents, text
+from data_models.contents import ContentType
 from error.stampifier_error import (NoneTypeMarkupError,
-                                    WebsiteConnectionError,
                                     WebsiteNotStampifiableError)
+from extraction.boilerplate_pruner import BoilerplatePruner
+from extraction.content_dispatcher import ContentExtractorDispatcher
 from extraction.content_extractors import (embedded_instagram_post_extractor,
                                            embedded_pinterest_pin_extractor,
                                            embedded_tweet_extractor,
                                            embedded_youtube_video_extractor,
                                            image_extractor, quote_extractor,
                                            text_extractor, video_extractor)
-
-REQUEST_SESSION = requests.Session()
-CONTENT_EXTRACTORS \
-    = (video_extractor.VideoExtractor(),
-       text_extractor.TextExtractor(),
-       image_extractor.ImageExtractor(),
-       embedded_pinterest_pin_extractor.EPinterestPinExtractor(),
-       quote_extractor.QuoteExtractor(),
-       embedded_tweet_extractor.ETweetExtractor(),
-       embedded_youtube_video_extractor.EYouTubeVideoExtractor(),
-       embedded_instagram_post_extractor.EInstagramPostExtractor(),)
+from extraction.fetch_cache import FetchCache
+from extraction.fetcher import HtmlFetcher
+from extraction.image_size_prober import ImageSizeProber
+
+LOGGER = logging.getLogger(__name__)
+
+FETCHER = HtmlFetcher(fetch_cache=FetchCache())
+IMAGE_SIZE_PROBER = ImageSizeProber()
+# content extractors are instantiated for every extraction
+# since they may cache data about the nodes of the DOM
+CONTENT_EXTRACTOR_TYPES \
+    = (video_extractor.VideoExtractor,
+       text_extractor.TextExtractor,
+       image_extractor.ImageExtractor,
+       embedded_pinterest_pin_extractor.EPinterestPinExtractor,
+       quote_extractor.QuoteExtractor,
+       embedded_tweet_extractor.ETweetExtractor,
+       embedded_youtube_video_extractor.EYouTubeVideoExtractor,
+       embedded_instagram_post_extractor.EInstagramPostExtractor,)
 
 pattern_for_ads = re.compile('(^ad-|^ads-|ads|ad|Ad|Ads'
                              '|advertisement|Advertisement|'
@@ -56,6 +65,8 @@ KEYWORDS = ['header', 'Header', 'nav', 'Nav',
             "extra", "Extra", "more", "More", "newsletter",
             "Newsletter", "notice", "Notice", "options", "Options"]
 
+BOILERPLATE_PRUNER = BoilerplatePruner(extra_tags, KEYWORDS, pattern_for_ads)
+
 
 class Extractor:
     """This class takes the URL and extracts the data(DOM) from it using
@@ -65,28 +76,44 @@ class Extractor:
         self.url = url
         self.contents_list = contents.Contents()
         self.soup = None
+        # body, charset and timings of the fetched HTML
+        self.fetch_result = None
+        # count of nodes removed by clean_soup for each reason
+        self.pruning_stats = None
+        # count of nodes each content extractor was called
+        # on and did (hits) or did not (misses) match
+        self.extractor_stats = {
+            content_extractor_type.__name__: {'hits': 0, 'misses': 0}
+            for content_extractor_type in CONTENT_EXTRACTOR_TYPES}
+        self.content_dispatcher = None
+
+    def fetch_html(self):
+        """This function requests the HTML from the URL,
+        the page is only fetched once per extractor"""
+
+        if self.fetch_result is None:
+            self.fetch_result = FETCHER.fetch(self.url)
+
+        return self.fetch_result
 
     def extract_html(self):
         """This function parses data from HTML using Beautiful Soup"""
-        file = None
 
-        try:
-            # To request Html from URL
-            file = REQUEST_SESSION.get(self.url).text
-        except (ConnectionError, InvalidSchema, MissingSchema):
-            raise WebsiteConnectionError()
+        self.fetch_html()
 
-        # Remove the comment to read local files for testing purpose
-        # file = open('./test_html.html','r').read()
-
-        if not file:
+        if not self.fetch_result.body:
             raise NoneTypeMarkupError()
 
-        self.soup = BeautifulSoup(file, 'lxml')
+        # the raw bytes are parsed directly, the declared charset
+        # saves BeautifulSoup from sniffing the encoding
+        self.soup = BeautifulSoup(self.fetch_result.body, 'lxml',
+                                  from_encoding=self.fetch_result.charset)
         self.clean_soup()
 
         self.__extract_data_from_html()
 
+        self.__probe_missing_image_sizes()
+
         if not self.contents_list:
             raise WebsiteNotStampifiableError(
                 message="No content extracted!",
@@ -97,27 +124,18 @@ class Extractor:
     def clean_soup(self):
         """This function decomposes the unnecessary data"""
 
-        decomposable_tags = self.soup.find_all(extra_tags)
-        comments = self.soup. \
-            find_all(text=lambda text: isinstance(text, Comment))
-        ads = self.soup.find_all(class_=pattern_for_ads)
-
-        _ = [comment.extract() for comment in comments]
-        _ = [tag.decompose() for tag in decomposable_tags]
-        _ = [ad.decompose() for ad in ads]
-
-        for keyword in KEYWORDS:
-            _ = [_content.decompose() for _content in
-                 self.soup.find_all(
-                     class_=re.compile('.*{}.*'.format(keyword)))]
-            _ = [_content.decompose() for _content in
-                 self.soup.find_all(
-                     id=re.compile('.*{}.*'.format(keyword)))]
+        self.pruning_stats = BOILERPLATE_PRUNER.prune(self.soup)
+        LOGGER.debug('Pruned boilerplate from %s: %s',
+                     self.url, self.pruning_stats)
 
     def __extract_data_from_html(self):
         """Calls separate functions for extracting data
            from head and body of html"""
 
+        self.content_dispatcher = ContentExtractorDispatcher(
+            content_extractor_type()
+            for content_extractor_type in CONTENT_EXTRACTOR_TYPES)
+
         # Extract data from head
         head = self.soup.find('head')
         self.__extract_data_from_html_head(head)
@@ -136,28 +154,58 @@ class Extractor:
 
         self.contents_list.add_content(text.Text(text_string, 'title'))
 
-    def __extract_data_from_html_body(self, node):
-        """This function iterates over dom using dfs"""
+    def __extract_data_from_html_body(self, body):
+        """This function iterates over dom using dfs
 
-        _content = self.__validate_and_extract_content(node)
+        An explicit stack is used instead of recursion so that deeply
+        nested pages do not hit the recursion limit. Children are pushed
+        in reverse so they are visited in document order."""
 
-        # Add to the final list if a valid content is extracted
-        if _content:
-            self.contents_list.add_content(_content)
+        stack = [body]
+
+        while stack:
+            node = stack.pop()
+            _content = self.__validate_and_extract_content(node)
+
+            # Add to the final list if a valid content is extracted
+            if _content:
+                self.contents_list.add_content(_content)
+                continue
+
+            if node and node.name:
+                stack.extend(reversed(node.contents))
+
+        LOGGER.debug('Content extractor stats for %s: %s',
+                     self.url, self.extractor_stats)
+
+    def __probe_missing_image_sizes(self):
+        """Fills in the size of the images whose markup does not
+        give it (or gives it in percent) from their headers"""
+
+        images = [content for content in self.contents_list.content_list
+                  if content.content_type == ContentType.IMAGE
+                  and not (content.img_width and content.img_height)]
+        if not images:
             return
 
-        if node and node.name:
-            for child in node.contents:
-                self.__extract_data_from_html_body(child)
+        size_for_url = IMAGE_SIZE_PROBER.get_image_sizes(
+            [image.img_url for image in images])
+        for image in images:
+            width, height = size_for_url[image.img_url]
+            if width and height:
+                image.img_width, image.img_height = width, height
 
     def __validate_and_extract_content(self, node):
         """This function will extract valid content and return it"""
 
-        _ = self.soup
-
-        for content_extractor in CONTENT_EXTRACTORS:
+        for content_extractor \
+                in self.content_dispatcher.get_candidate_extractors(node):
             content = content_extractor.validate_and_extract(node)
+            extractor_stats \
+                = self.extractor_stats[type(content_extractor).__name__]
             if content:
+                extractor_stats['hits'] += 1
                 return content
+            extractor_stats['misses'] += 1
 
         return None
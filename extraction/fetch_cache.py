@@ -0,0 +1,284 @@
+"""This script stores fetched HTML on disk so that popular pages can be
+    revalidated with conditional requests instead of downloaded again"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from utils.cache_utils import get_cache_dir
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_NAME = 'html'
+BODY_EXTENSION = '.body'
+METADATA_EXTENSION = '.json'
+
+CACHE_CONTROL_PATTERN = re.compile(r'([\w-]+)\s*(?:=\s*"?([^",]*)"?)?')
+
+
+def parse_cache_control(cache_control):
+    """Returns the directives of a Cache-Control header as a dict,
+    directives without a value are mapped to None"""
+
+    if not cache_control:
+        return {}
+
+    return {name.lower(): value
+            for name, value in CACHE_CONTROL_PATTERN.findall(cache_control)}
+
+
+class CachedPage:
+    """This class stores a cached body along with its validators"""
+
+    def __init__(self, url, body, metadata):
+        self.url = url
+        self.body = body
+        self.charset = metadata.get('charset')
+        self.etag = metadata.get('etag')
+        self.last_modified = metadata.get('last_modified')
+        # seconds for which the page is fresh, None if not given
+        self.max_age = metadata.get('max_age')
+        self.stored_at = metadata.get('stored_at', 0)
+
+    def is_fresh(self, now=None):
+        """Returns True if the page can be used without revalidation"""
+
+        if self.max_age is None:
+            return False
+
+        now = time.time() if now is None else now
+        return now - self.stored_at < self.max_age
+
+    def get_validators(self):
+        """Returns the headers for a conditional request"""
+
+        headers = dict()
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class FetchCache:
+    """This class stores the body and the metadata of fetched pages in
+    files named by the hash of the URL.
+
+    * a page is only stored when it can be revalidated (ETag or
+        Last-Modified) or has a max-age, and never with no-store
+    * no-cache forces a revalidation on every use
+    * once the bodies are larger than max_size the least recently
+        used pages are evicted, reading a page marks it as used
+    """
+    MAX_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir=None, max_size=MAX_SIZE):
+        # resolved on first use so the cache
+        # directory can be configured after import
+        self._cache_dir = cache_dir
+        self.max_size = max_size
+        # key -> [body size, last used time]
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self):
+        """The directory holding the cached files"""
+
+        if self._cache_dir is None:
+            self._cache_dir = get_cache_dir(CACHE_NAME)
+        return self._cache_dir
+
+    def get(self, url):
+        """Returns the CachedPage of the url, None if it is not cached"""
+
+        key = self.__get_key(url)
+
+        with self._lock:
+            index = self.__get_index()
+
+            # the files are read even when the key is not indexed,
+            # since other processes share the cache directory
+            try:
+                with open(self.__get_path(key, METADATA_EXTENSION)) as file:
+                    metadata = json.load(file)
+                with open(self.__get_path(key, BODY_EXTENSION), 'rb') as file:
+                    body = file.read()
+            except OSError:
+                index.pop(key, None)
+                return None
+            except ValueError:
+                self.__remove(key)
+                return None
+
+            if metadata.get('url') != url:
+                return None
+
+            index[key] = [len(body), time.time()]
+            self.__touch(key)
+
+        return CachedPage(url, body, metadata)
+
+    def put(self, url, body, charset, headers):
+        """Stores the body fetched for the url if its response
+        headers allow it, returns True if it was stored"""
+
+        metadata = self.__get_metadata(headers)
+        if metadata is None:
+            return False
+
+        metadata['url'] = url
+        metadata['charset'] = charset
+        key = self.__get_key(url)
+
+        with self._lock:
+            index = self.__get_index()
+            try:
+                self.__write(key, BODY_EXTENSION, body)
+                self.__write(key, METADATA_EXTENSION,
+                             json.dumps(metadata).encode('utf-8'))
+            except OSError:
+                LOGGER.warning('Could not cache %s', url, exc_info=True)
+                self.__remove(key)
+                return False
+
+            index[key] = [len(body), time.time()]
+            self.__evict()
+
+        return True
+
+    def refresh(self, cached_page, headers):
+        """Updates the metadata of a page after a 304 response,
+        the page is removed if the response does not allow caching"""
+
+        # a 304 only has to carry the validators which changed
+        metadata = self.__get_metadata(headers, cached_page)
+        key = self.__get_key(cached_page.url)
+
+        with self._lock:
+            if metadata is None:
+                self.__remove(key)
+                return
+
+            metadata['url'] = cached_page.url
+            metadata['charset'] = cached_page.charset
+
+            try:
+                self.__write(key, METADATA_EXTENSION,
+                             json.dumps(metadata).encode('utf-8'))
+            except OSError:
+                self.__remove(key)
+
+    def get_size(self):
+        """Returns the size of the cached bodies in bytes"""
+
+        with self._lock:
+            return sum(size for size, _ in self.__get_index().values())
+
+    @staticmethod
+    def __get_metadata(headers, cached_page=None):
+        """Returns the metadata to store for the response headers,
+        None if the response must not be cached. Validators missing
+        from the headers are taken from the cached page if given"""
+
+        cache_control = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in cache_control:
+            return None
+
+        max_age = None
+        if 'no-cache' not in cache_control:
+            try:
+                max_age = int(cache_control.get('max-age'))
+            except (TypeError, ValueError):
+                max_age = None
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if cached_page:
+            etag = etag or cached_page.etag
+            last_modified = last_modified or cached_page.last_modified
+
+        if not (etag or last_modified or max_age):
+            return None
+
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'max_age': max_age,
+            'stored_at': time.time()
+        }
+
+    def __get_index(self):
+        """Returns the index, loading it from the cache directory once"""
+
+        if self._index is not None:
+            return self._index
+
+        self._index = dict()
+        for file_name in os.listdir(self.cache_dir):
+            key, extension = os.path.splitext(file_name)
+            if extension != BODY_EXTENSION:
+                continue
+            try:
+                size = os.path.getsize(self.__get_path(key, BODY_EXTENSION))
+                last_used = os.path.getmtime(
+                    self.__get_path(key, METADATA_EXTENSION))
+            except OSError:
+                continue
+            self._index[key] = [size, last_used]
+
+        return self._index
+
+    def __evict(self):
+        """Removes the least recently used pages until
+        the cache fits in its size budget"""
+
+        total_size = sum(size for size, _ in self._index.values())
+        if total_size <= self.max_size:
+            return
+
+        for key, (size, _) in sorted(self._index.items(),
+                                     key=lambda item: item[1][1]):
+            if total_size <= self.max_size:
+                break
+            self.__remove(key)
+            total_size -= size
+
+    def __remove(self, key):
+        if self._index is not None:
+            self._index.pop(key, None)
+        for extension in (BODY_EXTENSION, METADATA_EXTENSION):
+            try:
+                os.remove(self.__get_path(key, extension))
+            except OSError:
+                pass
+
+    def __touch(self, key):
+        """Marks the page as used for the other processes"""
+
+        try:
+            os.utime(self.__get_path(key, METADATA_EXTENSION))
+        except OSError:
+            pass
+
+    def __write(self, key, extension, data):
+        """Writes the file atomically so readers never
+        see a partially written file"""
+
+        path = self.__get_path(key, extension)
+        temp_path = '{}.{}.{}.tmp'.format(
+            path, os.getpid(), threading.get_ident())
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def __get_path(self, key, extension):
+        return os.path.join(self.cache_dir, key + extension)
+
+    @staticmethod
+    def __get_key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
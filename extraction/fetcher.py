@@ -0,0 +1,208 @@
+"""This script fetches the HTML of a website with timeouts and a cap
+    on the size of the body"""
+
+import hashlib
+import logging
+import re
+import time
+
+from requests.exceptions import RequestException, Timeout
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.exceptions import ReadTimeoutError
+
+from error.stampifier_error import (WebsiteConnectionError,
+                                    WebsiteTimeoutError,
+                                    WebsiteTooLargeError)
+from utils.http_session import HTTP_SESSIONS
+
+LOGGER = logging.getLogger(__name__)
+
+CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([^"\';\s]+)', re.I)
+
+
+class FetchResult:
+    """This class stores a fetched body and the metrics of the fetch"""
+
+    def __init__(self, url, status_code, body, charset,
+                 time_to_headers, fetch_time, cache_status=None):
+        self.url = url
+        self.status_code = status_code
+        # raw bytes of the body, decoding is left to the parser
+        self.body = body
+        # charset declared in the Content-Type header, if any
+        self.charset = charset
+        # seconds until the response headers were received
+        self.time_to_headers = time_to_headers
+        # seconds until the whole body was received
+        self.fetch_time = fetch_time
+        self.body_size = len(body)
+        # identifies the source, changes whenever the page changes
+        self.content_hash = hashlib.sha256(body).hexdigest()
+        # how the fetch cache served the body: hit (fresh, no
+        # request), revalidated (304), miss or None without a cache
+        self.cache_status = cache_status
+
+    def get_metrics(self):
+        """Returns the metrics of the fetch as a dict"""
+
+        return {
+            'status_code': self.status_code,
+            'time_to_headers': self.time_to_headers,
+            'fetch_time': self.fetch_time,
+            'body_size': self.body_size,
+            'cache_status': self.cache_status
+        }
+
+
+class HtmlFetcher:
+    """This class downloads the HTML of a URL.
+
+    * connect and read timeouts bound every socket operation and
+        max_fetch_time bounds the whole download, the body is read
+        one socket read at a time with a timeout no longer than the
+        time left so that a server dripping bytes cannot exceed it
+    * the body is streamed and the download stops as soon as it is
+        larger than max_body_size
+    * connections are pooled per thread and kept alive, gzip and
+        brotli encoded bodies are accepted
+    * with a fetch cache, fresh pages are served without a request
+        and stale pages are revalidated with a conditional request
+    """
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 10
+    MAX_FETCH_TIME = 20
+    MAX_BODY_SIZE = 10 * 1024 * 1024
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self,
+                 connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT,
+                 max_fetch_time=MAX_FETCH_TIME,
+                 max_body_size=MAX_BODY_SIZE,
+                 session_pool=HTTP_SESSIONS,
+                 fetch_cache=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_fetch_time = max_fetch_time
+        self.max_body_size = max_body_size
+        self.session_pool = session_pool
+        self.fetch_cache = fetch_cache
+
+    def fetch(self, url, headers=None):
+        """Returns the FetchResult for the url"""
+
+        start_time = time.perf_counter()
+
+        cached_page = self.fetch_cache.get(url) if self.fetch_cache else None
+        if cached_page and cached_page.is_fresh():
+            fetch_result = self.__get_cached_result(
+                cached_page, 'hit', start_time)
+            LOGGER.debug('Fetched %s: %s', url, fetch_result.get_metrics())
+            return fetch_result
+
+        if cached_page:
+            headers = dict(headers or {}, **cached_page.get_validators())
+
+        try:
+            response = self.session_pool.get_session().get(
+                url, headers=headers, timeout=self.timeout, stream=True)
+        except Timeout as error:
+            raise WebsiteTimeoutError() from error
+        except (RequestException, ValueError) as error:
+            raise WebsiteConnectionError() from error
+
+        with response:
+            time_to_headers = time.perf_counter() - start_time
+
+            if cached_page and response.status_code == 304:
+                self.fetch_cache.refresh(cached_page, response.headers)
+                fetch_result = self.__get_cached_result(
+                    cached_page, 'revalidated', start_time, time_to_headers)
+                LOGGER.debug('Fetched %s: %s',
+                             url, fetch_result.get_metrics())
+                return fetch_result
+
+            body = self._read_body(response, start_time)
+
+        charset = self.get_declared_charset(response.headers)
+        cache_status = None
+        if self.fetch_cache:
+            cache_status = 'miss'
+            if response.status_code == 200:
+                self.fetch_cache.put(url, body, charset, response.headers)
+
+        fetch_result = FetchResult(
+            response.url,
+            response.status_code,
+            body,
+            charset,
+            time_to_headers,
+            time.perf_counter() - start_time,
+            cache_status)
+
+        LOGGER.debug('Fetched %s: %s', url, fetch_result.get_metrics())
+
+        return fetch_result
+
+    @staticmethod
+    def __get_cached_result(cached_page, cache_status,
+                            start_time, time_to_headers=0):
+        return FetchResult(cached_page.url, 200, cached_page.body,
+                           cached_page.charset, time_to_headers,
+                           time.perf_counter() - start_time, cache_status)
+
+    def _read_body(self, response, start_time):
+        """Streams the (decompressed) body and enforces the size cap
+        and the total time allowed for the fetch"""
+
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() \
+                and int(content_length) > self.max_body_size:
+            raise WebsiteTooLargeError(self.max_body_size)
+
+        chunks = list()
+        body_size = 0
+
+        try:
+            while True:
+                remaining_time = self.max_fetch_time \
+                    - (time.perf_counter() - start_time)
+                if remaining_time <= 0:
+                    raise WebsiteTimeoutError()
+                self.__set_read_timeout(
+                    response, min(self.timeout[1], remaining_time))
+
+                # at most one read on the socket
+                chunk = response.raw.read1(
+                    self.CHUNK_SIZE, decode_content=True)
+                if not chunk:
+                    break
+                body_size += len(chunk)
+                if body_size > self.max_body_size:
+                    raise WebsiteTooLargeError(self.max_body_size)
+                chunks.append(chunk)
+        except ReadTimeoutError as error:
+            raise WebsiteTimeoutError() from error
+        except (Urllib3HTTPError, OSError) as error:
+            raise WebsiteConnectionError() from error
+
+        return b''.join(chunks)
+
+    @staticmethod
+    def __set_read_timeout(response, timeout):
+        """Sets the timeout of the next reads on the socket"""
+
+        sock = getattr(response.raw.connection, 'sock', None)
+        if sock is not None:
+            sock.settimeout(timeout)
+
+    @staticmethod
+    def get_declared_charset(headers):
+        """Returns the charset of the Content-Type header, None if
+        it is not declared so the parser can detect it from the
+        markup instead of guessing from the whole body"""
+
+        content_type = headers.get('Content-Type', '')
+        match = CHARSET_PATTERN.search(content_type)
+        if not match:
+            return None
+        return match.group(1).lower()
@@ -0,0 +1,220 @@
+"""This script finds the size of images whose markup does not give it
+    by downloading only the first few KB of the images
+
+The size is read from the header of the image file (PNG, GIF, JPEG
+and WebP are supported). The requests ask for a byte range and stop
+reading as soon as the size is found, even when the server ignores
+the range and sends the whole image."""
+
+import concurrent.futures as cf
+import logging
+import struct
+
+from requests.exceptions import RequestException
+
+from utils.http_session import HTTP_SESSIONS
+from utils.persistent_cache import PersistentCache
+from utils.url_utils import normalize_url
+
+LOGGER = logging.getLogger(__name__)
+
+# sizes of images by their normalized url
+IMAGE_SIZE_CACHE = PersistentCache(
+    'image-sizes', ttl=30 * 24 * 60 * 60, max_entries=100000)
+# images whose size could not be found, retried after an hour
+IMAGE_SIZE_ERROR_CACHE = PersistentCache(
+    'image-size-errors', ttl=60 * 60, max_entries=10000)
+
+UNKNOWN_SIZE = (0, 0)
+
+JPEG_SOF_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+     0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+# markers without a length
+JPEG_STANDALONE_MARKERS = frozenset(
+    (0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8))
+
+
+def get_png_size(header):
+    """Returns the size from the IHDR chunk"""
+
+    if header.startswith(b'\x89PNG\r\n\x1a\n') and len(header) >= 24 \
+            and header[12:16] == b'IHDR':
+        return struct.unpack('>II', header[16:24])
+    return None
+
+
+def get_gif_size(header):
+    """Returns the size of the logical screen"""
+
+    if header[:6] in (b'GIF87a', b'GIF89a') and len(header) >= 10:
+        return struct.unpack('<HH', header[6:10])
+    return None
+
+
+def get_jpeg_size(header):
+    """Returns the size from the first start of frame segment"""
+
+    if not header.startswith(b'\xff\xd8'):
+        return None
+
+    index = 2
+    while index + 4 <= len(header):
+        if header[index] != 0xFF:
+            return None
+        marker = header[index + 1]
+        if marker == 0xFF:
+            # fill byte
+            index += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            index += 2
+            continue
+
+        segment_length, = struct.unpack('>H', header[index + 2:index + 4])
+        if marker in JPEG_SOF_MARKERS:
+            if index + 9 > len(header):
+                return None
+            height, width = struct.unpack(
+                '>HH', header[index + 5:index + 9])
+            return width, height
+        index += 2 + segment_length
+
+    return None
+
+
+def get_webp_size(header):
+    """Returns the size from the lossy, lossless or extended header"""
+
+    if len(header) < 30 or header[:4] != b'RIFF' \
+            or header[8:12] != b'WEBP':
+        return None
+
+    chunk_type = header[12:16]
+    if chunk_type == b'VP8 ':
+        width, height = struct.unpack('<HH', header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk_type == b'VP8L':
+        bits, = struct.unpack('<I', header[21:25])
+        return 1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF)
+    if chunk_type == b'VP8X':
+        return 1 + int.from_bytes(header[24:27], 'little'), \
+            1 + int.from_bytes(header[27:30], 'little')
+    return None
+
+
+def get_image_size(header):
+    """Returns the (width, height) of the image from the first bytes
+    of its file, None if the format is not supported or the bytes
+    do not reach the size yet"""
+
+    for get_size in (get_png_size, get_gif_size,
+                     get_jpeg_size, get_webp_size):
+        size = get_size(header)
+        if size is not None:
+            return tuple(size)
+    return None
+
+
+class ImageSizeProber:
+    """This class finds the size of images from their headers.
+
+    * images are probed in parallel on an executor shared by
+        the process, with pooled keep-alive connections
+    * at most probe_size bytes of every image are read
+    * max_probe_time bounds the wait for all the probes, the images
+        which are not probed by then have an unknown size
+    * sizes are cached by normalized url, so an image is probed
+        once for all the pages it appears on
+    """
+    PROBE_SIZE = 32 * 1024
+    CHUNK_SIZE = 4 * 1024
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 3
+    MAX_PROBE_TIME = 5
+
+    EXECUTOR = cf.ThreadPoolExecutor(
+        max_workers=16, thread_name_prefix='image-size-prober')
+
+    def __init__(self,
+                 probe_size=PROBE_SIZE,
+                 max_probe_time=MAX_PROBE_TIME,
+                 session_pool=HTTP_SESSIONS,
+                 size_cache=IMAGE_SIZE_CACHE,
+                 size_error_cache=IMAGE_SIZE_ERROR_CACHE):
+        self.probe_size = probe_size
+        self.max_probe_time = max_probe_time
+        self.session_pool = session_pool
+        self.size_cache = size_cache
+        self.size_error_cache = size_error_cache
+
+    def get_image_sizes(self, image_urls):
+        """Returns a dict with the (width, height) of every image,
+        (0, 0) for an image whose size could not be found"""
+
+        key_for_url = {url: normalize_url(url) for url in image_urls}
+        cached_sizes = self.size_cache.get_many(key_for_url.values())
+        cached_sizes.update(self.size_error_cache.get_many(
+            key for key in key_for_url.values() if key not in cached_sizes))
+
+        size_for_url = dict()
+        future_for_url = dict()
+        for url, key in key_for_url.items():
+            if key in cached_sizes:
+                size_for_url[url] = tuple(cached_sizes[key])
+            else:
+                future_for_url[url] = self.EXECUTOR.submit(self._probe, url)
+
+        done_futures, _ = cf.wait(
+            future_for_url.values(), timeout=self.max_probe_time)
+
+        probed_sizes = dict()
+        probe_error_sizes = dict()
+        for url, future in future_for_url.items():
+            if future not in done_futures:
+                # not cached, the image may be probed in time next time
+                future.cancel()
+                LOGGER.debug('Probing the size of %s took too long', url)
+                size_for_url[url] = UNKNOWN_SIZE
+                continue
+
+            size = future.result()
+            size_for_url[url] = size
+            if size == UNKNOWN_SIZE:
+                probe_error_sizes[key_for_url[url]] = size
+            else:
+                probed_sizes[key_for_url[url]] = size
+
+        self.size_cache.put_many(probed_sizes)
+        self.size_error_cache.put_many(probe_error_sizes)
+
+        return size_for_url
+
+    def _probe(self, url):
+        """Returns the size of the image, (0, 0) if it is not found"""
+
+        if not url.startswith(('http://', 'https://')):
+            return UNKNOWN_SIZE
+
+        header = b''
+        try:
+            with self.session_pool.get_session().get(
+                    url,
+                    headers={'Range': 'bytes=0-{}'.format(
+                        self.probe_size - 1)},
+                    timeout=(self.CONNECT_TIMEOUT, self.READ_TIMEOUT),
+                    stream=True) as response:
+                if response.status_code not in (200, 206):
+                    return UNKNOWN_SIZE
+
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    header += chunk
+                    size = get_image_size(header)
+                    if size is not None:
+                        return size
+                    if len(header) >= self.probe_size:
+                        break
+        except RequestException as error:
+            LOGGER.debug('Could not probe the size of %s: %s', url, error)
+
+        return UNKNOWN_SIZE
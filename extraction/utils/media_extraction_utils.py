@@ -1,11 +1,18 @@
 """This script contains helper utilities for extractors"""
 
+import re
+
+# sizes in pixels, for eg. "100" or "100px"
+PIXEL_SIZE_PATTERN = re.compile(r'^\s*(\d+)(\.\d*)?\s*(px)?\s*$', re.I)
+
 
 def get_media_size(node):
-    """Returns the size of the media content"""
+    """Returns the (width, height) of the media content,
+    (0, 0) if they are not both given in pixels"""
 
-    if node.has_attr('width') and node.has_attr('height') \
-            and not (node['width'].endswith('%')
-                     or node['height'].endswith('%')):
-        return int(node['width']), int(node['height'])
+    if node.has_attr('width') and node.has_attr('height'):
+        width_match = PIXEL_SIZE_PATTERN.match(node['width'])
+        height_match = PIXEL_SIZE_PATTERN.match(node['height'])
+        if width_match and height_match:
+            return int(width_match.group(1)), int(height_match.group(1))
     return 0, 0
@@ -0,0 +1,15 @@
+"""Gunicorn configuration for the Stampify server"""
+
+from summarization.model_registry import MODEL_REGISTRY
+
+# loading the models in a freshly booted worker takes a while,
+# keep the arbiter from killing the worker while it warms up
+timeout = 120  # pylint: disable=invalid-name
+
+
+def post_worker_init(worker):
+    """Loads the ML models as soon as a worker boots
+    so that the first request does not pay for it"""
+
+    worker.log.info('Warming up models for worker %s', worker.pid)
+    MODEL_REGISTRY.warm_up()
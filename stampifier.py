@@ -3,6 +3,7 @@
 import logging
 
 from classification.classifier import Classifier
+from classification.pre_classifier import PreClassifier
 from data_models.stampifier_output import StampifierOutput
 from data_models.website import Website
 from error.stampifier_error import InvalidUrlError
@@ -11,9 +12,16 @@ from stamp_generation.stamp_generator import StampGenerator
 from summarization.extractor_output_preprocessor import \
     ExtractorOutputPreprocessor
 from summarization.summarizer import Summarizer
+from utils.lru_cache import LRUCache
 
 LOGGER = logging.getLogger(__name__)
 
+# stampified outputs of recently requested pages, keyed by
+# (url, max_pages, enable_animations, hash of the fetched page)
+STAMP_CACHE_SIZE = 128
+STAMP_CACHE_TTL = 10 * 60
+STAMP_CACHE = LRUCache(STAMP_CACHE_SIZE, ttl=STAMP_CACHE_TTL)
+
 
 class Stampifier:
     """Creates class for stampification"""
@@ -43,6 +51,18 @@ class Stampifier:
         """This method is the pipeline between all the modules"""
 
         _extractor = Extractor(self._website.url)
+
+        # the page is fetched before anything else so an unchanged
+        # page skips the pipeline when it was stampified recently
+        cache_key = (self._website.url, self.max_pages,
+                     self.enable_animations,
+                     _extractor.fetch_html().content_hash)
+        stampifier_output = STAMP_CACHE.get(cache_key)
+        if stampifier_output is not None:
+            LOGGER.debug('Stamp cache hit for %s: %s',
+                         self._website.url, STAMP_CACHE.get_stats())
+            return stampifier_output
+
         self._website.set_contents(_extractor.extract_html())
 
         LOGGER.debug(self._website.convert_to_dict())
@@ -56,8 +76,11 @@ class Stampifier:
 
         LOGGER.debug(generated_stamp)
 
-        return StampifierOutput(generated_stamp,
-                                self._website.get_title())
+        stampifier_output = StampifierOutput(generated_stamp,
+                                             self._website.get_title())
+        STAMP_CACHE.put(cache_key, stampifier_output)
+
+        return stampifier_output
 
     def _preprocess_contents(self):
         '''
@@ -71,6 +94,10 @@ class Stampifier:
 
     def get_stampified_content(self):
         ''' returns the list of stamp pages'''
+        # reject pages with too few contents before
+        # running any of the expensive stages
+        self._pre_classify()
+
         # pre-process the contents first
         self._preprocess_contents()
 
@@ -85,6 +112,14 @@ class Stampifier:
 
         return self.stampified_pages
 
+    def _pre_classify(self):
+        pre_classifier = PreClassifier(
+            self._website.contents,
+            max_pages=self.max_pages,
+            webpage_title=self._website.get_title()
+        )
+        pre_classifier.classify()
+
     def _classify(self):
         classifier = Classifier(
             self.preprocessed_contents,
@@ -0,0 +1,308 @@
+''' Cache for the sentence embeddings
+
+The same texts are embedded again and again across requests (the
+same article, shared captions, common image labels like "Person"),
+so embeddings are cached by (model name, normalized text) in two tiers:
+    * an in-memory LRU cache per process
+    * an on-disk ring of float32 vectors in memory mapped files,
+        shared by all the processes on the machine
+
+The script contains the following classes:
+    * DiskEmbeddingStore : memory mapped, fixed capacity vector store
+    * EmbeddingCache : the two tiers put together
+    * CachedSentenceEncoder : drop-in wrapper around a SentenceTransformer
+        which only sends the cache misses to the model
+'''
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from utils.cache_utils import get_cache_dir
+from utils.lru_cache import LRUCache
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_NAME = 'embeddings'
+DIGEST_SIZE = 16
+
+
+def normalize_text(text):
+    ''' Collapses the whitespace of the text, the tokenizer
+    ignores it so the embedding does not change
+    '''
+    return ' '.join(text.split())
+
+
+def get_text_digest(model_name, text):
+    ''' Returns the cache key of a normalized text'''
+    return hashlib.blake2b(
+        '{}\0{}'.format(model_name, text).encode('utf-8'),
+        digest_size=DIGEST_SIZE).digest()
+
+
+class DiskEmbeddingStore:
+    ''' Stores up to capacity vectors in memory mapped files
+
+    * <name>.keys : the digest of the text stored in every row
+    * <name>.vectors : the float32 vector stored in every row
+    * <name>.meta : count of vectors ever written, the next vector
+        is written to row (count % capacity), overwriting the oldest
+
+    Writes, and the creation of the files, are serialized across
+    processes with an exclusive lock on <name>.lock. A row is marked
+    empty while it is overwritten and the digest is checked again
+    after reading a vector, so readers never return a vector for
+    the wrong text.
+    '''
+
+    def __init__(self, cache_dir, name, dimension, capacity):
+        self.dimension = dimension
+        self.capacity = capacity
+
+        path = os.path.join(cache_dir, name)
+        self._lock_path = path + '.lock'
+        # the sizes are checked while holding the lock, so a process
+        # never recreates a file another process is creating or writing
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._keys = self.__open(path + '.keys', np.uint8,
+                                         (capacity, DIGEST_SIZE))
+                self._vectors = self.__open(path + '.vectors', np.float32,
+                                            (capacity, dimension))
+                self._meta = self.__open(path + '.meta', np.int64, (1,))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        # digest -> row, rows overwritten by other
+        # processes are picked up by _sync
+        self._rows = dict()
+        self._synced_count = 0
+        self._lock = threading.Lock()
+        self._sync()
+
+    def get(self, digest):
+        ''' Returns a copy of the vector stored for
+        the digest, None if it is not stored
+        '''
+        with self._lock:
+            row = self._rows.get(digest)
+            if row is None:
+                self._sync()
+                row = self._rows.get(digest)
+                if row is None:
+                    return None
+
+            if self._keys[row].tobytes() != digest:
+                del self._rows[digest]
+                return None
+            vector = np.array(self._vectors[row])
+            if self._keys[row].tobytes() != digest:
+                del self._rows[digest]
+                return None
+
+        return vector
+
+    def put_many(self, digests, vectors):
+        ''' Stores the vectors, overwriting the oldest rows'''
+        with self._lock, open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._sync()
+                count = int(self._meta[0])
+                for digest, vector in zip(digests, vectors):
+                    row = count % self.capacity
+                    self._keys[row] = 0
+                    self._vectors[row] = vector
+                    self._keys[row] = np.frombuffer(digest, dtype=np.uint8)
+                    self._rows[digest] = row
+                    count += 1
+                self._meta[0] = count
+                self._synced_count = count
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def clear(self):
+        ''' Removes every vector, for every process'''
+        with self._lock, open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._keys[:] = 0
+                self._meta[0] = 0
+                self._rows.clear()
+                self._synced_count = 0
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self):
+        ''' Indexes the rows written since the last sync'''
+        count = int(self._meta[0])
+        first_count = max(self._synced_count, count - self.capacity)
+        for written_count in range(first_count, count):
+            row = written_count % self.capacity
+            digest = self._keys[row].tobytes()
+            if any(digest):
+                self._rows[digest] = row
+        self._synced_count = count
+
+    @staticmethod
+    def __open(path, dtype, shape):
+        ''' Opens the memory mapped file, creating it when it
+        does not exist or does not match the shape. The lock
+        file must be locked by the caller
+        '''
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not os.path.exists(path) or os.path.getsize(path) != size:
+            with open(path, 'wb') as file:
+                file.truncate(size)
+        return np.memmap(path, dtype=dtype, mode='r+', shape=shape)
+
+
+class EmbeddingCache:
+    ''' Two tier cache of the embeddings of a model
+
+    The disk tier is opened on first use since its files depend
+    on the dimension of the model. If it cannot be opened (for
+    eg. on a read-only file system) only the memory tier is used.
+    '''
+    MEMORY_CAPACITY = 20000
+    DISK_CAPACITY = 50000
+
+    def __init__(self, model_name, dimension,
+                 memory_capacity=MEMORY_CAPACITY,
+                 disk_capacity=DISK_CAPACITY,
+                 cache_dir=None):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.disk_capacity = disk_capacity
+        self._cache_dir = cache_dir
+        self._memory_cache = LRUCache(memory_capacity)
+        self._disk_store = None
+        self._disk_store_failed = not disk_capacity
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        ''' Returns the vector for the digest, None on a miss'''
+        vector = self._memory_cache.get(digest)
+        if vector is not None:
+            return vector
+
+        disk_store = self._get_disk_store()
+        if disk_store is None:
+            return None
+
+        vector = disk_store.get(digest)
+        if vector is not None:
+            self._memory_cache.put(digest, vector)
+        return vector
+
+    def put_many(self, digests, vectors):
+        ''' Stores the vectors in both tiers'''
+        for digest, vector in zip(digests, vectors):
+            self._memory_cache.put(digest, vector)
+
+        disk_store = self._get_disk_store()
+        if disk_store is not None:
+            disk_store.put_many(digests, vectors)
+
+    def clear(self):
+        ''' Removes every vector from both tiers'''
+        self._memory_cache.clear()
+
+        disk_store = self._get_disk_store()
+        if disk_store is not None:
+            disk_store.clear()
+
+    def get_stats(self):
+        ''' Returns the counters of the memory tier'''
+        return self._memory_cache.get_stats()
+
+    def _get_disk_store(self):
+        if self._disk_store is not None or self._disk_store_failed:
+            return self._disk_store
+
+        with self._lock:
+            if self._disk_store is None and not self._disk_store_failed:
+                name = '{}-{}'.format(
+                    re.sub(r'[^\w.-]', '_', self.model_name),
+                    self.dimension)
+                try:
+                    self._disk_store = DiskEmbeddingStore(
+                        self._cache_dir or get_cache_dir(CACHE_NAME),
+                        name, self.dimension, self.disk_capacity)
+                except OSError:
+                    LOGGER.warning('Embedding disk cache is disabled',
+                                   exc_info=True)
+                    self._disk_store_failed = True
+
+        return self._disk_store
+
+
+class CachedSentenceEncoder:
+    ''' Wraps a SentenceTransformer so that encode only sends the
+    texts missing from the embedding cache to the model, in one batch
+
+    encode returns a float32 array of shape (count of texts, dimension)
+    or a single vector when a single text is given. Every other
+    attribute is taken from the wrapped model.
+    '''
+
+    def __init__(self, model, model_name, embedding_cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.embedding_cache = embedding_cache or EmbeddingCache(
+            model_name, model.get_sentence_embedding_dimension())
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def get_sentence_embedding_dimension(self):
+        ''' Returns the dimension of the embeddings'''
+        return self.embedding_cache.dimension
+
+    def encode(self, sentences, **kwargs):
+        ''' Returns the embeddings of the sentences, the
+        keyword arguments are passed on to the model
+        '''
+        if isinstance(sentences, str):
+            return self.encode([sentences], **kwargs)[0]
+
+        texts = [normalize_text(sentence) for sentence in sentences]
+        embeddings = np.empty(
+            (len(texts), self.get_sentence_embedding_dimension()),
+            dtype=np.float32)
+
+        # index of the first occurrence of every missing text
+        missing_indices = dict()
+        digests = [get_text_digest(self.model_name, text) for text in texts]
+        for index, digest in enumerate(digests):
+            if digest in missing_indices:
+                continue
+            vector = self.embedding_cache.get(digest)
+            if vector is None:
+                missing_indices[digest] = index
+            else:
+                embeddings[index] = vector
+
+        if missing_indices:
+            missing_digests = list(missing_indices)
+            missing_vectors = np.asarray(
+                self.model.encode(
+                    [texts[missing_indices[digest]]
+                     for digest in missing_digests],
+                    **kwargs),
+                dtype=np.float32)
+            self.embedding_cache.put_many(missing_digests, missing_vectors)
+
+            vector_for_digest = dict(zip(missing_digests, missing_vectors))
+            for index, digest in enumerate(digests):
+                if digest in vector_for_digest:
+                    embeddings[index] = vector_for_digest[digest]
+
+        return embeddings
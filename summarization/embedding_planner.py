@@ -0,0 +1,66 @@
+''' Plans the sentence embeddings of a request
+
+Every text which needs an embedding is registered under the name
+of its owner (summary sentences, titles, image descriptions ...)
+and all of them are encoded by a single call to the model.
+
+The script contains the following classes:
+    * EmbeddingPlanner : collects, encodes and hands back embeddings
+'''
+
+import numpy as np
+
+
+class EmbeddingPlanner:
+    ''' Collects the texts of a request and encodes them at once
+
+    * duplicate texts are encoded once
+    * empty texts are not encoded, their embedding is a zero vector
+        which has a cosine similarity of 0 with everything
+    * texts are sorted by length so that batches
+        of the model need less padding
+    '''
+
+    def __init__(self, sentence_embedding_model):
+        self.sentence_embedding_model = sentence_embedding_model
+        self._texts_for_owner = dict()
+        self._embeddings_for_owner = None
+
+    def add_texts(self, owner, texts):
+        ''' Registers the texts which need an embedding for the owner'''
+        self._texts_for_owner[owner] = list(texts)
+        self._embeddings_for_owner = None
+
+    def encode(self):
+        ''' Encodes every registered text with one call to the model'''
+        unique_texts = sorted(
+            set(text for texts in self._texts_for_owner.values()
+                for text in texts if text and not text.isspace()),
+            key=len, reverse=True)
+
+        dimension = self.sentence_embedding_model \
+            .get_sentence_embedding_dimension()
+        embedding_for_text = dict()
+        if unique_texts:
+            embeddings = np.asarray(
+                self.sentence_embedding_model.encode(unique_texts),
+                dtype=np.float32)
+            embedding_for_text = dict(zip(unique_texts, embeddings))
+
+        # scatter the embeddings back to their owners
+        self._embeddings_for_owner = dict()
+        for owner, texts in self._texts_for_owner.items():
+            owner_embeddings = np.zeros((len(texts), dimension),
+                                        dtype=np.float32)
+            for index, text in enumerate(texts):
+                if text in embedding_for_text:
+                    owner_embeddings[index] = embedding_for_text[text]
+            self._embeddings_for_owner[owner] = owner_embeddings
+
+    def get_embeddings(self, owner):
+        ''' Returns the embeddings of the texts of the owner
+        in the order they were added, encoding them if needed
+        '''
+        if self._embeddings_for_owner is None:
+            self.encode()
+        return self._embeddings_for_owner[owner]
@@ -3,17 +3,24 @@ output of the extractor to ready it
 for the later stages of the summarizer
 '''
 
+import logging
 import re
 
 from nltk.tokenize import sent_tokenize, word_tokenize
-from sentence_transformers import SentenceTransformer
 
 from data_models.contents import ContentType
 from data_models.preprocessed_contents import PreprocessedContents
+from error.stampifier_error import ApiUnavailableError
+from summarization.embedding_planner import EmbeddingPlanner
+from summarization.image_color_detection import ImageColorRetriever
+from summarization.image_filtering import ImageFilter
+from summarization.model_registry import MODEL_REGISTRY
 from summarization.sentence_with_attributes import SentenceWithAttributes
 from summarization.text_summarization import TextSummarizer
 from summarization.web_entity_detection import ImageDescriptionRetriever
 
+LOGGER = logging.getLogger(__name__)
+
 
 class ExtractorOutputPreprocessor:
     ''' Class to implement the utilities for
@@ -23,11 +30,15 @@ class ExtractorOutputPreprocessor:
     * Split contents into different types
     * Assign img_description_embeddings to media
     * Summarize the text content
+
+    All the texts of the webpage are embedded by a single
+    call to the sentence embedding model
     '''
-    # this limit is based on how many characters
-    # we can display as title so it is readable
-    # and still does not block out other content
-    MAX_TITLE_LENGTH = 100
+    SUMMARY_SENTENCES = "summary-sentences"
+    TITLE_TEXTS = "title-texts"
+    MEDIA_DESCRIPTIONS = "media-descriptions"
+    MEDIA_ATTRIBUTES = "media-attributes"
+    QUOTES = "quotes"
 
     def __init__(self, contents):
         self.content_list = contents.content_list
@@ -37,8 +48,9 @@ class ExtractorOutputPreprocessor:
         self.embedded_content_list = list()  # insta/tweets/quotes
         self.quoted_content_list = list()
         self.text_summarizer = TextSummarizer(priority="accuracy")
+        # the model is loaded once per process and shared
         self.sentence_embedding_model \
-            = SentenceTransformer('bert-base-nli-stsb-mean-tokens')
+            = MODEL_REGISTRY.get_sentence_embedding_model()
 
     def get_preprocessed_content(self):
         ''' Pre-processes the content
@@ -55,6 +67,12 @@ class ExtractorOutputPreprocessor:
         # summarize the webpage text
         self._summarize_text_content()
 
+        # descriptions are needed before anything is embedded
+        self._fetch_image_descriptions()
+
+        # embed all the texts at once
+        self._encode_texts()
+
         # assemble the sentence objects
         self._make_sentence_objects()
 
@@ -65,7 +83,7 @@ class ExtractorOutputPreprocessor:
         self._set_sentence_objects_list_for_title_sentences()
 
         # set quote content embeddings
-        self._fetch_and_set_quote_content_embeddings()
+        self._set_quote_content_embeddings()
 
         return PreprocessedContents(
             title_text=self.title_text_objects_list,
@@ -86,8 +104,7 @@ class ExtractorOutputPreprocessor:
         '''
         for content in self.content_list:
             if content.content_type == ContentType.TEXT:
-                if content.is_important_text() \
-                        and len(content.text_string) < self.MAX_TITLE_LENGTH:
+                if content.is_title_text():
                     self.title_text_content_list.append(content)
                 else:
                     self.normal_text_content_list.append(content)
@@ -101,6 +118,11 @@ class ExtractorOutputPreprocessor:
             elif content.content_type.is_embedded_content():
                 self.embedded_content_list.append(content)
 
+        # trackers, icons and duplicates are not
+        # described, embedded or matched
+        self.media_content_list \
+            = ImageFilter().filter_images(self.media_content_list)
+
     def _strip_numbering_from_title_text(self):
         for title_text in self.title_text_content_list:
             title_text.text_string \
@@ -120,10 +142,7 @@ class ExtractorOutputPreprocessor:
         # initialize an empty list
         self.title_text_objects_list = list()
 
-        # collect and retrieve all embeddings at once
-        embeddings = self.sentence_embedding_model.encode([
-            text.text_string for text in self.title_text_content_list
-        ])
+        embeddings = self.embedding_planner.get_embeddings(self.TITLE_TEXTS)
 
         # instantiate and append the sentence object
         for title_text, embedding in zip(
@@ -155,8 +174,13 @@ class ExtractorOutputPreprocessor:
             webpage_text += " "
 
         # sentence tokenize to get list of summary sentences
+        # entities are found per paragraph so that
+        # paragraphs seen before come from the cache
         self.summarized_text = sent_tokenize(
-            self.text_summarizer.summarize_text(webpage_text))
+            self.text_summarizer.summarize_text(
+                webpage_text,
+                paragraphs=[text.text_string
+                            for text in self.normal_text_content_list]))
 
         # store counts of each content type for future use
         self.count_of_summary_sentences = len(self.summarized_text)
@@ -261,9 +285,8 @@ class ExtractorOutputPreprocessor:
         tokenized_and_cleaned_summary_sentence \
             = self._get_tokenized_summary_sentence_from_index(0)
 
-        # encode all sentences together - reduces latency
-        self.summarized_text_embeddings = self.sentence_embedding_model.encode(
-            self.summarized_text)
+        self.summarized_text_embeddings \
+            = self.embedding_planner.get_embeddings(self.SUMMARY_SENTENCES)
 
         # to assign different indices for sentences in paragraph
         sentence_index_in_paragraph = 0
@@ -332,29 +355,55 @@ class ExtractorOutputPreprocessor:
             return ""
         return image.img_caption
 
-    def _fetch_media_embeddings(self):
-        image_describer = ImageDescriptionRetriever()
-        self.image_descriptions \
-            = image_describer.get_description_for_images(
-                [media.img_url for media in self.media_content_list]
-            )
-        # fetch all image descriptions+embeddings together - reduces latency
-        self.media_description_embeddings \
-            = self.sentence_embedding_model.encode([
-                self.get_condensed_image_description(image_description)
-                for image_description in self.image_descriptions
-            ])
+    def _fetch_image_descriptions(self):
+        image_urls = [media.img_url for media in self.media_content_list]
 
-        self.media_attribute_embeddings \
-            = self.sentence_embedding_model.encode([
-                self.get_condensed_image_attributes(image) for image in
-                self.media_content_list
-            ])
-
-    def _fetch_and_set_quote_content_embeddings(self):
-        quote_embeddings = self.sentence_embedding_model.encode(
-            [quote.q_content for quote in self.quoted_content_list]
-        )
+        # the colors are found locally while the api describes the images
+        image_color_futures \
+            = ImageColorRetriever().get_color_futures(image_urls)
+
+        image_describer = ImageDescriptionRetriever()
+        try:
+            self.image_descriptions \
+                = image_describer.get_description_for_images(image_urls)
+        except ApiUnavailableError as error:
+            # the stamp can still be made without the descriptions
+            LOGGER.warning(error.message)
+            self.image_descriptions = [
+                image_describer.get_empty_description()
+                for _ in self.media_content_list]
+
+        self.image_colors = [
+            future.result() for future in image_color_futures]
+
+    def _encode_texts(self):
+        ''' collects every text which needs an embedding
+        and encodes them together - reduces latency
+        '''
+        self.embedding_planner \
+            = EmbeddingPlanner(self.sentence_embedding_model)
+
+        self.embedding_planner.add_texts(
+            self.SUMMARY_SENTENCES, self.summarized_text)
+        self.embedding_planner.add_texts(
+            self.TITLE_TEXTS,
+            [text.text_string for text in self.title_text_content_list])
+        self.embedding_planner.add_texts(
+            self.MEDIA_DESCRIPTIONS,
+            [self.get_condensed_image_description(image_description)
+             for image_description in self.image_descriptions])
+        self.embedding_planner.add_texts(
+            self.MEDIA_ATTRIBUTES,
+            [self.get_condensed_image_attributes(image)
+             for image in self.media_content_list])
+        self.embedding_planner.add_texts(
+            self.QUOTES,
+            [quote.q_content for quote in self.quoted_content_list])
+
+        self.embedding_planner.encode()
+
+    def _set_quote_content_embeddings(self):
+        quote_embeddings = self.embedding_planner.get_embeddings(self.QUOTES)
 
         for quote, embedding in zip(
                 self.quoted_content_list, quote_embeddings):
@@ -364,16 +413,21 @@ class ExtractorOutputPreprocessor:
         ''' fills the img_description_embedding/attribute
         field in the media objects
         '''
-        self._fetch_media_embeddings()
+        self.media_description_embeddings \
+            = self.embedding_planner.get_embeddings(self.MEDIA_DESCRIPTIONS)
+        self.media_attribute_embeddings \
+            = self.embedding_planner.get_embeddings(self.MEDIA_ATTRIBUTES)
 
-        for media_content,\
-            media_description_embedding,\
-            media_attribute_embedding,\
-            image_description in zip(
+        for media_content, \
+            media_description_embedding, \
+            media_attribute_embedding, \
+            image_description, \
+            image_colors in zip(
                 self.media_content_list,
                 self.media_description_embeddings,
                 self.media_attribute_embeddings,
-                self.image_descriptions):
+                self.image_descriptions,
+                self.image_colors):
 
             media_content.img_description_embedding \
                 = media_description_embedding
@@ -384,5 +438,4 @@ class ExtractorOutputPreprocessor:
             media_content.has_text_on_image \
                 = image_description["has_caption"]
 
-            media_content.image_colors \
-                = image_description["image_colors"]
+            media_content.image_colors = image_colors
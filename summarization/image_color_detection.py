@@ -0,0 +1,206 @@
+'''Image Color Detection
+
+This module finds the dominant colors of images locally, instead of
+asking the Vision API for the IMAGE_PROPERTIES of every image. The
+image is downloaded, decoded to a small thumbnail and its pixels are
+clustered with k-means, the centers of the largest clusters are the
+dominant colors.
+
+The script contains the following classes:
+    *ImageColorRetriever : downloads the images and finds their colors
+'''
+
+import concurrent.futures as cf
+import io
+import logging
+import time
+
+import numpy as np
+from PIL import Image
+from requests.exceptions import RequestException
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+from utils.http_session import HTTP_SESSIONS
+from utils.persistent_cache import PersistentCache
+from utils.url_utils import normalize_url
+
+LOGGER = logging.getLogger(__name__)
+
+# colors of images, publisher CDNs reuse the same images across articles
+IMAGE_COLOR_CACHE = PersistentCache(
+    'image-colors', ttl=7 * 24 * 60 * 60, max_entries=50000)
+# images which could not be downloaded or decoded, retried after a while
+IMAGE_COLOR_ERROR_CACHE = PersistentCache(
+    'image-color-errors', ttl=5 * 60, max_entries=5000)
+
+# the colors of an image whose colors could not be found
+NO_IMAGE_COLORS = [(-1, -1, -1)]
+
+
+def get_dominant_colors(pixels, color_count, max_iterations=10):
+    '''
+    returns the centers of the color_count largest k-means clusters
+    of the pixels, largest first, as rgb tuples of ints
+    Params:
+      pixels : array of shape (count of pixels, 3)
+      color_count : number of clusters
+    '''
+    pixels = np.asarray(pixels, dtype=np.float32).reshape(-1, 3)
+    if not len(pixels):
+        return NO_IMAGE_COLORS
+
+    # start from pixels spread over the range of brightness,
+    # which keeps the result deterministic
+    pixels_by_brightness = pixels[np.argsort(pixels.sum(axis=1))]
+    centers = pixels_by_brightness[np.linspace(
+        0, len(pixels) - 1, color_count).astype(int)]
+
+    labels = None
+    for _ in range(max_iterations):
+        distances = ((pixels[:, np.newaxis, :]
+                      - centers[np.newaxis, :, :]) ** 2).sum(axis=2)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+
+        counts = np.bincount(labels, minlength=color_count)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, pixels)
+        # a cluster which lost all its pixels keeps its center
+        has_pixels = counts > 0
+        centers[has_pixels] = sums[has_pixels] \
+            / counts[has_pixels, np.newaxis]
+
+    counts = np.bincount(labels, minlength=color_count)
+    return [tuple(int(channel) for channel in np.rint(centers[index]))
+            for index in np.argsort(-counts, kind='stable')
+            if counts[index]]
+
+
+class ImageColorRetriever:
+    '''
+    A class to find the dominant colors of images
+    Params:
+      color_count : number of colors to find for every image
+    '''
+
+    COLOR_COUNT = 3
+    # pixels on the longer side of the thumbnail which is clustered
+    THUMBNAIL_SIZE = 64
+    MAX_IMAGE_SIZE = 10 * 1024 * 1024
+    TIMEOUT = (3.05, 5)
+    # bounds the whole download, a server dripping bytes
+    # cannot hold a worker for longer
+    MAX_DOWNLOAD_TIME = 10
+    CHUNK_SIZE = 64 * 1024
+
+    # shared by all the retrievers of the process
+    EXECUTOR = cf.ThreadPoolExecutor(
+        max_workers=8, thread_name_prefix='image-colors')
+
+    def __init__(self, color_count=COLOR_COUNT,
+                 color_cache=IMAGE_COLOR_CACHE,
+                 color_error_cache=IMAGE_COLOR_ERROR_CACHE):
+        self.color_count = color_count
+        self.color_cache = color_cache
+        self.color_error_cache = color_error_cache
+
+    def get_colors_for_images(self, image_urls: list) -> list:
+        '''
+        given a list of images returns the dominant
+        colors of every image
+        Return type:
+        list<list<tuple>> : rgb tuples of every image, [(-1, -1, -1)]
+            for an image whose colors could not be found
+        '''
+        return [future.result()
+                for future in self.get_color_futures(image_urls)]
+
+    def get_color_futures(self, image_urls: list) -> list:
+        '''
+        returns a future of the colors of every image, so that
+        the colors are found while the caller does other work
+        '''
+        key_for_url = {url: normalize_url(url) for url in image_urls}
+        cached_colors = self.color_cache.get_many(key_for_url.values())
+        cached_colors.update(self.color_error_cache.get_many(
+            key for key in key_for_url.values()
+            if key not in cached_colors))
+
+        future_for_url = dict()
+        for url, key in key_for_url.items():
+            if key in cached_colors:
+                future = cf.Future()
+                # json has no tuples
+                future.set_result(
+                    [tuple(color) for color in cached_colors[key]])
+            else:
+                future = self.EXECUTOR.submit(self._find_colors, url, key)
+            future_for_url[url] = future
+
+        return [future_for_url[url] for url in image_urls]
+
+    def _find_colors(self, url, key):
+        try:
+            image_colors = get_dominant_colors(
+                self._get_thumbnail_pixels(self._download_image(url)),
+                self.color_count)
+        except (RequestException, Urllib3HTTPError, OSError, ValueError,
+                Image.DecompressionBombError) as error:
+            LOGGER.debug('Could not find the colors of %s: %s', url, error)
+            self.color_error_cache.put(key, NO_IMAGE_COLORS)
+            return NO_IMAGE_COLORS
+
+        self.color_cache.put(key, image_colors)
+        return image_colors
+
+    def _download_image(self, url):
+        ''' returns the body of the image, raises ValueError if
+        it is larger than MAX_IMAGE_SIZE and TimeoutError if it
+        takes longer than MAX_DOWNLOAD_TIME
+        '''
+        if not url.startswith(('http://', 'https://')):
+            raise ValueError('not a http url')
+
+        start_time = time.perf_counter()
+        with HTTP_SESSIONS.get_session().get(
+                url, timeout=self.TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            body = bytearray()
+            while True:
+                remaining_time = self.MAX_DOWNLOAD_TIME \
+                    - (time.perf_counter() - start_time)
+                if remaining_time <= 0:
+                    raise TimeoutError('image download took too long')
+                self.__set_read_timeout(
+                    response, min(self.TIMEOUT[1], remaining_time))
+
+                # at most one read on the socket
+                chunk = response.raw.read1(
+                    self.CHUNK_SIZE, decode_content=True)
+                if not chunk:
+                    break
+                body.extend(chunk)
+                if len(body) > self.MAX_IMAGE_SIZE:
+                    raise ValueError('image is too large')
+        return bytes(body)
+
+    @staticmethod
+    def __set_read_timeout(response, timeout):
+        ''' sets the timeout of the next reads on the socket '''
+        sock = getattr(response.raw.connection, 'sock', None)
+        if sock is not None:
+            sock.settimeout(timeout)
+
+    def _get_thumbnail_pixels(self, image_body):
+        ''' decodes the image to a thumbnail and returns its
+        opaque pixels as an array of shape (count, 3)
+        '''
+        with Image.open(io.BytesIO(image_body)) as image:
+            # lets the jpeg decoder skip most of the pixels
+            image.draft('RGB', (self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE))
+            image.thumbnail((self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE))
+            pixels = np.asarray(image.convert('RGBA')).reshape(-1, 4)
+
+        return pixels[pixels[:, 3] >= 128, :3]
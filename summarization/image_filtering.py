@@ -0,0 +1,146 @@
+'''Image Filtering
+
+Pages carry many images which are not worth describing or matching:
+tracking pixels, icons and logos, tiny images and the same image
+repeated through different CDN variants (for eg. ?w=300 and ?w=1200).
+They are removed before the images are sent to the Vision API and to
+the embedding model. The reason an image is removed is recorded in its
+filter_reason so that the decisions are visible in the extracted
+contents.
+
+The script contains the following classes:
+    *ImageFilter : decides which images are kept
+'''
+
+import logging
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from utils.url_utils import normalize_url
+
+LOGGER = logging.getLogger(__name__)
+
+TRACKER_REASON = 'tracker'
+ICON_REASON = 'icon'
+TINY_IMAGE_REASON = 'tiny image'
+DUPLICATE_REASON = 'duplicate of {}'
+
+
+class ImageFilter:
+    '''
+    A class to remove the images which should not be summarized
+
+    * trackers : images of known tracking hosts or paths,
+        and images of at most MAX_TRACKER_SIZE pixels a side
+    * icons : favicons, sprites, icons and logos by their url
+    * tiny images : images with a side under MIN_IMAGE_SIZE pixels
+    * duplicates : images whose urls only differ by the size or
+        format asked from the CDN, the largest variant is kept
+
+    The size of an image is only used when it is known (not 0).
+    '''
+
+    MAX_TRACKER_SIZE = 2
+    MIN_IMAGE_SIZE = 64
+
+    TRACKER_HOSTS = (
+        'doubleclick.net',
+        'google-analytics.com',
+        'googletagmanager.com',
+        'googlesyndication.com',
+        'scorecardresearch.com',
+        'quantserve.com',
+        'chartbeat.net',
+        'pixel.wp.com',
+        'analytics.twitter.com',
+        'bat.bing.com'
+    )
+    # file names of tracking pixels, for eg. /pixel.gif or /tr
+    TRACKER_PATH_PATTERN = re.compile(
+        r'(^|/)(pixel|beacon|tr|1x1|spacer|blank|clear)(\.gif|\.png)?$',
+        re.IGNORECASE)
+    ICON_PATH_PATTERN = re.compile(
+        r'(^|[/_.-])(favicon|sprites?|icons?|logos?)([/_.-]|$)'
+        r'|\.(ico|svg)$', re.IGNORECASE)
+
+    # query parameters which only change the size or format of the image
+    VARIANT_QUERY_PARAMETERS = frozenset((
+        'w', 'h', 'width', 'height', 'resize', 'fit', 'crop', 'quality',
+        'q', 'auto', 'fm', 'format', 'dpr', 'ixlib', 's', 'size', 'strip',
+        'ssl', 'zoom'))
+    # size suffixes of file names, for eg. photo-300x200.jpg
+    VARIANT_PATH_PATTERN = re.compile(
+        r'[-_]\d+x\d+(?=\.\w+$)', re.IGNORECASE)
+
+    def filter_images(self, images):
+        '''
+        sets the filter_reason of every image and
+        returns the images which are kept, in order
+        '''
+        for image in images:
+            image.filter_reason = self._get_filter_reason(image)
+
+        self._filter_duplicates(
+            [image for image in images if image.filter_reason is None])
+
+        kept_images = [image for image in images
+                       if image.filter_reason is None]
+        LOGGER.debug('Kept %d of %d images', len(kept_images), len(images))
+        return kept_images
+
+    def _get_filter_reason(self, image):
+        parsed_url = urlsplit(image.img_url)
+        host = (parsed_url.hostname or '').lower()
+        width, height = image.img_width, image.img_height
+
+        if any(host == tracker_host or host.endswith('.' + tracker_host)
+               for tracker_host in self.TRACKER_HOSTS) \
+                or self.TRACKER_PATH_PATTERN.search(parsed_url.path) \
+                or (width and height and max(width, height)
+                    <= self.MAX_TRACKER_SIZE):
+            return TRACKER_REASON
+
+        if self.ICON_PATH_PATTERN.search(parsed_url.path):
+            return ICON_REASON
+
+        if width and height and min(width, height) < self.MIN_IMAGE_SIZE:
+            return TINY_IMAGE_REASON
+
+        return None
+
+    def _filter_duplicates(self, images):
+        ''' keeps the largest image of every variant key, the
+        first one when the sizes are equal or unknown
+        '''
+        variant_keys = [self.get_variant_key(image.img_url)
+                        for image in images]
+
+        kept_image_for_key = dict()
+        for image, key in zip(images, variant_keys):
+            kept_image = kept_image_for_key.get(key)
+            if kept_image is None \
+                    or self._get_area(image) > self._get_area(kept_image):
+                kept_image_for_key[key] = image
+
+        for image, key in zip(images, variant_keys):
+            kept_image = kept_image_for_key[key]
+            if image is not kept_image:
+                image.filter_reason = DUPLICATE_REASON.format(
+                    kept_image.img_url)
+
+    def get_variant_key(self, url):
+        ''' returns the url without the parts which only
+        change the size or format of the image
+        '''
+        parsed_url = urlsplit(normalize_url(url))
+        query = urlencode([
+            (name, value) for name, value in parse_qsl(
+                parsed_url.query, keep_blank_values=True)
+            if name.lower() not in self.VARIANT_QUERY_PARAMETERS])
+        path = self.VARIANT_PATH_PATTERN.sub('', parsed_url.path)
+        return urlunsplit((parsed_url.scheme, parsed_url.netloc,
+                           path, query, ''))
+
+    @staticmethod
+    def _get_area(image):
+        return (image.img_width or 0) * (image.img_height or 0)
@@ -0,0 +1,144 @@
+''' Process-wide registry for the machine learning models
+
+Loading the BERT summarizer, the coreference handler and the
+sentence embedding model takes seconds and hundreds of MB, so
+every model is loaded lazily exactly once per process and then
+shared by all requests (and threads) served by that process.
+
+The script contains the following classes:
+    * ModelRegistry : thread-safe, lazily populated model store
+
+MODEL_REGISTRY is the shared instance used by the pipeline. It can
+be warmed up ahead of the first request (for eg. when a gunicorn
+worker boots) by calling MODEL_REGISTRY.warm_up()
+'''
+
+import logging
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+SENTENCE_EMBEDDING_MODEL = 'bert-base-nli-stsb-mean-tokens'
+BERT_SUMMARIZER_MODEL = 'distilbert-base-uncased'
+SPACY_NER_MODEL = 'en_core_web_sm'
+COREFERENCE_GREEDYNESS = .4
+
+
+def _load_sentence_embedding_model():
+    # imports are deferred so that importing the registry
+    # does not pull torch into every process that uses it
+    # pylint: disable=import-outside-toplevel
+    from sentence_transformers import SentenceTransformer
+
+    from summarization.embedding_cache import CachedSentenceEncoder
+
+    # embeddings of texts seen before are served from the cache
+    return CachedSentenceEncoder(
+        SentenceTransformer(SENTENCE_EMBEDDING_MODEL),
+        SENTENCE_EMBEDDING_MODEL)
+
+
+def _load_bert_summarizer():
+    # pylint: disable=import-outside-toplevel
+    from summarizer import Summarizer
+    from summarizer.coreference_handler import CoreferenceHandler
+
+    handler = CoreferenceHandler(greedyness=COREFERENCE_GREEDYNESS)
+    return Summarizer(
+        model=BERT_SUMMARIZER_MODEL,
+        sentence_handler=handler)
+
+
+def _load_spacy_ner_model():
+    # pylint: disable=import-outside-toplevel
+    import spacy
+
+    # only the named entity recognizer is needed
+    return spacy.load(SPACY_NER_MODEL, disable=['parser', 'tagger'])
+
+
+class ModelRegistry:
+    ''' Stores one instance of every model per process
+
+    Models are identified by name and created by a loader
+    the first time they are requested. Loading is guarded by
+    a lock so concurrent requests never load a model twice.
+    '''
+    SENTENCE_EMBEDDING = "sentence-embedding"
+    BERT_SUMMARIZER = "bert-summarizer"
+    SPACY_NER = "spacy-ner"
+
+    def __init__(self):
+        self._models = dict()
+        self._loaders = {
+            self.SENTENCE_EMBEDDING: _load_sentence_embedding_model,
+            self.BERT_SUMMARIZER: _load_bert_summarizer,
+            self.SPACY_NER: _load_spacy_ner_model
+        }
+        # models only loaded when they are used, since
+        # not every configuration of the pipeline needs them
+        self._lazy_model_names = {self.SPACY_NER}
+        self._lock = threading.Lock()
+
+    def register_loader(self, model_name, loader, warm_up=True):
+        ''' Adds (or replaces) the loader used for a model name.
+        An already loaded model with that name is dropped. Models
+        registered with warm_up=False are skipped by warm_up.
+        '''
+        with self._lock:
+            self._loaders[model_name] = loader
+            self._models.pop(model_name, None)
+            if warm_up:
+                self._lazy_model_names.discard(model_name)
+            else:
+                self._lazy_model_names.add(model_name)
+
+    def get_model(self, model_name):
+        ''' Returns the model, loading it on first use'''
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # another thread may have loaded the
+            # model while we were waiting for the lock
+            model = self._models.get(model_name)
+            if model is None:
+                LOGGER.debug('Loading model: %s', model_name)
+                model = self._loaders[model_name]()
+                self._models[model_name] = model
+
+        return model
+
+    def is_loaded(self, model_name):
+        ''' Returns True if the model has already been loaded'''
+        return model_name in self._models
+
+    def get_sentence_embedding_model(self):
+        ''' Returns the SentenceTransformer used for
+        embeddings, wrapped by the embedding cache
+        '''
+        return self.get_model(self.SENTENCE_EMBEDDING)
+
+    def get_bert_summarizer(self):
+        ''' Returns the bert extractive summarizer
+        along with its coreference handler
+        '''
+        return self.get_model(self.BERT_SUMMARIZER)
+
+    def get_spacy_ner_model(self):
+        ''' Returns the spaCy pipeline used for
+        named entity recognition
+        '''
+        return self.get_model(self.SPACY_NER)
+
+    def warm_up(self):
+        ''' Loads every registered model (except the lazy
+        ones) so the first request does not pay for it
+        '''
+        for model_name in list(self._loaders):
+            if model_name not in self._lazy_model_names:
+                self.get_model(model_name)
+
+
+MODEL_REGISTRY = ModelRegistry()
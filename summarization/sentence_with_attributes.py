@@ -21,6 +21,8 @@ class SentenceWithAttributes:
         self.sentence_weight = sentence_weight
         self.font_style = font_style
         self.embedding = embedding
+        # row of the embedding in the matrices of PreprocessedContents
+        self.embedding_index = None
 
     def get_weighted_index(self):
         return self.paragraph_index \
@@ -5,6 +5,7 @@ of stamp pages that can be displayed to the user
 from summarization.stamp_page_picking.max_cover_preprocessor import \
     BudgetedMaxCoverPreprocessor
 from summarization.stamp_page_picking.scoring_utils import ScoringUtils
+from utils.embedding_utils import get_normalized_embedding_matrix
 
 
 class InterestingSequencePicker:
@@ -33,12 +34,14 @@ class InterestingSequencePicker:
             self,
             stamp_pages,
             summary_sentences,
-            max_pages_allowed):
+            max_pages_allowed,
+            summary_sentence_embeddings=None):
         self.stamp_pages = stamp_pages
-        self.summary_sentence_embeddings = [
-            sentence.embedding for sentence in
-            summary_sentences
-        ]
+        # normalized embedding matrix of the summary sentences
+        if summary_sentence_embeddings is None:
+            summary_sentence_embeddings = get_normalized_embedding_matrix(
+                [sentence.embedding for sentence in summary_sentences])
+        self.summary_sentence_embeddings = summary_sentence_embeddings
         self.max_pages_allowed = max_pages_allowed
 
         self.stamp_page_indices = list(range(len(self.stamp_pages)))
@@ -62,7 +65,7 @@ class InterestingSequencePicker:
         self._set_seed_stamp_page()
 
     def get_interesting_sequence_and_unused_pages(self):
-        for i in range(self.max_pages_allowed):
+        for _ in range(self.max_pages_allowed):
             # get the index of the next best stamp page
             stamp_page_index = self._get_next_best_stamp_page_index()
 
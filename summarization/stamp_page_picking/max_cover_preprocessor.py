@@ -2,16 +2,17 @@
 stamp page before applying the budgeted max
 cover solver
 '''
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-
 from summarization.cover import Cover
+from utils.embedding_utils import get_normalized_embedding_matrix
 
 
 class BudgetedMaxCoverPreprocessor:
     '''
     Class to define pre-processing
     utils for the budgeted max cover solver
+
+    summary_sentence_embeddings is the normalized embedding
+    matrix of the summary sentences
     '''
 
     def __init__(self, stamp_pages, summary_sentence_embeddings, threshold):
@@ -64,23 +65,17 @@ class BudgetedMaxCoverPreprocessor:
         from all stamp pages. the stamp descriptor embeddings
         depends on the type of the stamp page
         '''
-        self.stamp_page_descriptor_embeddings = [
-            stamp_page.stamp_descriptor_embedding for
-            stamp_page in self.stamp_pages
-        ]
+        self.stamp_page_descriptor_embeddings \
+            = get_normalized_embedding_matrix(
+                [stamp_page.stamp_descriptor_embedding for
+                 stamp_page in self.stamp_pages],
+                self.summary_sentence_embeddings.shape[1])
 
     def _get_cover_over_sentences_for_stamp_pages(self):
         ''' Instantiates and returns a
         cover object for every stamp pages
         '''
 
-        # define a function to set the cover for a
-        # cell as 1 if its above threshold and 0
-        # if its below
-        def set_val(cell_value):
-            return 1 if cell_value >= self.threshold else 0
-        set_cover = np.vectorize(pyfunc=set_val)
-
         if len(self.summary_sentence_embeddings) == 0:
             # if there is no text to find the cover over
             # we can just assume the cover for each stamp page
@@ -89,10 +84,10 @@ class BudgetedMaxCoverPreprocessor:
                 [1] for i in range(len(self.stamp_page_descriptor_embeddings))
             ]
 
-        self.list_of_covers = set_cover(
-            cosine_similarity(
-                self.stamp_page_descriptor_embeddings,
-                self.summary_sentence_embeddings
-            )
-        )
+        # the cover for a cell is 1 if its
+        # above threshold and 0 if its below
+        self.list_of_covers = (
+            self.stamp_page_descriptor_embeddings
+            @ self.summary_sentence_embeddings.T >= self.threshold
+        ).astype(int)
         return self.list_of_covers.tolist()
@@ -7,6 +7,7 @@ from summarization.stamp_page_picking.interesting_sequence_picker import \
     InterestingSequencePicker
 from summarization.stamp_page_picking.max_cover_preprocessor import \
     BudgetedMaxCoverPreprocessor
+from utils.embedding_utils import get_normalized_embedding_matrix
 
 
 class StampPagePicker:
@@ -14,20 +15,26 @@ class StampPagePicker:
     Class to define utils for picking stamp pages
     given a initial list of stamp pages and a
     constraint on the number of stamp pages
+
+    summary_sentence_embeddings is the normalized embedding matrix
+    of the summary sentences, it is made from them if not given
     '''
     def __init__(
             self,
             stamp_pages,
             summary_sentences,
             max_pages_allowed,
-            capping_method="budgeted-max-cover"):
+            capping_method="budgeted-max-cover",
+            summary_sentence_embeddings=None):
         self.stamp_pages = stamp_pages
         self.summary_sentences = summary_sentences
         self.max_pages_allowed = max_pages_allowed
         self.capping_method = capping_method
         self.threshold = 0.4  # arbitrary value - refine if necessary
-        self.summary_sentence_embeddings = [
-            sentence.embedding for sentence in self.summary_sentences]
+        if summary_sentence_embeddings is None:
+            summary_sentence_embeddings = get_normalized_embedding_matrix(
+                [sentence.embedding for sentence in self.summary_sentences])
+        self.summary_sentence_embeddings = summary_sentence_embeddings
 
     def get_capped_and_unused_stamp_pages(self):
         '''Returns the capped and uncapped stamp pages lists in a dict'''
@@ -74,6 +81,7 @@ class StampPagePicker:
             = InterestingSequencePicker(
                 self.stamp_pages,
                 self.summary_sentences,
-                self.max_pages_allowed)
+                self.max_pages_allowed,
+                self.summary_sentence_embeddings)
         return interesting_sequence_picker.\
             get_interesting_sequence_and_unused_pages()
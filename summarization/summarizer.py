@@ -7,6 +7,8 @@ from data_models.contents import ContentType
 from data_models.summarizer_output import StampPage, StampPages
 from summarization.sentence_with_attributes import SentenceWithAttributes
 from summarization.stamp_page_picking.stamp_page_picker import StampPagePicker
+from summarization.text_media_matching.similarity_store import \
+    SimilarityStore
 from summarization.text_media_matching.text_media_matcher import \
     TextMediaMatcher
 
@@ -25,19 +27,22 @@ class Summarizer:
             self,
             contents,
             max_pages_allowed,
-            title_topic_is_plural=False):
+            title_topic_is_plural=False,
+            matching_strategy=TextMediaMatcher.STABLE_MATCHING):
         self.contents = contents
         self.max_pages_allowed = max_pages_allowed
+        # how text and media are matched, see TextMediaMatcher
+        self.matching_strategy = matching_strategy
         # we don't directly instantiate StampPages
         # object since we need to use the list of
         # stamp pages to cap and pick stamp pages
         self.stamp_pages_list = list()
         self.stamp_pages = StampPages()
 
-        # collect summary sentence embeddings
-        self.summary_sentence_embeddings = [
-            text.embedding for text in self.contents.normal_text
-        ]
+        # normalized summary sentence embeddings, a
+        # view of the matrix of the preprocessed contents
+        self.summary_sentence_embeddings = self.contents.get_embedding_matrix(
+            self.contents.NORMAL_TEXT_EMBEDDINGS)
 
         # used to determine whether the webpages
         # is about one broad topic or multiple small topics
@@ -45,6 +50,10 @@ class Summarizer:
 
         self.capping_method = None
 
+        # shared by the title and text media matchings, it is
+        # made once the media which can be matched are known
+        self.similarity_store = None
+
     def _strip_title_and_make_stamp(self):
         ''' This method strips the first item
         which is the webpage title and makes a
@@ -60,6 +69,30 @@ class Summarizer:
         # be used for title media matching
         self.contents.title_text.pop(0)
 
+    def _set_similarity_store(self):
+        ''' computes the similarity of the title text and of
+        the normal text with the media which can be matched
+        '''
+        self.similarity_store = SimilarityStore(
+            self.contents.media,
+            self.contents.get_embedding_matrix(
+                self.contents.MEDIA_DESCRIPTION_EMBEDDINGS,
+                self.contents.media),
+            self.contents.get_embedding_matrix(
+                self.contents.MEDIA_ATTRIBUTE_EMBEDDINGS,
+                self.contents.media)
+        )
+        self.similarity_store.add_sentence_set(
+            self.contents.title_text,
+            self.contents.get_embedding_matrix(
+                self.contents.TITLE_TEXT_EMBEDDINGS,
+                self.contents.title_text)
+        )
+        self.similarity_store.add_sentence_set(
+            self.contents.normal_text,
+            self.summary_sentence_embeddings
+        )
+
     def _set_capping_method(self):
         ''' Chooses an appropriate capping method
         based on the number of stamp pages present
@@ -82,6 +115,7 @@ class Summarizer:
         # filter images with text as they shouldn't be
         # used for text-media matching
         self._create_stamps_and_filter_images_with_text()
+        self._set_similarity_store()
 
         if self.title_topic_is_plural:
             self._perform_title_first_matching()
@@ -109,10 +143,6 @@ class Summarizer:
             self.contents.quoted_content
         )
 
-        # now that the stamp pages have been assembled we
-        # can add titles to them
-        self._perform_title_media_matching()
-
         # set the content types for all the stamp pages
         # this cannot be done during stamp page creation
         # since we may add overlay_title/overlay_text
@@ -139,7 +169,8 @@ class Summarizer:
             self.stamp_pages_list,
             self.contents.normal_text,
             self.max_pages_allowed,
-            capping_method=self.capping_method
+            capping_method=self.capping_method,
+            summary_sentence_embeddings=self.summary_sentence_embeddings
         )
         processed_pages_dict \
             = stamp_page_picker.get_capped_and_unused_stamp_pages()
@@ -251,6 +282,8 @@ class Summarizer:
         text_media_matcher = TextMediaMatcher(
             self.contents.normal_text,
             self.contents.media,
+            matching_strategy=self.matching_strategy,
+            similarity_store=self.similarity_store
         )
         return text_media_matcher._get_matched_and_unmatched_contents()
 
@@ -261,7 +294,9 @@ class Summarizer:
         title_media_matcher = TextMediaMatcher(
             self.contents.title_text,
             self.contents.media,
-            self.SIGNED_DIFFERENCE
+            self.SIGNED_DIFFERENCE,
+            self.matching_strategy,
+            self.similarity_store
         )
         return title_media_matcher._get_matched_and_unmatched_contents()
 
@@ -1,15 +1,108 @@
 ''' This module is used to define the TextEntityRetriever
 for finding the named entities in the text.
 The classes defined here are :
-    * TextEntityRetriever
+    * TextEntityRetriever : finds entities with the Natural Language API
+    * LocalTextEntityRetriever : finds entities offline with spaCy
+    * FallbackTextEntityRetriever : uses a second retriever
+        when the first one fails
+    * ParagraphEntityRetriever : finds the entities of every paragraph,
+        caching them by the hash of the paragraph and the backend
+        which found them
+
+The retriever used by the pipeline is chosen by the environment
+variable STAMPIFY_ENTITY_BACKEND, see get_entity_retriever
 '''
 import base64
+import bisect
+import hashlib
 import json
+import logging
 import os
 
-import requests
+from error.stampifier_error import IncorrectInputError, StampifierError
+from summarization.model_registry import MODEL_REGISTRY
+from utils.api_client import ApiClient, get_api_url
+from utils.persistent_cache import PersistentCache
+
+LOGGER = logging.getLogger(__name__)
+
+NATURAL_LANGUAGE_API_CLIENT = ApiClient('natural-language')
+
+# overrides API_ENDPOINT of TextEntityRetriever
+NATURAL_LANGUAGE_ENDPOINT_VARIABLE = 'STAMPIFY_NATURAL_LANGUAGE_API_ENDPOINT'
+
+# entities of paragraphs, the same paragraphs are
+# syndicated across sites and survive article edits
+PARAGRAPH_ENTITY_CACHE = PersistentCache(
+    'paragraph-entities', ttl=30 * 24 * 60 * 60, max_entries=200000)
+# entities found by a fallback backend while the preferred one
+# was failing, the preferred one is retried after a few minutes
+PARAGRAPH_FALLBACK_ENTITY_CACHE = PersistentCache(
+    'paragraph-fallback-entities', ttl=5 * 60, max_entries=20000)
+
+ENTITY_BACKEND_VARIABLE = 'STAMPIFY_ENTITY_BACKEND'
+REMOTE_BACKEND = 'remote'
+LOCAL_BACKEND = 'local'
+REMOTE_WITH_LOCAL_FALLBACK_BACKEND = 'remote-with-local-fallback'
 
-from error.stampifier_error import BadRequestError
+# entities of this type are not used for summarization
+SKIPPED_ENTITY_TYPE = 'OTHER'
+
+# spaCy labels mapped to the entity types of the Natural Language API
+SPACY_LABEL_TO_ENTITY_TYPE = {
+    'PERSON': 'PERSON',
+    'NORP': 'ORGANIZATION',
+    'ORG': 'ORGANIZATION',
+    'FAC': 'LOCATION',
+    'GPE': 'LOCATION',
+    'LOC': 'LOCATION',
+    'PRODUCT': 'CONSUMER_GOOD',
+    'EVENT': 'EVENT',
+    'WORK_OF_ART': 'WORK_OF_ART',
+    'DATE': 'DATE',
+    'MONEY': 'PRICE',
+    'PERCENT': 'NUMBER',
+    'QUANTITY': 'NUMBER',
+    'ORDINAL': 'NUMBER',
+    'CARDINAL': 'NUMBER',
+    'LAW': 'OTHER',
+    'LANGUAGE': 'OTHER',
+    'TIME': 'OTHER'
+}
+
+
+def get_entity_backend():
+    ''' Returns the backend set in STAMPIFY_ENTITY_BACKEND,
+    remote if it is not set
+    '''
+    return os.environ.get(ENTITY_BACKEND_VARIABLE, REMOTE_BACKEND)
+
+
+def get_entity_retriever(backend=None):
+    ''' Returns the entity retriever for the backend, by default
+    the one set in STAMPIFY_ENTITY_BACKEND (remote if not set)
+    '''
+    backend = backend or get_entity_backend()
+
+    if backend == REMOTE_BACKEND:
+        return TextEntityRetriever()
+    if backend == LOCAL_BACKEND:
+        return LocalTextEntityRetriever()
+    if backend == REMOTE_WITH_LOCAL_FALLBACK_BACKEND:
+        return FallbackTextEntityRetriever(
+            TextEntityRetriever(), LocalTextEntityRetriever())
+
+    raise IncorrectInputError(
+        "entity backend must be one of {}, {} or {}".format(
+            REMOTE_BACKEND, LOCAL_BACKEND,
+            REMOTE_WITH_LOCAL_FALLBACK_BACKEND))
+
+
+def get_paragraph_entity_retriever(backend=None):
+    ''' Returns the cached paragraph entity retriever for the backend,
+    by default the one set in STAMPIFY_ENTITY_BACKEND
+    '''
+    return ParagraphEntityRetriever(get_entity_retriever(backend))
 
 
 class TextEntityRetriever:
@@ -23,14 +116,19 @@ class TextEntityRetriever:
             a list of strings
     '''
     API_ENDPOINT \
-        = "https://language.googleapis.com/v1beta2/documents:analyzeEntities?key="  # noqa
+        = "https://language.googleapis.com/v1beta2/documents:analyzeEntities"
+
+    PARAGRAPH_SEPARATOR = "\n\n"
+
+    # backends the retriever can find entities with, preferred first
+    backends = (REMOTE_BACKEND,)
 
     def __init__(self):
         self.api_key \
             = base64.b64decode(os.environ['GOOGLE_CLOUD_API_KEY'])\
                     .decode("utf-8")
-        self.api_url \
-            = self.API_ENDPOINT + self.api_key
+        self.api_url = get_api_url(NATURAL_LANGUAGE_ENDPOINT_VARIABLE,
+                                   self.API_ENDPOINT, self.api_key)
         self.json_data_for_post_request = None
 
     def _ready_data_for_post_request(self, text):
@@ -50,15 +148,228 @@ class TextEntityRetriever:
         '''
         self._ready_data_for_post_request(text)
 
-        response = requests.post(
+        # retried and timed out by the shared client,
+        # raises BadRequestError if the request fails
+        response = NATURAL_LANGUAGE_API_CLIENT.post(
             self.api_url, data=self.json_data_for_post_request)
 
-        if response.status_code != 200:
-            raise BadRequestError(response.status_code)
-
         entities = json.loads(response.content)["entities"]
         entity_list = list()
         for entity_dict in entities:
-            if entity_dict["type"] != 'OTHER':
+            if entity_dict["type"] != SKIPPED_ENTITY_TYPE:
                 entity_list.append(entity_dict["name"])
         return entity_list
+
+    def get_entities_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of every paragraph as a list of
+        lists of strings, all the paragraphs are sent in one call
+        Params:
+            * paragraphs : list of strings
+        Return type: list<list<str>>
+        '''
+        paragraph_entities = [list() for _ in paragraphs]
+        if not paragraphs:
+            return paragraph_entities
+
+        self._ready_data_for_post_request(
+            self.PARAGRAPH_SEPARATOR.join(paragraphs))
+        response = NATURAL_LANGUAGE_API_CLIENT.post(
+            self.api_url, data=self.json_data_for_post_request)
+
+        # offsets of the mentions are in bytes of
+        # the utf-8 text, since encodingType is UTF8
+        paragraph_ends = list()
+        paragraph_end = 0
+        for paragraph in paragraphs:
+            paragraph_end += len(paragraph.encode("utf-8"))
+            paragraph_ends.append(paragraph_end)
+            paragraph_end += len(self.PARAGRAPH_SEPARATOR)
+
+        for entity_dict in json.loads(response.content)["entities"]:
+            if entity_dict["type"] == SKIPPED_ENTITY_TYPE:
+                continue
+            for mention in entity_dict.get("mentions", []):
+                offset = mention["text"].get("beginOffset", 0)
+                paragraph_index = bisect.bisect_right(paragraph_ends, offset)
+                if paragraph_index < len(paragraphs) and entity_dict[
+                        "name"] not in paragraph_entities[paragraph_index]:
+                    paragraph_entities[paragraph_index].append(
+                        entity_dict["name"])
+
+        return paragraph_entities
+
+    def get_entities_and_backend_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of every paragraph along
+        with the backend which found them
+        '''
+        return self.get_entities_from_paragraphs(paragraphs), REMOTE_BACKEND
+
+
+class LocalTextEntityRetriever:
+    ''' Finds the entities with the named entity recognizer of
+    spaCy, without any network call. The labels of spaCy are mapped
+    to the types of the Natural Language API so the same entities
+    are skipped as with TextEntityRetriever
+    '''
+
+    backends = (LOCAL_BACKEND,)
+
+    def __init__(self):
+        self.nlp = MODEL_REGISTRY.get_spacy_ner_model()
+
+    def get_entities_from_text(self, text):
+        ''' Returns the entities as a list of strings
+        Params:
+            * text : a string of sentences
+        Return type: list<str>
+        '''
+        entity_list = list()
+        for entity in self.nlp(text).ents:
+            entity_type = SPACY_LABEL_TO_ENTITY_TYPE.get(
+                entity.label_, SKIPPED_ENTITY_TYPE)
+            if entity_type != SKIPPED_ENTITY_TYPE:
+                entity_list.append(entity.text)
+        return entity_list
+
+    def get_entities_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of every paragraph
+        as a list of lists of strings
+        '''
+        return [self.get_entities_from_text(paragraph)
+                for paragraph in paragraphs]
+
+    def get_entities_and_backend_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of every paragraph along
+        with the backend which found them
+        '''
+        return self.get_entities_from_paragraphs(paragraphs), LOCAL_BACKEND
+
+
+class FallbackTextEntityRetriever:
+    ''' Uses the fallback retriever when the
+    primary retriever fails for a text
+    '''
+
+    def __init__(self, primary_retriever, fallback_retriever):
+        self.primary_retriever = primary_retriever
+        self.fallback_retriever = fallback_retriever
+        self.backends = primary_retriever.backends \
+            + fallback_retriever.backends
+
+    def get_entities_from_text(self, text):
+        ''' Returns the entities as a list of strings
+        Params:
+            * text : a string of sentences
+        Return type: list<str>
+        '''
+        try:
+            return self.primary_retriever.get_entities_from_text(text)
+        except StampifierError as error:
+            LOGGER.warning('Falling back to %s: %s',
+                           type(self.fallback_retriever).__name__,
+                           error.message)
+            return self.fallback_retriever.get_entities_from_text(text)
+
+    def get_entities_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of every paragraph
+        as a list of lists of strings
+        '''
+        return self.get_entities_and_backend_from_paragraphs(paragraphs)[0]
+
+    def get_entities_and_backend_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of every paragraph along with
+        the backend which found them, so that the results of the
+        fallback retriever are not mistaken for the primary ones
+        '''
+        try:
+            return self.primary_retriever \
+                .get_entities_and_backend_from_paragraphs(paragraphs)
+        except StampifierError as error:
+            LOGGER.warning('Falling back to %s: %s',
+                           type(self.fallback_retriever).__name__,
+                           error.message)
+            return self.fallback_retriever \
+                .get_entities_and_backend_from_paragraphs(paragraphs)
+
+
+class ParagraphEntityRetriever:
+    ''' Finds the entities of a text made of paragraphs
+
+    The entities of every paragraph are cached by the hash of the
+    paragraph and the backend which found them, only the paragraphs
+    missing from the cache are sent to the entity retriever (in a
+    single call). The entities found by the preferred backend of the
+    retriever are kept for long, those of a fallback backend only for
+    a few minutes so the preferred backend is retried once it is
+    back. The entities of the text are then put together from the
+    entities of its paragraphs.
+    '''
+
+    def __init__(self, entity_retriever,
+                 entity_cache=PARAGRAPH_ENTITY_CACHE,
+                 fallback_entity_cache=PARAGRAPH_FALLBACK_ENTITY_CACHE):
+        self.entity_retriever = entity_retriever
+        self.entity_cache = entity_cache
+        self.fallback_entity_cache = fallback_entity_cache
+
+    def get_entities_from_paragraphs(self, paragraphs):
+        ''' Returns the entities of the paragraphs as a list of
+        strings, without duplicates and in order of appearance
+        Params:
+            * paragraphs : list of strings
+        Return type: list<str>
+        '''
+        hashes = [self._get_paragraph_hash(paragraph)
+                  for paragraph in paragraphs]
+        entities_for_hash = self._get_cached_entities(hashes)
+
+        uncached_paragraph_for_hash = {
+            paragraph_hash: paragraph
+            for paragraph_hash, paragraph in zip(hashes, paragraphs)
+            if paragraph_hash not in entities_for_hash and paragraph.strip()}
+        if uncached_paragraph_for_hash:
+            paragraph_entities, backend = self.entity_retriever \
+                .get_entities_and_backend_from_paragraphs(
+                    list(uncached_paragraph_for_hash.values()))
+            uncached_entities = dict(zip(
+                uncached_paragraph_for_hash, paragraph_entities))
+            self._get_cache(backend).put_many({
+                self._get_cache_key(backend, paragraph_hash): entities
+                for paragraph_hash, entities in uncached_entities.items()})
+            entities_for_hash.update(uncached_entities)
+
+        entity_list = list()
+        for paragraph_hash in hashes:
+            for entity in entities_for_hash.get(paragraph_hash, []):
+                if entity not in entity_list:
+                    entity_list.append(entity)
+        return entity_list
+
+    def _get_cached_entities(self, hashes):
+        ''' returns the cached entities by paragraph hash, those of
+        a backend are only used if no preferred backend has them
+        '''
+        entities_for_hash = dict()
+        for backend in self.entity_retriever.backends:
+            hash_for_key = {
+                self._get_cache_key(backend, paragraph_hash): paragraph_hash
+                for paragraph_hash in hashes
+                if paragraph_hash not in entities_for_hash}
+            for key, entities in self._get_cache(backend).get_many(
+                    hash_for_key).items():
+                entities_for_hash[hash_for_key[key]] = entities
+        return entities_for_hash
+
+    def _get_cache(self, backend):
+        if backend == self.entity_retriever.backends[0]:
+            return self.entity_cache
+        return self.fallback_entity_cache
+
+    @staticmethod
+    def _get_paragraph_hash(paragraph):
+        return hashlib.sha256(
+            ' '.join(paragraph.split()).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _get_cache_key(backend, paragraph_hash):
+        return "{}:{}".format(backend, paragraph_hash)
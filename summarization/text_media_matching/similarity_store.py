@@ -0,0 +1,127 @@
+''' Similarity Store
+This module keeps the similarity between the sentences and the media
+of one webpage, so that it is computed once for all the matchings.
+
+The similarity of a sentence and a media is the maximum of the cosine
+similarity of the sentence with the media description and with the
+media attributes. The embeddings of the media are normalized once,
+the embeddings of a set of sentences (for eg. the title text or the
+normal text) are normalized and compared with all the media the first
+time the set is asked for (or when it is added with the embedding
+matrices of PreprocessedContents). Every matcher then gets the rows and
+columns of its own sentences and media.
+
+This script contains the following classes:
+    *SimilarityStore : computes and slices the similarity matrices
+'''
+import numpy as np
+
+from utils.embedding_utils import get_normalized_embedding_matrix
+
+
+class SimilarityStore:
+    ''' Class to share the sentence media similarity of a webpage
+
+    * media_list : list of media (Image/Gif/Video) which can be matched
+    * media_description_embeddings, media_attribute_embeddings :
+        normalized embedding matrices of the media (for eg. from
+        PreprocessedContents), they are made from the media if
+        not given
+    The sentences and media are recognized by identity, a matcher
+    asking for media the store was not built with gets a matrix
+    computed for it alone.
+    '''
+    def __init__(
+            self,
+            media_list,
+            media_description_embeddings=None,
+            media_attribute_embeddings=None):
+        self.media_list = media_list
+        self.media_row_for_id = {
+            id(media): row for row, media in enumerate(media_list)}
+
+        if media_description_embeddings is None:
+            media_description_embeddings = get_normalized_embedding_matrix(
+                [media.img_description_embedding for media in media_list])
+        if media_attribute_embeddings is None:
+            media_attribute_embeddings = get_normalized_embedding_matrix(
+                [media.img_attribute_embedding for media in media_list])
+        self.media_description_embeddings = media_description_embeddings
+        self.media_attribute_embeddings = media_attribute_embeddings
+
+        # one (sentence count, media count) matrix for every set of
+        # sentences and the position of every sentence in it
+        self.similarity_matrices = list()
+        self.sentence_position_for_id = dict()
+
+    def get_similarity_matrix(self, sentence_list, media_list):
+        ''' returns the (sentence count, media count) similarity
+        matrix of the given sentences and media
+        '''
+        media_rows = [self.media_row_for_id.get(id(media))
+                      for media in media_list]
+        if None in media_rows:
+            return self._compute_similarity_matrix(
+                get_normalized_embedding_matrix(
+                    [sentence.embedding for sentence in sentence_list]),
+                get_normalized_embedding_matrix(
+                    [media.img_description_embedding
+                     for media in media_list]),
+                get_normalized_embedding_matrix(
+                    [media.img_attribute_embedding for media in media_list]))
+
+        positions = [self.sentence_position_for_id.get(id(sentence))
+                     for sentence in sentence_list]
+        matrix_indices = set(
+            position[0] if position is not None else None
+            for position in positions)
+        if len(matrix_indices) != 1 or None in matrix_indices:
+            # the sentences are asked for the first time,
+            # or come from different sets of sentences
+            matrix_index = self.add_sentence_set(sentence_list)
+            sentence_rows = list(range(len(sentence_list)))
+        else:
+            matrix_index = matrix_indices.pop()
+            sentence_rows = [position[1] for position in positions]
+
+        return self.similarity_matrices[matrix_index][
+            np.ix_(sentence_rows, media_rows)]
+
+    def add_sentence_set(self, sentence_list, sentence_embeddings=None):
+        ''' computes the similarity of the sentences with all the
+        media and returns the index of the matrix, the normalized
+        embedding matrix of the sentences is made if not given
+        '''
+        if sentence_embeddings is None:
+            sentence_embeddings = get_normalized_embedding_matrix(
+                [sentence.embedding for sentence in sentence_list])
+
+        matrix_index = len(self.similarity_matrices)
+        self.similarity_matrices.append(self._compute_similarity_matrix(
+            sentence_embeddings,
+            self.media_description_embeddings,
+            self.media_attribute_embeddings))
+
+        for row, sentence in enumerate(sentence_list):
+            self.sentence_position_for_id[id(sentence)] = (matrix_index, row)
+
+        return matrix_index
+
+    @staticmethod
+    def _compute_similarity_matrix(
+            sentence_embeddings,
+            media_description_embeddings,
+            media_attribute_embeddings):
+        if len(sentence_embeddings) == 0 \
+                or len(media_description_embeddings) == 0:
+            # the dimension of empty matrices may not be known
+            return np.zeros(
+                (len(sentence_embeddings), len(media_description_embeddings)),
+                dtype=np.float32)
+
+        # pick maximum similarity between
+        # similarity between sentence and media description
+        # similarity between sentence and media attributes
+        return np.maximum(
+            sentence_embeddings @ media_description_embeddings.T,
+            sentence_embeddings @ media_attribute_embeddings.T)
@@ -4,6 +4,9 @@ Module for performing Stable Matching
 it solves an instance of the stable marriage problem.
 This is used as a utility for Text-Media Matching
 '''
+import collections
+
+import numpy as np
 
 
 class StableMatcher:
@@ -11,6 +14,10 @@ class StableMatcher:
 
     This Class implements the stable matching
     using the gale shapley algorithm.
+
+    The preferences are (n,n) lists of lists or NumPy arrays,
+    row i lists the indices of the other set from the most
+    to the least preferred by item i.
     '''
     def __init__(
             self,
@@ -25,62 +32,73 @@ class StableMatcher:
         ''' returns the matching as a list of 2-tuples'''
         return self.__gale_shapley_matching()
 
-    def __media_rank_in_sentence_preference(self, sentence_index, media_index):
-        return self.media_preference_for_sentence[sentence_index].index(
-            media_index)
+    def __get_media_rank_for_sentence(self):
+        ''' returns the rank of every media in the preference of every
+        sentence, so that two media are compared in constant time
+        '''
+        media_preference_for_sentence = np.asarray(
+            self.media_preference_for_sentence, dtype=np.intp).reshape(
+                self.set_size, self.set_size)
+
+        media_rank_for_sentence = np.empty_like(media_preference_for_sentence)
+        media_rank_for_sentence[
+            np.arange(self.set_size)[:, np.newaxis],
+            media_preference_for_sentence] = np.arange(self.set_size)
 
-    def __sentence_has_better_preference(
-            self, sentence_index, unmatched_index):
-        return self.__media_rank_in_sentence_preference(
-            sentence_index, unmatched_index) < \
-            self.__media_rank_in_sentence_preference(
-                sentence_index,
-                self.media_matched_for_sentence[sentence_index])
+        # python lists are faster to index one item at a time
+        return media_rank_for_sentence.tolist()
 
     def __gale_shapley_matching(self):
         '''
         Finds the stable matching between the text and media
         Given two (n,n) matrices of preferences for the set of Sentences, Media
         finds the stable matching by running the gale-shapley
-        matching algorithm
+        matching algorithm in O(n^2)
         Returns : a list of tuples where each tuple (x,y) means
         x = index of sentence
         y = index of media
         Thus, it returns the indices matched as a list of tuples
         '''
         # Make the matching optimal for the Media
+        media_rank_for_sentence = self.__get_media_rank_for_sentence()
+        sentence_preference_for_media = np.asarray(
+            self.sentence_preference_for_media, dtype=np.intp).reshape(
+                self.set_size, self.set_size).tolist()
 
         # -1 denotes it is currently unmatched
         self.sentence_matched_for_media = [-1] * self.set_size
         self.media_matched_for_sentence = [-1] * self.set_size
 
-        self.count_of_unmatched_media = self.set_size
-
-        while self.count_of_unmatched_media > 0:
-            unmatched_media_index = -1  # no index found currently
-            for i in range(self.set_size):
-                if self.sentence_matched_for_media[i] == -1:
-                    unmatched_media_index = i
-                    break
-
-            for i in self.sentence_preference_for_media[unmatched_media_index]:
-                # the sentence is unmatched
-                if self.media_matched_for_sentence[i] == -1:
-                    # we can match the sentence directly
-                    self.media_matched_for_sentence[i] = unmatched_media_index
-                    self.sentence_matched_for_media[unmatched_media_index] = i
-                    self.count_of_unmatched_media -= 1
-                    break
-                if self.__sentence_has_better_preference(
-                        i,
-                        unmatched_media_index):
-                    # i prefers the current media better
-                    # unmatch media currently matched for sentence i
-                    self.sentence_matched_for_media[
-                        self.media_matched_for_sentence[i]] = -1
-                    self.sentence_matched_for_media[unmatched_media_index] = i
-                    self.media_matched_for_sentence[i] = unmatched_media_index
-                    break
+        # position in its preference of the next
+        # sentence every media will propose to
+        next_proposal_for_media = [0] * self.set_size
+        unmatched_media = collections.deque(range(self.set_size))
+
+        while unmatched_media:
+            media_index = unmatched_media.popleft()
+            sentence_index = sentence_preference_for_media[media_index][
+                next_proposal_for_media[media_index]]
+            next_proposal_for_media[media_index] += 1
+
+            matched_media_index = self.media_matched_for_sentence[
+                sentence_index]
+            if matched_media_index == -1:
+                # the sentence is unmatched, we can match it directly
+                self.media_matched_for_sentence[sentence_index] = media_index
+                self.sentence_matched_for_media[media_index] = sentence_index
+
+            elif media_rank_for_sentence[sentence_index][media_index] \
+                    < media_rank_for_sentence[sentence_index][
+                        matched_media_index]:
+                # the sentence prefers the current media better
+                self.sentence_matched_for_media[matched_media_index] = -1
+                unmatched_media.append(matched_media_index)
+                self.media_matched_for_sentence[sentence_index] = media_index
+                self.sentence_matched_for_media[media_index] = sentence_index
+
+            else:
+                # rejected, the media proposes to its next sentence
+                unmatched_media.appendleft(media_index)
 
         matchings = [(self.sentence_matched_for_media[i], i)
                      for i in range(self.set_size)]
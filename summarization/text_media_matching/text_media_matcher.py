@@ -1,4 +1,6 @@
 ''' Text Media  Matching interface '''
+from summarization.text_media_matching.similarity_store import \
+    SimilarityStore
 from summarization.text_media_matching.text_media_matching_helper import \
     TextMediaMatchingHelper
 from summarization.text_media_matching.text_media_matching_preprocessor import \
@@ -6,13 +8,32 @@ from summarization.text_media_matching.text_media_matching_preprocessor import \
 
 
 class TextMediaMatcher:
-    '''Class to integrate the TextMediaMatching utilities'''
+    '''Class to integrate the TextMediaMatching utilities
+
+    matching_strategy is either
+        * stable-matching : the larger list is pruned to the size of
+            the smaller one and the media-optimal stable matching
+            is found (the default)
+        * optimal-assignment : the matching with the maximum total
+            score is found, without pruning
+
+    similarity_store is the SimilarityStore shared by the matchings
+    of a webpage, one is made for the media if it is not given.
+    '''
+    STABLE_MATCHING = TextMediaMatchingHelper.STABLE_MATCHING
+    OPTIMAL_ASSIGNMENT = TextMediaMatchingHelper.OPTIMAL_ASSIGNMENT
 
     def __init__(self, text_contents, media_contents,
-                 distance_metric_type="absolute-difference"):
+                 distance_metric_type="absolute-difference",
+                 matching_strategy=STABLE_MATCHING,
+                 similarity_store=None):
         self.text_contents = text_contents
         self.media_contents = media_contents
         self.distance_metric_type = distance_metric_type
+        self.matching_strategy = matching_strategy
+        if similarity_store is None:
+            similarity_store = SimilarityStore(media_contents)
+        self.similarity_store = similarity_store
 
     def _get_matched_and_unmatched_contents(self):
         if len(self.text_contents) == 0 or len(self.media_contents) == 0:
@@ -23,9 +44,13 @@ class TextMediaMatcher:
                 "unused_content_type": "text" if len(
                     self.text_contents) != 0 else "media"}
 
+        if self.matching_strategy == self.OPTIMAL_ASSIGNMENT:
+            return self._get_optimal_assignment()
+
         preprocessor = TextMediaMatchingPreprocessor(
             self.text_contents,
-            self.media_contents
+            self.media_contents,
+            self.similarity_store
         )
         preprocessed_contents_dict = preprocessor.get_formatted_content()
 
@@ -36,7 +61,8 @@ class TextMediaMatcher:
         unused_content_type = preprocessed_contents_dict["unused_content_type"]
 
         matcher = TextMediaMatchingHelper(
-            text_for_matching, media_for_matching, self.distance_metric_type)
+            text_for_matching, media_for_matching, self.distance_metric_type,
+            similarity_store=self.similarity_store)
         matched_contents = matcher.get_text_media_matching()
 
         return {
@@ -44,3 +70,16 @@ class TextMediaMatcher:
             "unused_contents": unused_contents,
             "unused_content_type": unused_content_type
         }
+
+    def _get_optimal_assignment(self):
+        matcher = TextMediaMatchingHelper(
+            self.text_contents, self.media_contents,
+            self.distance_metric_type, self.OPTIMAL_ASSIGNMENT,
+            self.similarity_store)
+        matched_contents = matcher.get_text_media_matching()
+
+        return {
+            "matched_contents": matched_contents,
+            "unused_contents": matcher.unused_contents,
+            "unused_content_type": matcher.unused_content_type
+        }
@@ -8,11 +8,17 @@ This script contains the following classes:
     *TextMediaMatcher : implements the main algorithm for matching
                         returns the stable matching
     *StableMatcher : implements the Gale-Shapley algorithm for matching
+
+With the optimal-assignment strategy the matching maximizes the total
+score instead, it is found by the Hungarian algorithm of SciPy and
+the two lists do not need to be of the same size.
 '''
-from numpy import maximum as matrix_maximum
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 from error.stampifier_error import IncorrectInputError
+from summarization.text_media_matching.similarity_store import \
+    SimilarityStore
 from summarization.text_media_matching.stable_matcher import StableMatcher
 
 
@@ -21,26 +27,45 @@ class TextMediaMatchingHelper:
     Finds the stable matching by applying the Gale Shalpley algorithm
     It accepts a list of objects of type ElementWithIndex
     '''
+    STABLE_MATCHING = "stable-matching"
+    OPTIMAL_ASSIGNMENT = "optimal-assignment"
+    # replaces infinite scores (a zero signed difference)
+    # so that the assignment stays solvable
+    UNBOUNDED_SCORE = 1e6
 
     def __init__(self, text_contents, media_contents,
-                 distance_metric_type="absolute-difference"):
+                 distance_metric_type="absolute-difference",
+                 matching_strategy=STABLE_MATCHING,
+                 similarity_store=None):
         '''
         Params:
             * text_contents : list of objects of type
             SentenceWithAttributes
             * media_contents : list of objects of type
             Image
+            * similarity_store : SimilarityStore shared by the
+            matchings of the webpage, one is made if not given
         '''
 
-        # both sets must be of same size for this to work
-        if len(text_contents) != len(media_contents):
+        # both sets must be of same size for stable matching
+        if matching_strategy == self.STABLE_MATCHING \
+                and len(text_contents) != len(media_contents):
             raise IncorrectInputError(
                 "Input sizes do not match for text media matching")
+        if matching_strategy not in (self.STABLE_MATCHING,
+                                     self.OPTIMAL_ASSIGNMENT):
+            raise IncorrectInputError(
+                "matching strategy must be either {} or {}".format(
+                    self.STABLE_MATCHING, self.OPTIMAL_ASSIGNMENT))
 
         self.text_contents = text_contents
         self.media_contents = media_contents
         self.distance_metric_type = distance_metric_type
+        self.matching_strategy = matching_strategy
         self.set_size = len(media_contents)  # size of each set
+        if similarity_store is None:
+            similarity_store = SimilarityStore(media_contents)
+        self.similarity_store = similarity_store
 
         # description
         self.sentence_preference_for_media = [
@@ -53,6 +78,9 @@ class TextMediaMatchingHelper:
         tuples (x,y) where x is the sentence
         object and y is the media(image)
         '''
+        if self.matching_strategy == self.OPTIMAL_ASSIGNMENT:
+            return self._get_optimal_assignment()
+
         self._form_preference_matrix()
 
         stable_matcher = StableMatcher(
@@ -70,78 +98,95 @@ class TextMediaMatchingHelper:
             )
         return self.text_media_matchings
 
-    def _get_embedded_text(self):
-        '''fetches the vector embeddings for any necessary text
-        from the object itself.
+    def _get_optimal_assignment(self):
+        ''' returns the matching with the maximum total score, the
+        contents of the larger list which are not matched are
+        stored in unused_contents
         '''
-        self.summary_sentence_embeddings \
-            = [text.embedding for text in self.text_contents]
-
-        self.media_description_embeddings = [
-            media.img_description_embedding for media in self.media_contents]
+        self._cosine_similarity_preprocessing()
+        self._form_score_matrix()
+
+        sentence_indices, media_indices = linear_sum_assignment(
+            np.nan_to_num(self.similarity_matrix.astype(np.float64),
+                          nan=0.0,
+                          posinf=self.UNBOUNDED_SCORE,
+                          neginf=-self.UNBOUNDED_SCORE),
+            maximize=True)
+
+        # sentence_indices are sorted, like the stable matchings
+        self.text_media_matchings = [
+            (self.text_contents[sentence_index],
+             self.media_contents[media_index])
+            for sentence_index, media_index
+            in zip(sentence_indices, media_indices)]
+
+        if len(self.media_contents) > len(self.text_contents):
+            self.unused_content_type = "media"
+            matched_indices = set(media_indices.tolist())
+            self.unused_contents = [
+                media for index, media in enumerate(self.media_contents)
+                if index not in matched_indices]
+        else:
+            self.unused_content_type = "text"
+            matched_indices = set(sentence_indices.tolist())
+            self.unused_contents = [
+                text for index, text in enumerate(self.text_contents)
+                if index not in matched_indices]
 
-        self.media_attribute_embeddings \
-            = [media.img_attribute_embedding for media in self.media_contents]
+        return self.text_media_matchings
 
     def _cosine_similarity_preprocessing(self):
         '''Calculates the required cosine similarity between matrices
 
         Finds the cosine similarity between summary sentences and
         media description and media attributes. This is done
-        as preprocessing before calculating the similarity score
+        as preprocessing before calculating the similarity score,
+        the maximum of both is taken from the similarity store
         '''
-        # pick maximum similarity between
-        # similarity between sentence and media description
-        # similarity between sentence and media attributes
-        self.similarity_matrix = matrix_maximum(
-            cosine_similarity(
-                self.summary_sentence_embeddings,
-                self.media_description_embeddings
-            ),
-            cosine_similarity(
-                self.summary_sentence_embeddings,
-                self.media_attribute_embeddings
-            )
-        )
+        self.similarity_matrix = self.similarity_store.get_similarity_matrix(
+            self.text_contents, self.media_contents)
 
-    def _similarity_score(self, sentence_index, media_index):
-        ''' returns the similarity score'''
-
-        # 1.0 is add in case of total dissimimlarity
-        sentence_similarity_score = (
-            1.0 + self.similarity_matrix[sentence_index][media_index])
-
-        distance_score = self._get_distance_score_based_on_metric_type(
-            media_index, sentence_index)
-
-        return sentence_similarity_score / distance_score
-
-    def _get_distance_score_based_on_metric_type(
-            self, media_index, sentence_index):
+    def _get_distance_matrix(self):
+        ''' returns the distance score between every sentence (row)
+        and every media (column) based on the metric type
+        '''
         signed_difference = (
-            self.media_contents[media_index].content_index
-            - self.text_contents[sentence_index].get_weighted_index()
+            np.array([media.content_index for media in self.media_contents],
+                     dtype=np.float64)[np.newaxis, :]
+            - np.array([text.get_weighted_index()
+                        for text in self.text_contents],
+                       dtype=np.float64)[:, np.newaxis]
         )
 
         if self.distance_metric_type == "absolute-difference":
-            # 1.0 is added to prevent ZeroDivisionError if indices are same
-            return 1.0 + abs(signed_difference)
+            # 1.0 is added to prevent division by zero if indices are same
+            return 1.0 + np.abs(signed_difference)
 
         return signed_difference
 
+    def _form_score_matrix(self):
+        ''' replaces the similarity matrix by the score of every
+        sentence (row) and media (column) pair
+        '''
+        # the scores are computed in the dtype of the similarities so
+        # that they are the same as when computed one cell at a time,
+        # 1.0 is added in case of total dissimilarity
+        distance_matrix = self._get_distance_matrix().astype(
+            self.similarity_matrix.dtype)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.similarity_matrix = \
+                (1.0 + self.similarity_matrix) / distance_matrix
+
     def _form_preference_matrix(self):
         ''' Builds and initializes the preference matrix for media+sentences'''
-        self._get_embedded_text()  # get the vector embeddings for both lists
-
         self._cosine_similarity_preprocessing()
 
-        for i in range(self.set_size):
-            for j in range(self.set_size):
-                self.similarity_matrix[i][j] = self._similarity_score(
-                    sentence_index=i, media_index=j)
+        self._form_score_matrix()
 
-        for i in range(self.set_size):
-            self.media_preference_for_sentence[i].sort(
-                key=lambda x: self.similarity_matrix[i][x], reverse=True)
-            self.sentence_preference_for_media[i].sort(
-                key=lambda x: self.similarity_matrix[x][i], reverse=True)
+        # a stable sort of the negated scores keeps equal
+        # scores in index order, like a reverse list sort
+        negated_scores = -self.similarity_matrix
+        self.media_preference_for_sentence = np.argsort(
+            negated_scores, axis=1, kind="stable").tolist()
+        self.sentence_preference_for_media = np.argsort(
+            negated_scores.T, axis=1, kind="stable").tolist()
@@ -1,8 +1,8 @@
 ''' This module pre-processes the Input
 for the text media matcher
 '''
-from numpy import maximum as matrix_maximum
-from sklearn.metrics.pairwise import cosine_similarity
+from summarization.text_media_matching.similarity_store import \
+    SimilarityStore
 
 
 class TextMediaMatchingPreprocessor:
@@ -11,10 +11,12 @@ class TextMediaMatchingPreprocessor:
     the text before passing it onto
     TextMediaMatchingHelper
     '''
-    def __init__(self, sentence_list, media_list):
+    def __init__(self, sentence_list, media_list, similarity_store=None):
         '''
         sentence_list : list with objects of type SentenceWithAttributes
         media_list : list of objects of type media (Image/Gif/Video)
+        similarity_store : SimilarityStore shared by the matchings
+        of the webpage, one is made for the media if not given
         '''
         self.sentence_list = sentence_list
         self.sentence_count = len(sentence_list)
@@ -23,16 +25,9 @@ class TextMediaMatchingPreprocessor:
 
         self.unused_content_type = None
 
-        # collect embeddings for sentences/media
-        self.sentence_embeddings = [
-            sentence.embedding for sentence in self.sentence_list
-        ]
-        self.media_description_embeddings = [
-            media.img_description_embedding for media in self.media_list
-        ]
-        self.media_attribute_embeddings = [
-            media.img_attribute_embedding for media in self.media_list
-        ]
+        if similarity_store is None:
+            similarity_store = SimilarityStore(media_list)
+        self.similarity_store = similarity_store
 
         # some media/sentences may be unused for matching
         # we package this separately so it can be used later
@@ -67,16 +62,8 @@ class TextMediaMatchingPreprocessor:
         }
 
     def _form_similarity_matrix(self):
-        self.similarity_matrix = matrix_maximum(
-            cosine_similarity(
-                self.sentence_embeddings,
-                self.media_description_embeddings),
-
-            cosine_similarity(
-                self.sentence_embeddings,
-                self.media_attribute_embeddings
-            )
-        )
+        self.similarity_matrix = self.similarity_store.get_similarity_matrix(
+            self.sentence_list, self.media_list)
 
     def _initialize_and_sort_indices_for_lists(self):
         self.sentence_list_indices = list(range(self.sentence_count))
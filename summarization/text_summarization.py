@@ -1,14 +1,17 @@
 ''' Module to perform text summarization'''
 
+import logging
 import string
 
 from gensim.summarization.summarizer import summarize
 from nltk.tokenize import sent_tokenize, word_tokenize
-from summarizer import Summarizer
-from summarizer.coreference_handler import CoreferenceHandler
 
-from error.stampifier_error import IncorrectInputError
-from summarization.text_entity_detection import TextEntityRetriever
+from error.stampifier_error import ApiUnavailableError, IncorrectInputError
+from summarization.model_registry import MODEL_REGISTRY
+from summarization.text_entity_detection import (
+    get_entity_retriever, get_paragraph_entity_retriever)
+
+LOGGER = logging.getLogger(__name__)
 
 
 class TextSummarizer:
@@ -44,10 +47,9 @@ class TextSummarizer:
         '''
         self.text_summarizer = None
         if priority == "accuracy":
-            handler = CoreferenceHandler(greedyness=.4)
-            self.text_summarizer = Summarizer(
-                model='distilbert-base-uncased',
-                sentence_handler=handler)
+            # bert model and coreference handler are
+            # shared by all summarizers in the process
+            self.text_summarizer = MODEL_REGISTRY.get_bert_summarizer()
         elif priority == "speed":
             self.text_summarizer = summarize
         else:
@@ -56,9 +58,19 @@ class TextSummarizer:
         self.entity_list = list()
         self.text = None
 
-    def _get_entites_from_text(self):
-        entity_retriever = TextEntityRetriever()
-        self.entity_list = entity_retriever.get_entities_from_text(self.text)
+    def _get_entites_from_text(self, paragraphs=None):
+        try:
+            if paragraphs is None:
+                self.entity_list = get_entity_retriever() \
+                    .get_entities_from_text(self.text)
+            else:
+                # entities of the paragraphs are cached across requests
+                self.entity_list = get_paragraph_entity_retriever() \
+                    .get_entities_from_paragraphs(paragraphs)
+        except ApiUnavailableError as error:
+            # the text is then summarized without entities
+            LOGGER.warning(error.message)
+            self.entity_list = list()
 
     def _cleaned_and_word_tokenized(self, text):
         # strip punctuations
@@ -81,13 +93,15 @@ class TextSummarizer:
 
         return False
 
-    def summarize_text(self, text: str, ratio=0.4):
+    def summarize_text(self, text: str, ratio=0.4, paragraphs=None):
         '''
             Finds the summarization for a given text
 
             Parameters:
                 - text : the text to be summarized
                 - ratio : value in range [0,1] - what % of the text to retain
+                - paragraphs : the paragraphs the text is made of, if
+                    given the entities are found paragraph by paragraph
         '''
         if ratio < 0 or ratio > 1:
             raise IncorrectInputError(
@@ -96,7 +110,7 @@ class TextSummarizer:
         self.text = text
         # get the entities in the text and store it
         # in a list
-        self._get_entites_from_text()
+        self._get_entites_from_text(paragraphs)
 
         # preprocess the entities and keep
         processed_entity_list = [
@@ -5,7 +5,6 @@ web entity detection feature for finding the
 entities present in an image
 
 The script contains the following classes:
-    *BadRequestError : a class to define the exception when the API call fails
     *ImageDescriptionRetreiver : implements the necessary utilities for calling
                                 the api and formatting the response
 '''
@@ -13,12 +12,28 @@ The script contains the following classes:
 import base64
 import concurrent.futures as cf
 import json
+import math
 import os
 
-import requests
 from nltk.tokenize import word_tokenize
 
-from error.stampifier_error import BadRequestError
+from utils.api_client import ApiClient, get_api_url
+from utils.persistent_cache import PersistentCache
+from utils.request_batcher import RequestBatcher
+from utils.url_utils import normalize_url
+
+VISION_API_CLIENT = ApiClient('vision')
+
+# overrides API_ENDPOINT of ImageDescriptionRetriever
+VISION_ENDPOINT_VARIABLE = 'STAMPIFY_VISION_API_ENDPOINT'
+
+# parsed descriptions of images, publisher CDNs
+# reuse the same images across articles
+DESCRIPTION_CACHE = PersistentCache(
+    'image-descriptions', ttl=7 * 24 * 60 * 60, max_entries=50000)
+# images the API could not describe, retried after a few minutes
+DESCRIPTION_ERROR_CACHE = PersistentCache(
+    'image-description-errors', ttl=5 * 60, max_entries=5000)
 
 
 class ImageDescriptionRetriever:
@@ -28,19 +43,39 @@ class ImageDescriptionRetriever:
       maxEntites : maximum number of entity results to return from the api
     '''
 
-    API_ENDPOINT \
-        = "https://vision.googleapis.com/v1/images:annotate?key="
+    API_ENDPOINT = "https://vision.googleapis.com/v1/images:annotate"
 
-    BATCH_SIZE = 5  # number of images per api request
+    BATCH_SIZE = 5  # default number of images per api request
+    # the api accepts at most 16 images per request
+    MIN_BATCH_SIZE = 1
+    MAX_BATCH_SIZE = 16
+    # requests made in parallel for a page while the api is fast
+    # and while it is slow (recent latency above SLOW_API_LATENCY)
+    FAST_API_PARALLELISM = 2
+    SLOW_API_PARALLELISM = 4
+    SLOW_API_LATENCY = 2.0
+
+    # shared by all the retrievers of the process
+    # instead of a new thread pool for every page
+    EXECUTOR = cf.ThreadPoolExecutor(
+        max_workers=8, thread_name_prefix='image-description')
 
     WORD_COUNT_TO_QUALIFY_AS_CAPTION = 15
 
-    def __init__(self, max_entities=3):
+    def __init__(self, max_entities=3,
+                 description_cache=DESCRIPTION_CACHE,
+                 description_error_cache=DESCRIPTION_ERROR_CACHE):
         self.api_key \
             = base64.b64decode(os.environ['GOOGLE_CLOUD_API_KEY'])\
                     .decode("utf-8")
-        self.api_url = self.API_ENDPOINT + self.api_key
+        self.api_url = get_api_url(
+            VISION_ENDPOINT_VARIABLE, self.API_ENDPOINT, self.api_key)
         self.max_entities = max_entities
+        self.batch_size = self.BATCH_SIZE
+        self.description_cache = description_cache
+        self.description_error_cache = description_error_cache
+        # urls of the images the API returned an error for
+        self.failed_image_urls = set()
 
     def get_description_for_images(self, image_urls: list) -> list:
         '''
@@ -52,9 +87,45 @@ class ImageDescriptionRetriever:
         Return type:
         list<str> : list containing best guess descriptions of the image
         '''
+        description_for_url = self._get_cached_descriptions(image_urls)
+
+        # only the images missing from the cache are sent to the api
+        self.image_urls = list(dict.fromkeys(
+            url for url in image_urls if url not in description_for_url))
+
+        if self.image_urls:
+            requested_descriptions = self._get_batched_descriptions()
+            self._cache_descriptions(requested_descriptions)
+            description_for_url.update(
+                zip(self.image_urls, requested_descriptions))
+
+        return [description_for_url[url] for url in image_urls]
+
+    def _get_batched_descriptions(self):
+        ''' describes the images through the batcher shared by
+        all requests so that images of concurrent pages are sent
+        together and an image is only sent once
+        '''
+        futures = [
+            VISION_ANNOTATE_BATCHER.submit(self.max_entities, url)
+            for url in self.image_urls]
+
+        image_descriptions = list()
+        for url, future in zip(self.image_urls, futures):
+            image_description, has_failed = future.result()
+            if has_failed:
+                self.failed_image_urls.add(url)
+            image_descriptions.append(image_description)
+        return image_descriptions
+
+    def _describe_images(self, image_urls):
+        ''' calls the api for the images and returns the description
+        of every image along with whether the api failed for it
+        '''
         self.image_urls = image_urls
 
         # split into batches based on batch size
+        self._choose_batch_size()
         self._split_into_batches()
 
         # make each request in a single thread
@@ -64,7 +135,67 @@ class ImageDescriptionRetriever:
 
         # we need to get the same order as
         # that of the given image_urls
-        return self._get_ordered_and_combined_request_responses()
+        return [
+            (image_description, url in self.failed_image_urls)
+            for url, image_description in zip(
+                image_urls,
+                self._get_ordered_and_combined_request_responses())]
+
+    @staticmethod
+    def get_empty_description():
+        ''' returns the description used for an
+        image the api could not describe
+        '''
+        return {
+            "label": "",
+            "entities": [""],
+            "has_caption": False
+        }
+
+    def _get_cache_key(self, url):
+        return "{}:{}".format(self.max_entities, normalize_url(url))
+
+    def _get_cached_descriptions(self, image_urls):
+        ''' returns a dict with the cached description
+        of the images which are in either cache
+        '''
+        key_for_url = {url: self._get_cache_key(url) for url in image_urls}
+        cached_descriptions = self.description_cache.get_many(
+            key_for_url.values())
+        cached_descriptions.update(self.description_error_cache.get_many(
+            key for key in key_for_url.values()
+            if key not in cached_descriptions))
+
+        return {url: cached_descriptions[key]
+                for url, key in key_for_url.items()
+                if key in cached_descriptions}
+
+    def _cache_descriptions(self, image_descriptions):
+        descriptions = dict()
+        error_descriptions = dict()
+        for url, description in zip(self.image_urls, image_descriptions):
+            if url in self.failed_image_urls:
+                error_descriptions[self._get_cache_key(url)] = description
+            else:
+                descriptions[self._get_cache_key(url)] = description
+
+        self.description_cache.put_many(descriptions)
+        self.description_error_cache.put_many(error_descriptions)
+
+    def _choose_batch_size(self):
+        ''' chooses the batch size so that the images are spread
+        over a few parallel requests - more of them while the
+        api is slow since then a batch takes longer to annotate
+        '''
+        recent_latency = VISION_API_CLIENT.metrics.recent_latency
+        parallelism = self.FAST_API_PARALLELISM
+        if recent_latency is not None \
+                and recent_latency >= self.SLOW_API_LATENCY:
+            parallelism = self.SLOW_API_PARALLELISM
+
+        self.batch_size = min(self.MAX_BATCH_SIZE, max(
+            self.MIN_BATCH_SIZE,
+            math.ceil(len(self.image_urls) / parallelism)))
 
     def _split_into_batches(self):
         self.image_url_batches = list()
@@ -72,26 +203,26 @@ class ImageDescriptionRetriever:
         i = 0
         while i < num_image_urls:
             self.image_url_batches.append(
-                self.image_urls[i:min(i + self.BATCH_SIZE, num_image_urls)]
+                self.image_urls[i:min(i + self.batch_size, num_image_urls)]
             )
-            i += self.BATCH_SIZE
+            i += self.batch_size
 
     def _make_concurrent_requests(self):
-        self.all_responses_list = list()
-        executor = cf.ThreadPoolExecutor(max_workers=4)
+        # the descriptions of every batch are stored at the
+        # index of the batch so they stay in the same order
+        self.all_responses_list = [None] * len(self.image_url_batches)
         future_list = [
-            executor.submit(
+            self.EXECUTOR.submit(
                 self._make_post_request,
                 self.image_url_batches[i],
                 i) for i in range(len(self.image_url_batches))]
         for future in cf.as_completed(future_list):
-            self.all_responses_list.append(future.result())
+            request_number, image_descriptions = future.result()
+            self.all_responses_list[request_number] = image_descriptions
 
     def _get_ordered_and_combined_request_responses(self):
-        # sort based on request number
-        self.all_responses_list.sort()
         image_descriptions = list()
-        for _, img_desc in self.all_responses_list:
+        for img_desc in self.all_responses_list:
             image_descriptions.extend(img_desc)
 
         return image_descriptions
@@ -106,14 +237,16 @@ class ImageDescriptionRetriever:
         json_data_for_post_request = json.dumps({
             "requests": image_requests
         })
-        response = requests.post(self.api_url, data=json_data_for_post_request)
-
-        if response.status_code != 200:
-            raise BadRequestError(response.status_code)
+        # retried and timed out by the shared client,
+        # raises BadRequestError if the request fails
+        response = VISION_API_CLIENT.post(
+            self.api_url, data=json_data_for_post_request)
 
         response = json.loads(response.content)
         image_descriptions = []
         for i in range(len(image_urls)):
+            if "error" in response["responses"][i]:
+                self.failed_image_urls.add(image_urls[i])
             image_descriptions.append(
                 {
                     "label": self._get_best_guess_label(
@@ -125,10 +258,7 @@ class ImageDescriptionRetriever:
 
                     "has_caption": self._get_text_annotation_is_below_limit(
                         response["responses"][i]
-                    ),
-
-                    "image_colors": self._get_top_colors_from_image(
-                        response["responses"][i])})
+                    )})
         return request_number, image_descriptions
 
     def _format_single_request(self, url: str) -> dict:
@@ -153,12 +283,9 @@ class ImageDescriptionRetriever:
                 },
                 {
                     "type": "TEXT_DETECTION"
-                },
-                {
-                    # only take top 3 colors
-                    "maxResults": 3,
-                    "type": "IMAGE_PROPERTIES"
                 }
+                # the colors of the images are found locally
+                # by summarization.image_color_detection
             ],
             "imageContext": {
                 "webDetectionParams": {
@@ -190,26 +317,6 @@ class ImageDescriptionRetriever:
                 for i in range(number_of_entities)
                 if "description" in web_entity_collection[i]]
 
-    def _get_rgb_tuple_from_color_dict(self, color_dict):
-        return (
-            color_dict["color"]["red"],
-            color_dict["color"]["green"],
-            color_dict["color"]["blue"]
-        )
-
-    def _get_top_colors_from_image(self, image_response):
-        if "imagePropertiesAnnotation" not in image_response:
-            return [(-1, -1, -1)]  # return no image color found
-        image_colors = list()
-
-        for color_dict in image_response[
-                "imagePropertiesAnnotation"]["dominantColors"]["colors"]:
-            image_colors.append(
-                self._get_rgb_tuple_from_color_dict(color_dict)
-            )
-
-        return image_colors
-
     def _get_word_count_from_text(self, text):
         # remove newline chars from text
         text = ' '.join(text.split('\n'))
@@ -222,3 +329,18 @@ class ImageDescriptionRetriever:
         return self._get_word_count_from_text(
             image_response["textAnnotation"][0]["description"]
         ) >= self.WORD_COUNT_TO_QUALIFY_AS_CAPTION
+
+
+def _describe_images(max_entities, image_urls):
+    return ImageDescriptionRetriever(max_entities)._describe_images(
+        image_urls)
+
+
+# collects the images of concurrent pages for a few milliseconds,
+# each batch is split into api requests by the retriever
+VISION_ANNOTATE_BATCHER = RequestBatcher(
+    _describe_images,
+    max_batch_size=ImageDescriptionRetriever.MAX_BATCH_SIZE
+    * ImageDescriptionRetriever.FAST_API_PARALLELISM,
+    max_wait=0.005,
+    name='vision-annotate-batcher')
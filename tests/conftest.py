@@ -0,0 +1,16 @@
+"""Shared pytest configuration for the stampify tests"""
+
+import pytest
+
+from utils.cache_utils import CACHE_DIR_VARIABLE
+
+
+@pytest.fixture(autouse=True, scope='session')
+def cache_dir(tmp_path_factory):
+    """Keeps the on-disk caches of the tests out of the real cache"""
+
+    monkeypatch = pytest.MonkeyPatch()
+    cache_path = tmp_path_factory.mktemp('stampify_cache')
+    monkeypatch.setenv(CACHE_DIR_VARIABLE, str(cache_path))
+    yield cache_path
+    monkeypatch.undo()
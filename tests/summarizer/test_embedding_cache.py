@@ -0,0 +1,92 @@
+"""
+    This script is for unit testing of the embedding cache
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import numpy as np
+
+from summarization.embedding_cache import (CachedSentenceEncoder,
+                                           EmbeddingCache)
+
+DIMENSION = 4
+
+
+class CountingModel:
+    ''' Deterministic stand-in for a SentenceTransformer'''
+
+    def __init__(self):
+        self.encoded_batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, sentences):
+        self.encoded_batches.append(list(sentences))
+        return [np.full(DIMENSION, len(sentence), dtype=np.float32)
+                for sentence in sentences]
+
+
+def _get_encoder(tmp_path, model=None, disk_capacity=8):
+    model = model or CountingModel()
+    embedding_cache = EmbeddingCache(
+        'model', DIMENSION, disk_capacity=disk_capacity,
+        cache_dir=str(tmp_path))
+    return CachedSentenceEncoder(model, 'model', embedding_cache)
+
+
+def test_only_missing_texts_are_sent_to_model(tmp_path):
+    encoder = _get_encoder(tmp_path)
+
+    encoder.encode(['Person', 'a dog'])
+    embeddings = encoder.encode(['a  dog', 'Person', 'a cat', 'a cat'])
+
+    # whitespace is normalized and duplicates are encoded once
+    assert encoder.model.encoded_batches \
+        == [['Person', 'a dog'], ['a cat']]
+    assert embeddings.shape == (4, DIMENSION)
+    assert embeddings.dtype == np.float32
+    np.testing.assert_array_equal(embeddings[:, 0], [5, 6, 5, 5])
+    np.testing.assert_array_equal(encoder.encode('a cat'), [5] * DIMENSION)
+
+
+def test_embeddings_are_shared_through_disk(tmp_path):
+    first_encoder = _get_encoder(tmp_path)
+    first_encoder.encode(['Person', 'a dog'])
+
+    # a fresh memory tier, as in another process
+    second_encoder = _get_encoder(tmp_path)
+    embeddings = second_encoder.encode(['a dog', 'Person'])
+
+    assert second_encoder.model.encoded_batches == []
+    np.testing.assert_array_equal(embeddings[:, 0], [5, 6])
+
+
+def test_oldest_embeddings_are_overwritten_on_disk(tmp_path):
+    _get_encoder(tmp_path, disk_capacity=2).encode(['a', 'bb', 'ccc'])
+
+    encoder = _get_encoder(tmp_path, disk_capacity=2)
+    encoder.encode(['a', 'bb', 'ccc'])
+
+    assert encoder.model.encoded_batches == [['a']]
+
+
+def test_empty_input_has_embedding_dimension(tmp_path):
+    encoder = _get_encoder(tmp_path)
+
+    assert encoder.encode([]).shape == (0, DIMENSION)
+    assert encoder.model.encoded_batches == []
+
+
+def test_cleared_embeddings_are_encoded_again(tmp_path):
+    encoder = _get_encoder(tmp_path)
+    encoder.encode(['Person', 'a dog'])
+    encoder.embedding_cache.clear()
+    encoder.encode(['Person'])
+
+    # the disk tier is cleared for the other processes too
+    other_encoder = _get_encoder(tmp_path)
+    other_encoder.encode(['a dog'])
+
+    assert encoder.model.encoded_batches \
+        == [['Person', 'a dog'], ['Person']]
+    assert other_encoder.model.encoded_batches == [['a dog']]
@@ -0,0 +1,54 @@
+"""
+    This script is for unit testing of the embedding planner
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import numpy as np
+
+from summarization.embedding_planner import EmbeddingPlanner
+
+DIMENSION = 3
+
+
+class CountingModel:
+    ''' Deterministic stand-in for a SentenceTransformer'''
+
+    def __init__(self):
+        self.encoded_batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, sentences):
+        self.encoded_batches.append(list(sentences))
+        return [np.full(DIMENSION, len(sentence), dtype=np.float32)
+                for sentence in sentences]
+
+
+def test_texts_are_encoded_once_and_scattered_back():
+    model = CountingModel()
+    planner = EmbeddingPlanner(model)
+
+    planner.add_texts("summary", ["a dog runs", "Person"])
+    planner.add_texts("media", ["Person", "", " ", "cat"])
+    planner.add_texts("quotes", [])
+    planner.encode()
+
+    # one call, without duplicates or empty texts, longest first
+    assert model.encoded_batches == [["a dog runs", "Person", "cat"]]
+
+    np.testing.assert_array_equal(
+        planner.get_embeddings("summary")[:, 0], [10, 6])
+    np.testing.assert_array_equal(
+        planner.get_embeddings("media")[:, 0], [6, 0, 0, 3])
+    assert planner.get_embeddings("quotes").shape == (0, DIMENSION)
+
+
+def test_model_is_not_called_without_texts():
+    model = CountingModel()
+    planner = EmbeddingPlanner(model)
+
+    planner.add_texts("media", [""])
+
+    assert planner.get_embeddings("media").shape == (1, DIMENSION)
+    assert model.encoded_batches == []
@@ -0,0 +1,98 @@
+"""
+    This script is for unit testing of the image color detection
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from summarization.image_color_detection import (NO_IMAGE_COLORS,
+                                                 ImageColorRetriever,
+                                                 get_dominant_colors)
+from tests.test_extraction.local_http_server import LocalHttpServer
+from utils.persistent_cache import PersistentCache
+
+RED = (200, 10, 10)
+BLUE = (10, 10, 200)
+GREEN = (10, 200, 10)
+
+
+def get_png_body(size, colors_with_rows):
+    image = Image.new("RGB", size)
+    row = 0
+    for color, row_count in colors_with_rows:
+        image.paste(color, (0, row, size[0], row + row_count))
+        row += row_count
+    body = io.BytesIO()
+    image.save(body, format="PNG")
+    return body.getvalue()
+
+
+def get_color_retriever(tmp_path):
+    database_path = str(tmp_path / "cache.sqlite3")
+    return ImageColorRetriever(
+        color_cache=PersistentCache(
+            "colors", ttl=60, max_entries=10, database_path=database_path),
+        color_error_cache=PersistentCache(
+            "errors", ttl=60, max_entries=10, database_path=database_path))
+
+
+def test_dominant_colors_are_ordered_by_share_of_pixels():
+    pixels = np.array([BLUE] * 30 + [RED] * 60 + [GREEN] * 10)
+
+    assert get_dominant_colors(pixels, 3) == [RED, BLUE, GREEN]
+
+
+def test_dominant_colors_of_a_single_color():
+    pixels = np.array([RED] * 50)
+
+    assert get_dominant_colors(pixels, 3) == [RED]
+    assert get_dominant_colors(np.empty((0, 3)), 3) == NO_IMAGE_COLORS
+
+
+def test_colors_are_found_from_a_downloaded_image(tmp_path):
+    color_retriever = get_color_retriever(tmp_path)
+    with LocalHttpServer() as server:
+        server.add_response(
+            "/image.png",
+            get_png_body((300, 200), [(GREEN, 30), (RED, 120), (BLUE, 50)]))
+        server.add_response("/broken.png", b"not an image")
+        image_urls = [server.get_url("/image.png"),
+                      server.get_url("/broken.png"),
+                      server.get_url("/missing.png")]
+
+        image_colors = color_retriever.get_colors_for_images(image_urls)
+        # downscaling blends the pixels at the borders of the colors
+        assert np.allclose(image_colors[0], [RED, BLUE, GREEN], atol=8)
+        assert image_colors[1:] == [NO_IMAGE_COLORS, NO_IMAGE_COLORS]
+
+        # every image is downloaded once
+        assert color_retriever.get_colors_for_images(image_urls) \
+            == image_colors
+        assert len(server.requests) == 3
+
+
+def test_non_http_urls_have_no_colors(tmp_path):
+    color_retriever = get_color_retriever(tmp_path)
+
+    assert color_retriever.get_colors_for_images(
+        ["data:image/png;base64,AAAA"]) == [NO_IMAGE_COLORS]
+
+
+def test_slowly_dripped_image_times_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(ImageColorRetriever, "MAX_DOWNLOAD_TIME", 1)
+    color_retriever = get_color_retriever(tmp_path)
+    with LocalHttpServer() as server:
+        # every byte comes before the read timeout
+        server.add_response(
+            "/drip.png", get_png_body((8, 8), [(RED, 8)]), drip_delay=0.2)
+
+        start_time = time.perf_counter()
+        image_colors = color_retriever.get_colors_for_images(
+            [server.get_url("/drip.png")])
+
+    assert time.perf_counter() - start_time < 3
+    assert image_colors == [NO_IMAGE_COLORS]
@@ -1,10 +1,13 @@
 import json
+import time
 from unittest.mock import Mock, patch
 
 import pytest
 
 from error.stampifier_error import BadRequestError
-from summarization.web_entity_detection import ImageDescriptionRetriever
+from summarization.web_entity_detection import (VISION_API_CLIENT,
+                                                ImageDescriptionRetriever)
+from utils.persistent_cache import PersistentCache
 
 
 def mocked_requests_post(*args, **kwargs):
@@ -104,7 +107,7 @@ def mocked_requests_post(*args, **kwargs):
 
 
 @patch(
-    "summarization.web_entity_detection.requests.post",
+    "requests.Session.post",
     side_effect=mocked_requests_post)
 def test_request_format(mocked_post):
     image_describer = ImageDescriptionRetriever(1)
@@ -129,8 +132,8 @@ def test_request_format(mocked_post):
     assert "type" in formatted_request["features"][1]
     assert formatted_request["features"][1]["type"] == "TEXT_DETECTION"
 
-    assert "type" in formatted_request["features"][2]
-    assert formatted_request["features"][2]["type"] == "IMAGE_PROPERTIES"
+    # the colors are found locally
+    assert len(formatted_request["features"]) == 2
 
     assert "imageContext" in formatted_request
     assert isinstance(formatted_request["imageContext"], dict)
@@ -146,7 +149,7 @@ def test_request_format(mocked_post):
 
 
 @ patch(
-    "summarization.web_entity_detection.requests.post",
+    "requests.Session.post",
     side_effect=mocked_requests_post)
 def test_web_entity_detection(mocked_post):
     image_describer = ImageDescriptionRetriever(1)
@@ -156,25 +159,22 @@ def test_web_entity_detection(mocked_post):
     assert "sundar pichai" in reponse_for_image_url_1["label"]
     assert "sundar pichai Alphabet" in reponse_for_image_url_1["entities"]
     assert reponse_for_image_url_1["has_caption"]
-    assert reponse_for_image_url_1["image_colors"] == [(0, 0, 0)] * 3
 
     reponse_for_image_url_2 = image_describer.get_description_for_images(
         ["https://tinyurl.com/y9bvoehm"])[0]
     assert "larry page" in reponse_for_image_url_2["label"]
     assert "larry page google" in reponse_for_image_url_2["entities"]
     assert not reponse_for_image_url_2["has_caption"]
-    assert reponse_for_image_url_2["image_colors"] == [(1, 1, 1)] * 3
 
     reponse_for_image_url_3 = image_describer.get_description_for_images(
         ["https://tinyurl.com/y9t35t3z"])[0]
     assert "sergey brin" in reponse_for_image_url_3["label"]
     assert "sergey brin google" in reponse_for_image_url_3["entities"]
     assert not reponse_for_image_url_3["has_caption"]
-    assert reponse_for_image_url_3["image_colors"] == [(2, 2, 2)] * 3
 
 
 @ patch(
-    "summarization.web_entity_detection.requests.post",
+    "requests.Session.post",
     side_effect=mocked_requests_post)
 def test_bad_request(mocked_post):
     image_describer = ImageDescriptionRetriever(1)
@@ -237,16 +237,42 @@ def test_url_batch_splitting_for_multiple_of_batch_size_plus_one():
 
 def test_request_ordering():
     image_describer = ImageDescriptionRetriever(3)
-    image_describer.all_responses_list = list()
-    image_describer.all_responses_list.extend(
-        [(1, ["one"]), (0, ["zero"]), (2, ["two"])]
-    )
+    image_describer.image_url_batches = [["zero"], ["one"], ["two"]]
+
+    def slow_post_request(image_urls, request_number):
+        # the first batches finish last
+        time.sleep(0.05 * (3 - request_number))
+        return request_number, image_urls
+
+    with patch.object(image_describer, "_make_post_request",
+                      side_effect=slow_post_request):
+        image_describer._make_concurrent_requests()
+
     assert image_describer._get_ordered_and_combined_request_responses() == \
         ["zero", "one", "two"]
 
 
+def test_batch_size_adapts_to_image_count_and_api_latency():
+    image_describer = ImageDescriptionRetriever(3)
+
+    with patch.object(VISION_API_CLIENT.metrics, "recent_latency", 0.5):
+        image_describer.image_urls = ["url"] * 20
+        image_describer._choose_batch_size()
+        assert image_describer.batch_size == 10
+
+        image_describer.image_urls = ["url"] * 100
+        image_describer._choose_batch_size()
+        assert image_describer.batch_size \
+            == ImageDescriptionRetriever.MAX_BATCH_SIZE
+
+    with patch.object(VISION_API_CLIENT.metrics, "recent_latency", 5):
+        image_describer.image_urls = ["url"] * 20
+        image_describer._choose_batch_size()
+        assert image_describer.batch_size == 5
+
+
 @ patch(
-    "summarization.web_entity_detection.requests.post",
+    "requests.Session.post",
     side_effect=mocked_requests_post)
 def test_request_number(mocked_post):
     image_describer = ImageDescriptionRetriever(1)
@@ -262,13 +288,28 @@ def test_request_number(mocked_post):
 
 
 @ patch(
-    "summarization.web_entity_detection.requests.post",
+    "requests.Session.post",
     side_effect=mocked_requests_post)
-def test_default_response_with_no_colors(mocked_post):
-    image_describer = ImageDescriptionRetriever(1)
-
-    image_response = image_describer.get_description_for_images(
-        ["img_url_with_no_image_color_annotation"]
-    )[0]
-
-    assert image_response["image_colors"] == [(-1, -1, -1)]
+def test_only_uncached_images_are_requested(mocked_post, tmp_path):
+    database_path = str(tmp_path / "cache.sqlite3")
+    image_describer = ImageDescriptionRetriever(
+        1,
+        description_cache=PersistentCache(
+            "descriptions", ttl=60, max_entries=10,
+            database_path=database_path),
+        description_error_cache=PersistentCache(
+            "errors", ttl=60, max_entries=10, database_path=database_path))
+
+    image_describer.get_description_for_images(
+        ["https://tinyurl.com/y9bvoehm"])
+    image_responses = image_describer.get_description_for_images(
+        ["HTTPS://tinyurl.com/y9bvoehm#top",
+         "img_url_with_no_image_color_annotation"])
+
+    assert mocked_post.call_count == 2
+    assert json.loads(mocked_post.call_args[1]["data"])["requests"][0][
+        "image"]["source"]["imageUri"] \
+        == "img_url_with_no_image_color_annotation"
+    assert image_responses[0]["label"] == "larry page"
+    assert image_responses[1]["label"] == ""
+    assert image_describer.description_cache.get_stats()["hits"] == 1
@@ -0,0 +1,49 @@
+"""
+    This script is for unit testing of the image filter
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+from data_models.image import Image
+from summarization.image_filtering import ImageFilter
+
+
+def get_image(url, width=0, height=0):
+    return Image(url, height, width, False)
+
+
+def test_trackers_icons_and_tiny_images_are_filtered():
+    images = [
+        get_image("https://example.com/photo.jpg", 800, 600),
+        get_image("https://example.com/p.gif", 1, 1),
+        get_image("https://stats.g.doubleclick.net/r/collect?v=1"),
+        get_image("https://www.facebook.com/tr?id=1&ev=PageView"),
+        get_image("https://example.com/static/icons/share.png"),
+        get_image("https://example.com/site-logo.png", 200, 50),
+        get_image("https://example.com/favicon.ico"),
+        get_image("https://example.com/thumbnail.jpg", 40, 40),
+        get_image("https://example.com/unknown-size.jpg")
+    ]
+
+    kept_images = ImageFilter().filter_images(images)
+
+    assert kept_images == [images[0], images[-1]]
+    assert [image.filter_reason for image in images] == [
+        None, "tracker", "tracker", "tracker", "icon", "icon", "icon",
+        "tiny image", None]
+
+
+def test_largest_cdn_variant_is_kept():
+    images = [
+        get_image("https://cdn.example.com/photo.jpg?w=300&q=80", 300, 200),
+        get_image("https://cdn.example.com/photo.jpg?w=1200", 1200, 800),
+        get_image("https://cdn.example.com/photo-300x200.jpg", 300, 200),
+        get_image("https://cdn.example.com/photo.jpg?id=2"),
+        get_image("https://CDN.example.com/photo.jpg?w=1200#top")
+    ]
+
+    kept_images = ImageFilter().filter_images(images)
+
+    assert kept_images == [images[1], images[3]]
+    assert images[0].filter_reason == images[2].filter_reason \
+        == images[4].filter_reason \
+        == "duplicate of https://cdn.example.com/photo.jpg?w=1200"
@@ -0,0 +1,85 @@
+"""
+    This script is for unit testing of the model registry
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import threading
+
+from summarization.model_registry import ModelRegistry
+
+
+def test_model_is_loaded_once_and_shared():
+    registry = ModelRegistry()
+    load_count = []
+
+    def loader():
+        load_count.append(1)
+        return object()
+
+    registry.register_loader("model", loader)
+
+    assert not registry.is_loaded("model")
+    first_model = registry.get_model("model")
+    second_model = registry.get_model("model")
+
+    assert first_model is second_model
+    assert registry.is_loaded("model")
+    assert len(load_count) == 1
+
+
+def test_concurrent_requests_load_model_once():
+    registry = ModelRegistry()
+    load_count = []
+    loader_started = threading.Event()
+    release_loader = threading.Event()
+
+    def slow_loader():
+        load_count.append(1)
+        loader_started.set()
+        release_loader.wait(5)
+        return object()
+
+    registry.register_loader("model", slow_loader)
+
+    models = []
+    threads = [
+        threading.Thread(
+            target=lambda: models.append(registry.get_model("model")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+
+    loader_started.wait(5)
+    release_loader.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(load_count) == 1
+    assert len(models) == 8
+    assert all(model is models[0] for model in models)
+
+
+def test_warm_up_loads_all_registered_models():
+    registry = ModelRegistry()
+    registry.register_loader(ModelRegistry.SENTENCE_EMBEDDING, object)
+    registry.register_loader(ModelRegistry.BERT_SUMMARIZER, object)
+    registry.register_loader("extra", object)
+
+    registry.warm_up()
+
+    assert registry.is_loaded(ModelRegistry.SENTENCE_EMBEDDING)
+    assert registry.is_loaded(ModelRegistry.BERT_SUMMARIZER)
+    assert registry.is_loaded("extra")
+
+
+def test_warm_up_skips_lazy_models():
+    registry = ModelRegistry()
+    registry.register_loader(ModelRegistry.SENTENCE_EMBEDDING, object)
+    registry.register_loader(ModelRegistry.BERT_SUMMARIZER, object)
+    registry.register_loader("lazy", object, warm_up=False)
+
+    registry.warm_up()
+
+    assert not registry.is_loaded(ModelRegistry.SPACY_NER)
+    assert not registry.is_loaded("lazy")
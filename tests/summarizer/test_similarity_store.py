@@ -0,0 +1,79 @@
+"""
+    This script is for unit testing of the similarity store
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from data_models.image import Image
+from summarization.sentence_with_attributes import SentenceWithAttributes
+from summarization.text_media_matching.similarity_store import \
+    SimilarityStore
+
+RANDOM_STATE = np.random.RandomState(0)
+
+
+def get_sentences(count):
+    return [SentenceWithAttributes(
+        "sentence {}".format(index), index, 0, 1.0, None,
+        RANDOM_STATE.randn(8)) for index in range(count)]
+
+
+def get_images(count):
+    images = list()
+    for index in range(count):
+        image = Image("image {}".format(index), 0, 0, False)
+        image.img_description_embedding = RANDOM_STATE.randn(8)
+        image.img_attribute_embedding = RANDOM_STATE.randn(8)
+        images.append(image)
+    return images
+
+
+def get_expected_matrix(sentences, images):
+    sentence_embeddings = [sentence.embedding for sentence in sentences]
+    return np.maximum(
+        cosine_similarity(
+            sentence_embeddings,
+            [image.img_description_embedding for image in images]),
+        cosine_similarity(
+            sentence_embeddings,
+            [image.img_attribute_embedding for image in images]))
+
+
+def test_similarity_matrix_is_the_maximum_cosine_similarity():
+    sentences = get_sentences(4)
+    images = get_images(3)
+    similarity_store = SimilarityStore(images)
+
+    assert np.allclose(
+        similarity_store.get_similarity_matrix(sentences, images),
+        get_expected_matrix(sentences, images))
+
+
+def test_subsets_are_sliced_from_the_matrix_of_their_sentences():
+    sentences = get_sentences(5)
+    title_sentences = get_sentences(2)
+    images = get_images(4)
+    similarity_store = SimilarityStore(images)
+
+    similarity_store.get_similarity_matrix(sentences, images)
+    similarity_store.get_similarity_matrix(title_sentences, images)
+    sentence_subset = [sentences[3], sentences[0]]
+    image_subset = [images[2], images[1], images[3]]
+
+    assert np.allclose(
+        similarity_store.get_similarity_matrix(sentence_subset, image_subset),
+        get_expected_matrix(sentence_subset, image_subset))
+    # the subset did not need a new matrix
+    assert len(similarity_store.similarity_matrices) == 2
+
+
+def test_media_unknown_to_the_store_are_compared_directly():
+    sentences = get_sentences(2)
+    images = get_images(3)
+    similarity_store = SimilarityStore(images[:2])
+
+    assert np.allclose(
+        similarity_store.get_similarity_matrix(sentences, images),
+        get_expected_matrix(sentences, images))
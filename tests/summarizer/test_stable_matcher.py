@@ -1,3 +1,10 @@
+"""
+    This script is for unit testing of the stable matcher
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import numpy as np
+
 from summarization.text_media_matching import stable_matcher
 
 
@@ -17,3 +24,36 @@ def test_stable_matching():
     expected_matching = [(0, 0), (3, 1), (2, 2), (1, 3)]
     actual_matching = stable_matcher_util.get_matching()
     assert expected_matching == actual_matching
+
+
+def test_stable_matching_of_numpy_preferences_is_stable():
+    ''' Tests that no sentence and media prefer each
+    other to the contents they are matched with
+    '''
+    random_state = np.random.RandomState(0)
+    set_size = 40
+    media_preference_for_sentence = np.array(
+        [random_state.permutation(set_size) for _ in range(set_size)])
+    sentence_preference_for_media = np.array(
+        [random_state.permutation(set_size) for _ in range(set_size)])
+
+    matching = stable_matcher.StableMatcher(
+        media_preference_for_sentence,
+        sentence_preference_for_media,
+        set_size).get_matching()
+
+    assert matching == stable_matcher.StableMatcher(
+        media_preference_for_sentence.tolist(),
+        sentence_preference_for_media.tolist(),
+        set_size).get_matching()
+
+    sentence_for_media = {media: sentence for sentence, media in matching}
+    media_for_sentence = {sentence: media for sentence, media in matching}
+    assert sorted(media_for_sentence) == list(range(set_size))
+    for media in range(set_size):
+        media_preference = list(sentence_preference_for_media[media])
+        for sentence in media_preference[
+                :media_preference.index(sentence_for_media[media])]:
+            sentence_preference = list(media_preference_for_sentence[sentence])
+            assert sentence_preference.index(media_for_sentence[sentence]) \
+                < sentence_preference.index(media)
@@ -1,6 +1,9 @@
 ''' Test for summarizer.py '''
+import numpy as np
+
 from data_models.image import Image
 from data_models.preprocessed_contents import PreprocessedContents
+from summarization.sentence_with_attributes import SentenceWithAttributes
 from summarization.summarizer import Summarizer
 
 
@@ -51,3 +54,38 @@ def test_capping_method_is_chosen_as_interesting_sequence_picker():
         "stamp_page"] * (page_limit + 1)  # just above limit
     summarizer._set_capping_method()
     assert summarizer.capping_method == summarizer.INTERESTING_SEQUENCE_PICKER
+
+
+def test_contents_embeddings_are_views_of_normalized_matrices():
+    sentences = [
+        SentenceWithAttributes("sentence {}".format(index), index, 0, 1.0,
+                               None, np.array([3.0, 4.0]) * (index + 1))
+        for index in range(3)]
+    image = Image(None, None, None, None)
+    image.img_description_embedding = np.array([0.0, 2.0])
+
+    preprocessed_contents = PreprocessedContents(
+        [], sentences, [image], [], [])
+
+    normal_text_embeddings = preprocessed_contents.get_embedding_matrix(
+        preprocessed_contents.NORMAL_TEXT_EMBEDDINGS)
+    assert normal_text_embeddings.dtype == np.float32
+    assert np.allclose(normal_text_embeddings, [[0.6, 0.8]] * 3)
+    assert [sentence.embedding_index for sentence in sentences] == [0, 1, 2]
+    assert sentences[1].embedding.base is normal_text_embeddings
+
+    # following rows are a view, other rows are copied
+    assert preprocessed_contents.get_embedding_matrix(
+        preprocessed_contents.NORMAL_TEXT_EMBEDDINGS,
+        sentences[1:]).base is normal_text_embeddings
+    assert np.array_equal(
+        preprocessed_contents.get_embedding_matrix(
+            preprocessed_contents.NORMAL_TEXT_EMBEDDINGS,
+            [sentences[2], sentences[0]]),
+        normal_text_embeddings[[2, 0]])
+
+    # the missing attribute embedding is a row of zeros
+    assert image.img_attribute_embedding is None
+    assert np.array_equal(
+        preprocessed_contents.get_embedding_matrix(
+            preprocessed_contents.MEDIA_ATTRIBUTE_EMBEDDINGS), [[0, 0]])
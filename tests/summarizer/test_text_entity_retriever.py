@@ -3,8 +3,14 @@ from unittest.mock import Mock, patch
 
 import pytest
 
-from error.stampifier_error import BadRequestError
-from summarization.text_entity_detection import TextEntityRetriever
+from error.stampifier_error import (ApiUnavailableError, BadRequestError,
+                                    IncorrectInputError)
+from summarization.model_registry import MODEL_REGISTRY
+from summarization.text_entity_detection import (LocalTextEntityRetriever,
+                                                 ParagraphEntityRetriever,
+                                                 TextEntityRetriever,
+                                                 get_entity_retriever)
+from utils.persistent_cache import PersistentCache
 
 
 def mocked_requests_post(*args, **kwargs):
@@ -41,7 +47,7 @@ def mocked_requests_post(*args, **kwargs):
 
 
 @patch(
-    'summarization.text_entity_detection.requests.post',
+    'requests.Session.post',
     side_effect=mocked_requests_post)
 def test_text_entity_retriever_request_format(mocked_post):
     text_entity_retriever = TextEntityRetriever()
@@ -59,7 +65,7 @@ def test_text_entity_retriever_request_format(mocked_post):
 
 
 @patch(
-    'summarization.text_entity_detection.requests.post',
+    'requests.Session.post',
     side_effect=mocked_requests_post)
 def test_text_entity_retriever_on_person_entity(mocked_post):
     text_entity_retriever = TextEntityRetriever()
@@ -70,7 +76,7 @@ def test_text_entity_retriever_on_person_entity(mocked_post):
 
 
 @patch(
-    'summarization.text_entity_detection.requests.post',
+    'requests.Session.post',
     side_effect=mocked_requests_post)
 def test_text_entity_retriever_on_organization_entity(mocked_post):
     text_entity_retriever = TextEntityRetriever()
@@ -81,7 +87,7 @@ def test_text_entity_retriever_on_organization_entity(mocked_post):
 
 
 @patch(
-    'summarization.text_entity_detection.requests.post',
+    'requests.Session.post',
     side_effect=mocked_requests_post)
 def test_text_entity_retriever_on_other_entity(mocked_post):
     text_entity_retriever = TextEntityRetriever()
@@ -92,7 +98,7 @@ def test_text_entity_retriever_on_other_entity(mocked_post):
 
 
 @patch(
-    'summarization.text_entity_detection.requests.post',
+    'requests.Session.post',
     side_effect=mocked_requests_post)
 def test_text_entity_retriever_on_no_entity(mocked_post):
     text_entity_retriever = TextEntityRetriever()
@@ -103,7 +109,7 @@ def test_text_entity_retriever_on_no_entity(mocked_post):
 
 
 @patch(
-    'summarization.text_entity_detection.requests.post',
+    'requests.Session.post',
     side_effect=mocked_requests_post)
 def test_text_entity_retriever_bad_request_throws_error(mocked_post):
     with pytest.raises(BadRequestError) as error:
@@ -111,3 +117,181 @@ def test_text_entity_retriever_bad_request_throws_error(mocked_post):
         text_entity_retriever.get_entities_from_text("")
         assert error.message \
             == "The API call was unsuccessful with response code: 400"
+
+
+class FakeSpacyEntity:
+    def __init__(self, text, label_):
+        self.text = text
+        self.label_ = label_
+
+
+def fake_spacy_ner_model(text):
+    entities = {
+        "Sundar Pichai": [FakeSpacyEntity("Sundar Pichai", "PERSON")],
+        "Google in 1998": [FakeSpacyEntity("Google", "ORG"),
+                           FakeSpacyEntity("1998", "DATE")],
+        "in the morning": [FakeSpacyEntity("the morning", "TIME")]
+    }
+    return Mock(ents=entities.get(text, []))
+
+
+@patch.object(MODEL_REGISTRY, "get_spacy_ner_model",
+              return_value=fake_spacy_ner_model)
+def test_local_retriever_maps_spacy_labels(mocked_model):
+    text_entity_retriever = LocalTextEntityRetriever()
+
+    assert text_entity_retriever.get_entities_from_text("Google in 1998") \
+        == ["Google", "1998"]
+    # TIME is mapped to OTHER and skipped
+    assert text_entity_retriever.get_entities_from_text(
+        "in the morning") == []
+
+
+@patch.object(MODEL_REGISTRY, "get_spacy_ner_model",
+              return_value=fake_spacy_ner_model)
+@patch(
+    'requests.Session.post',
+    side_effect=mocked_requests_post)
+def test_local_retriever_is_used_when_remote_fails(mocked_post, mocked_model):
+    text_entity_retriever = get_entity_retriever(
+        "remote-with-local-fallback")
+
+    assert text_entity_retriever.get_entities_from_text("Google") \
+        == ["Google"]
+    # the mocked api fails for this text
+    assert text_entity_retriever.get_entities_from_text("Google in 1998") \
+        == ["Google", "1998"]
+    assert mocked_post.call_count == 2
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(IncorrectInputError):
+        get_entity_retriever("unknown")
+
+
+def mocked_requests_post_with_mentions(*args, **kwargs):
+    ''' Returns an entity for every known name in the document,
+    with the utf-8 byte offsets of its mentions'''
+    content = json.loads(kwargs['data'])["document"]["content"]
+    encoded_content = content.encode("utf-8")
+    entities = list()
+    for name, entity_type in [("Sundar Pichai", "PERSON"),
+                              ("Google", "ORGANIZATION"),
+                              ("Zürich", "LOCATION"),
+                              ("search", "OTHER")]:
+        encoded_name = name.encode("utf-8")
+        mentions = list()
+        offset = encoded_content.find(encoded_name)
+        while offset != -1:
+            mentions.append({"text": {"content": name,
+                                      "beginOffset": offset}})
+            offset = encoded_content.find(encoded_name, offset + 1)
+        if mentions:
+            entities.append({"name": name, "type": entity_type,
+                             "mentions": mentions})
+    return Mock(status_code=200, content=json.dumps({"entities": entities}))
+
+
+@patch(
+    'requests.Session.post',
+    side_effect=mocked_requests_post_with_mentions)
+def test_entities_are_attributed_to_their_paragraphs(mocked_post):
+    text_entity_retriever = TextEntityRetriever()
+    paragraph_entities = text_entity_retriever.get_entities_from_paragraphs([
+        "Café in Zürich.",
+        "Google search.",
+        "No entity here.",
+        "Sundar Pichai runs Google."
+    ])
+
+    assert paragraph_entities == [
+        ["Zürich"], ["Google"], [], ["Sundar Pichai", "Google"]]
+    assert mocked_post.call_count == 1
+
+
+@patch(
+    'requests.Session.post',
+    side_effect=mocked_requests_post_with_mentions)
+def test_only_uncached_paragraphs_are_requested(mocked_post, tmp_path):
+    entity_cache = PersistentCache(
+        'test-paragraph-entities', ttl=60, max_entries=100,
+        database_path=str(tmp_path / 'cache.sqlite3'))
+    paragraph_entity_retriever = ParagraphEntityRetriever(
+        TextEntityRetriever(), entity_cache)
+
+    assert paragraph_entity_retriever.get_entities_from_paragraphs(
+        ["Google search.", "Sundar Pichai runs Google."]) \
+        == ["Google", "Sundar Pichai"]
+    assert mocked_post.call_count == 1
+
+    # whitespace does not change the paragraph
+    assert paragraph_entity_retriever.get_entities_from_paragraphs(
+        ["Café in Zürich.", "", "Sundar  Pichai runs Google."]) \
+        == ["Zürich", "Sundar Pichai", "Google"]
+    assert mocked_post.call_count == 2
+    sent_content = json.loads(
+        mocked_post.call_args[1]['data'])["document"]["content"]
+    assert sent_content == "Café in Zürich."
+
+    paragraph_entity_retriever.get_entities_from_paragraphs(
+        ["Café in Zürich.", "Google search."])
+    assert mocked_post.call_count == 2
+
+
+def mocked_requests_post_failing_once(*args, **kwargs):
+    ''' The api is unavailable for the first request only'''
+    if not mocked_requests_post_failing_once.has_failed:
+        mocked_requests_post_failing_once.has_failed = True
+        raise ApiUnavailableError("natural-language", "outage")
+    return mocked_requests_post_with_mentions(*args, **kwargs)
+
+
+@patch.object(MODEL_REGISTRY, "get_spacy_ner_model",
+              return_value=fake_spacy_ner_model)
+@patch(
+    'summarization.text_entity_detection.NATURAL_LANGUAGE_API_CLIENT.post',
+    side_effect=mocked_requests_post_failing_once)
+def test_fallback_entities_are_not_kept_once_the_api_is_back(
+        mocked_post, mocked_model, tmp_path):
+    mocked_requests_post_failing_once.has_failed = False
+    database_path = str(tmp_path / 'cache.sqlite3')
+    entity_cache = PersistentCache(
+        'test-paragraph-entities', ttl=60, max_entries=100,
+        database_path=database_path)
+    # the fallback entities have expired by the next call
+    fallback_entity_cache = PersistentCache(
+        'test-paragraph-fallback-entities', ttl=0, max_entries=100,
+        database_path=database_path)
+    paragraph_entity_retriever = ParagraphEntityRetriever(
+        get_entity_retriever("remote-with-local-fallback"),
+        entity_cache, fallback_entity_cache)
+
+    # the api fails, spaCy finds the entities
+    assert paragraph_entity_retriever.get_entities_from_paragraphs(
+        ["Google in 1998"]) == ["Google", "1998"]
+    assert mocked_post.call_count == 1
+
+    # the local entities are not cached as the api ones
+    assert fallback_entity_cache.stores == 1
+    assert entity_cache.stores == 0
+    assert paragraph_entity_retriever.get_entities_from_paragraphs(
+        ["Google in 1998"]) == ["Google"]
+    assert mocked_post.call_count == 2
+
+    # the api entities are cached
+    assert paragraph_entity_retriever.get_entities_from_paragraphs(
+        ["Google in 1998"]) == ["Google"]
+    assert mocked_post.call_count == 2
+
+
+@patch(
+    'requests.Session.post',
+    side_effect=mocked_requests_post)
+def test_endpoint_is_read_from_the_environment(mocked_post, monkeypatch):
+    monkeypatch.setenv("STAMPIFY_NATURAL_LANGUAGE_API_ENDPOINT",
+                       "http://127.0.0.1:8090/v1beta2/documents:analyzeEntities")  # noqa
+    text_entity_retriever = TextEntityRetriever()
+    text_entity_retriever.get_entities_from_text("Google")
+
+    assert mocked_post.call_args[0][0].startswith(
+        "http://127.0.0.1:8090/v1beta2/documents:analyzeEntities?key=")
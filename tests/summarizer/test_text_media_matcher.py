@@ -1,3 +1,8 @@
+"""
+    This script is for unit testing of the text media matcher
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
 from summarization.text_media_matching.text_media_matcher import \
     TextMediaMatcher
 from tests.summarizer.text_media_input_fetcher import fetch_text_media_input
@@ -77,3 +82,33 @@ def test_text_media_matcher_returns_empty_dict_when_both_are_empty():
 
     assert processed_contents_dict["matched_contents"] == []
     assert processed_contents_dict["unused_contents"] == []
+
+
+def test_optimal_assignment_matches_contents_without_pruning():
+    matcher = TextMediaMatcher(
+        [sentence_2],
+        [media_related_to_sentence_1, media_related_to_sentence_2],
+        matching_strategy=TextMediaMatcher.OPTIMAL_ASSIGNMENT
+    )
+    processed_contents_dict = matcher._get_matched_and_unmatched_contents()
+
+    assert processed_contents_dict['matched_contents'] == [
+        (sentence_2, media_related_to_sentence_2)]
+    assert processed_contents_dict['unused_contents'] == [
+        media_related_to_sentence_1]
+    assert processed_contents_dict['unused_content_type'] == "media"
+
+
+def test_optimal_assignment_returns_unused_sentences():
+    matcher = TextMediaMatcher(
+        [sentence_1, sentence_2],
+        [media_related_to_sentence_1],
+        "signed-difference",
+        TextMediaMatcher.OPTIMAL_ASSIGNMENT
+    )
+    processed_contents_dict = matcher._get_matched_and_unmatched_contents()
+
+    assert processed_contents_dict['matched_contents'] == [
+        (sentence_1, media_related_to_sentence_1)]
+    assert processed_contents_dict['unused_contents'] == [sentence_2]
+    assert processed_contents_dict['unused_content_type'] == "text"
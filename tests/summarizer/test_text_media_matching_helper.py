@@ -1,5 +1,7 @@
+import numpy as np
 import pytest
 
+from benchmarks.text_media_matching import get_random_contents
 from error.stampifier_error import IncorrectInputError
 from summarization.text_media_matching.text_media_matching_helper import \
     TextMediaMatchingHelper
@@ -56,3 +58,39 @@ def test_text_media_matching_helper_returns_correct_matching():
     actual_matching = helper.get_text_media_matching()
 
     assert actual_matching == expected_matching
+
+
+def test_text_media_matching_helper_keeps_index_order_for_equal_scores():
+    helper = TextMediaMatchingHelper(
+        [sentence_1, sentence_1],
+        [media_related_to_sentence_1, media_related_to_sentence_1]
+    )
+    helper._form_preference_matrix()
+
+    assert helper.media_preference_for_sentence == [[0, 1], [0, 1]]
+    assert helper.sentence_preference_for_media == [[0, 1], [0, 1]]
+
+
+@pytest.mark.parametrize(
+    "distance_metric_type", ["absolute-difference", "signed-difference"])
+def test_text_media_matching_helper_scores_match_cell_by_cell_scores(
+        distance_metric_type):
+    sentences, images = get_random_contents(
+        60, 32, np.random.RandomState(0))
+    helper = TextMediaMatchingHelper(sentences, images, distance_metric_type)
+    helper._cosine_similarity_preprocessing()
+    similarity_matrix = helper.similarity_matrix.copy()
+    helper._form_score_matrix()
+
+    for i, sentence in enumerate(sentences):
+        for j, image in enumerate(images):
+            signed_difference \
+                = image.content_index - sentence.get_weighted_index()
+            if distance_metric_type == "absolute-difference":
+                distance_score = 1.0 + abs(signed_difference)
+            else:
+                distance_score = signed_difference
+            with np.errstate(divide="ignore", invalid="ignore"):
+                score = (1.0 + similarity_matrix[i][j]) / distance_score
+            np.testing.assert_array_equal(
+                helper.similarity_matrix[i][j], score)
@@ -0,0 +1,89 @@
+"""
+    This script is for unit testing of the API stand-in of the benchmarks
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.api_stand_in import RECORD_MODE, REPLAY_MODE, ApiStandIn
+from summarization.web_entity_detection import (VISION_API_CLIENT,
+                                                VISION_ENDPOINT_VARIABLE,
+                                                ImageDescriptionRetriever)
+
+VISION_PATH = '/v1/images:annotate'
+
+
+class _VisionHandler(BaseHTTPRequestHandler):
+    """Labels every image with its url, like the Vision API would"""
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        body = json.loads(
+            self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.image_counts.append(len(body['requests']))
+        response = json.dumps({'responses': [{
+            'webDetection': {
+                'bestGuessLabels': [
+                    {'label': request['image']['source']['imageUri']}],
+                'webEntities': [{'description': 'entity'}]
+            }} for request in body['requests']]}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def _describe_images(image_urls):
+    retriever = ImageDescriptionRetriever()
+    descriptions = retriever._describe_images(image_urls)
+    return [description["label"] for description, _ in descriptions], \
+        retriever.batch_size
+
+
+def test_recordings_are_replayed_while_the_api_is_slow(tmp_path, monkeypatch):
+    monkeypatch.setenv('GOOGLE_CLOUD_API_KEY',
+                       base64.b64encode(b'key').decode('utf-8'))
+    # a slow api makes the retriever send smaller batches
+    slow_latency = 0.2
+    monkeypatch.setattr(
+        ImageDescriptionRetriever, 'SLOW_API_LATENCY', slow_latency)
+    monkeypatch.setattr(VISION_API_CLIENT.metrics, 'recent_latency', None)
+    image_urls = ['https://example.com/{}.jpg'.format(index)
+                  for index in range(6)]
+
+    upstream = ThreadingHTTPServer(('127.0.0.1', 0), _VisionHandler)
+    upstream.image_counts = list()
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    upstream_host = 'http://{}:{}'.format(*upstream.server_address[:2])
+    try:
+        with ApiStandIn(str(tmp_path), RECORD_MODE,
+                        upstream_hosts={VISION_PATH: upstream_host}) \
+                as stand_in:
+            monkeypatch.setenv(VISION_ENDPOINT_VARIABLE,
+                               stand_in.get_url(VISION_PATH))
+            labels, batch_size = _describe_images(image_urls)
+    finally:
+        upstream.shutdown()
+        upstream.server_close()
+
+    assert labels == image_urls
+    assert batch_size == 3
+    assert sum(upstream.image_counts) == 6
+
+    VISION_API_CLIENT.metrics.recent_latency = slow_latency
+    with ApiStandIn(str(tmp_path), REPLAY_MODE, latency=slow_latency) \
+            as stand_in:
+        monkeypatch.setenv(VISION_ENDPOINT_VARIABLE,
+                           stand_in.get_url(VISION_PATH))
+        labels, batch_size = _describe_images(image_urls)
+
+    assert labels == image_urls
+    assert batch_size == 2
+    assert stand_in.stats['replayed'] == 3
+    assert stand_in.stats['missing'] == 0
@@ -0,0 +1,72 @@
+"""
+    This script is for unit testing of pre_classifier
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import pytest
+
+from classification.pre_classifier import ContentCounts, PreClassifier
+from data_models.contents import Contents
+from data_models.embedded_tweet import ETweet
+from data_models.image import Image
+from data_models.quote import Quote
+from data_models.text import Text
+from error.stampifier_error import WebsiteNotStampifiableError
+
+
+def __contents(*content_list):
+    contents = Contents()
+    for content in content_list:
+        contents.add_content(content)
+    return contents
+
+
+def test_contents_are_counted_by_type():
+    contents = __contents(
+        Text('This is the Title!', 'title'),
+        Text('Important Tag!', 'h1'),
+        Image('image_url.jpg', 0, 0, False),
+        Image('image_url.gif', 0, 0, True),
+        ETweet('1234'),
+        Quote('quoted text', None)
+    )
+
+    content_counts = ContentCounts(contents)
+
+    assert content_counts.get_title_text_content_count() == 2
+    assert content_counts.get_normal_text_content_count() == 0
+    assert content_counts.get_media_content_count() == 2
+    assert content_counts.get_embedded_content_count() == 1
+    assert content_counts.get_quoted_content_count() == 1
+
+
+def test_long_important_text_is_not_title_text():
+    assert Text('a' * (Text.MAX_TITLE_LENGTH - 1), 'h2').is_title_text()
+    assert not Text('a' * Text.MAX_TITLE_LENGTH, 'h2').is_title_text()
+
+
+def test_page_with_enough_contents_is_stampifiable():
+    contents = __contents(
+        Text('This is the Title!', 'title'),
+        Image('image_url_1.jpg', 0, 0, False),
+        Image('image_url_2.jpg', 0, 0, False),
+        ETweet('1234'),
+    )
+    pre_classifier = PreClassifier(contents, 6, 'This is the Title!')
+
+    pre_classifier.classify()
+
+    assert pre_classifier.is_stampifiable
+
+
+def test_page_with_too_few_contents_is_rejected():
+    contents = __contents(
+        Text('This is the Title!', 'title'),
+        Image('image_url_1.jpg', 0, 0, False),
+    )
+    pre_classifier = PreClassifier(contents, 8, 'This is the Title!')
+
+    with pytest.raises(WebsiteNotStampifiableError) as error:
+        pre_classifier.classify()
+
+    assert 'PreClassifier' in error.value.message
@@ -0,0 +1,99 @@
+"""This is a helper utility which serves canned responses
+    from a local HTTP server for unit testing"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Replies to every GET with the response registered for its path"""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Writes the registered response, 404 if there is none"""
+
+        self.server.requests.append((self.path, dict(self.headers)))
+        response = self.server.responses.get(self.path)
+        if response is None:
+            self.send_error(404)
+            return
+
+        status, headers, body, delay, drip_delay = response
+
+        # answer conditional requests like a caching server would
+        etag = headers.get('ETag')
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        for name, value in headers.items():
+            if value is not None:
+                self.send_header(name, value)
+        if 'Content-Length' not in headers:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if delay:
+            time.sleep(delay)
+        try:
+            if drip_delay:
+                for index in range(len(body)):
+                    self.wfile.write(body[index:index + 1])
+                    self.wfile.flush()
+                    time.sleep(drip_delay)
+            else:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class LocalHttpServer:
+    """Runs a HTTP server on a free local port in a daemon thread
+
+    Usage:
+        with LocalHttpServer() as server:
+            server.add_response('/page', b'<html></html>')
+            requests.get(server.get_url('/page'))
+    """
+
+    def __init__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.responses = dict()
+        self._server.requests = list()
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def requests(self):
+        """(path, headers) of every request received so far"""
+        return self._server.requests
+
+    def add_response(self, path, body, status=200, headers=None, delay=0,
+                     drip_delay=0):
+        """Registers the response for a path, the body is written
+        after sleeping for delay seconds, one byte every drip_delay
+        seconds if it is given. A header with the value None
+        is not sent (for eg. to omit the Content-Length)"""
+
+        self._server.responses[path] = (
+            status, headers or {}, body, delay, drip_delay)
+
+    def get_url(self, path):
+        """Returns the absolute URL of the path on this server"""
+
+        host, port = self._server.server_address
+        return 'http://{}:{}{}'.format(host, port, path)
@@ -0,0 +1,70 @@
+"""
+    This script is for unit testing of boilerplate_pruner
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import re
+
+from bs4 import Comment
+
+from extraction import extractor
+from extraction.boilerplate_pruner import BoilerplatePruner
+from tests.test_extraction import unit_test_utils as test_utils
+
+__PRUNER = BoilerplatePruner(extractor.extra_tags,
+                             extractor.KEYWORDS,
+                             extractor.pattern_for_ads)
+
+
+def __prune_with_find_all(soup):
+    """Removes boilerplate by searching the tree once per rule"""
+
+    decomposable_tags = soup.find_all(extractor.extra_tags)
+    comments = soup.find_all(string=lambda text: isinstance(text, Comment))
+    ads = soup.find_all(class_=extractor.pattern_for_ads)
+
+    _ = [comment.extract() for comment in comments]
+    _ = [tag.decompose() for tag in decomposable_tags]
+    _ = [ad.decompose() for ad in ads]
+
+    for keyword in extractor.KEYWORDS:
+        _ = [_content.decompose() for _content in
+             soup.find_all(class_=re.compile('.*{}.*'.format(keyword)))]
+        _ = [_content.decompose() for _content in
+             soup.find_all(id=re.compile('.*{}.*'.format(keyword)))]
+
+
+def test_pruned_tree_is_same_as_find_all_pruning():
+    expected_soup = test_utils.soup('boilerplate.html')
+    __prune_with_find_all(expected_soup)
+
+    actual_soup = test_utils.soup('boilerplate.html')
+    __PRUNER.prune(actual_soup)
+
+    assert str(actual_soup) == str(expected_soup)
+
+
+def test_boilerplate_is_removed_and_content_is_kept():
+    soup = test_utils.soup('boilerplate.html')
+    __PRUNER.prune(soup)
+
+    assert soup.find('p', class_='p1')
+    assert soup.find('p', class_='text')
+    assert soup.find('figure', class_='image')
+    assert not soup.find(['script', 'style', 'nav', 'aside', 'noscript'])
+    assert not soup.find(id='comments-section')
+    assert not soup.find(class_='ad-slot')
+    assert not soup.find(string=lambda text: isinstance(text, Comment))
+
+
+def test_removal_counts_are_reported_per_reason():
+    soup = test_utils.soup('boilerplate.html')
+    removal_counts = __PRUNER.prune(soup)
+
+    # meta, style, script, header, nav, noscript, footer
+    assert removal_counts['tag'] == 7
+    assert removal_counts['comment'] == 2
+    # ad-slot, ads-container
+    assert removal_counts['ad'] == 2
+    # comments-section, share-buttons, related-posts
+    assert removal_counts['keyword'] == 3
@@ -0,0 +1,77 @@
+"""
+    This script is for unit testing of content_dispatcher
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import os
+
+import bs4
+import pytest
+
+from extraction.content_dispatcher import ContentExtractorDispatcher
+from extraction.extractor import CONTENT_EXTRACTOR_TYPES
+from tests.test_extraction import unit_test_utils as test_utils
+
+__TEST_INPUTS = sorted(
+    os.listdir('./tests/test_extraction/extraction_test_inputs/'))
+
+
+def __dispatcher():
+    return ContentExtractorDispatcher(
+        content_extractor_type()
+        for content_extractor_type in CONTENT_EXTRACTOR_TYPES)
+
+
+def __extract_with_all_extractors(dispatcher, node):
+    """Returns the content of the first extractor matching the node"""
+
+    for content_extractor in dispatcher.content_extractors:
+        content = content_extractor.validate_and_extract(node)
+        if content:
+            return content
+    return None
+
+
+def __extract_with_candidate_extractors(dispatcher, node):
+    for content_extractor \
+            in dispatcher.get_candidate_extractors(node):
+        content = content_extractor.validate_and_extract(node)
+        if content:
+            return content
+    return None
+
+
+def __content_as_dict(content):
+    if content is None:
+        return None
+    return dict(content.__dict__, content_type=type(content))
+
+
+@pytest.mark.parametrize("file_name", __TEST_INPUTS)
+def test_dispatched_extraction_matches_extraction_with_all_extractors(
+        file_name):
+    soup = test_utils.soup(file_name)
+    dispatcher = __dispatcher()
+
+    for node in soup.descendants:
+        assert __content_as_dict(
+            __extract_with_candidate_extractors(dispatcher, node)) \
+            == __content_as_dict(
+                __extract_with_all_extractors(dispatcher, node))
+
+
+def test_class_signature_candidates_keep_precedence():
+    soup = bs4.BeautifulSoup(
+        '<p class="twitter-tweet instagram-media">Text in a tweet</p>',
+        'lxml')
+
+    candidates = __dispatcher().get_candidate_extractors(soup.find('p'))
+
+    assert [type(candidate).__name__ for candidate in candidates] \
+        == ['TextExtractor', 'ETweetExtractor', 'EInstagramPostExtractor']
+
+
+def test_tags_without_extractor_have_no_candidates():
+    soup = bs4.BeautifulSoup('<div class="wrapper"></div>', 'lxml')
+
+    assert not __dispatcher().get_candidate_extractors(soup.find('div'))
@@ -0,0 +1,74 @@
+"""
+    This script is for unit testing of extractor
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import io
+
+from PIL import Image
+
+from extraction import extractor
+from tests.test_extraction.local_http_server import LocalHttpServer
+
+__DEPTH = 3000
+
+__DEEPLY_NESTED_HTML = '<html><head><title>Title</title></head><body>' \
+    + '<div>' * __DEPTH + '<p>Deeply nested text.</p>' + '</div>' * __DEPTH \
+    + '<img src="http://www.google.com/image.jpg"></body></html>'
+
+
+def test_deeply_nested_content_is_extracted():
+    with LocalHttpServer() as server:
+        server.add_response('/page', __DEEPLY_NESTED_HTML.encode('utf-8'),
+                            headers={'Content-Type': 'text/html'})
+        _extractor = extractor.Extractor(server.get_url('/page'))
+
+        content_list = _extractor.extract_html().content_list
+
+    assert [content.get_content_type() for content in content_list] \
+        == ['TEXT', 'TEXT', 'IMAGE']
+    assert content_list[1].text_string == 'Deeply nested text.'
+    assert _extractor.extractor_stats['TextExtractor']['hits'] == 1
+    assert _extractor.extractor_stats['ImageExtractor']['hits'] == 1
+    assert _extractor.extractor_stats['VideoExtractor'] \
+        == {'hits': 0, 'misses': 0}
+
+
+def test_declared_charset_is_used_to_decode_the_page():
+    html = '<html><head><title>Café crème</title></head>' \
+        '<body><p>Déjà vu</p></body></html>'
+
+    with LocalHttpServer() as server:
+        server.add_response(
+            '/page', html.encode('cp1252'),
+            headers={'Content-Type': 'text/html; charset=windows-1252'})
+        _extractor = extractor.Extractor(server.get_url('/page'))
+
+        content_list = _extractor.extract_html().content_list
+
+    assert content_list[0].text_string == 'Café crème'
+    assert content_list[1].text_string == 'Déjà vu'
+    assert _extractor.fetch_result.charset == 'windows-1252'
+
+
+def test_missing_image_sizes_are_probed():
+    image_body = io.BytesIO()
+    Image.new('RGB', (300, 200)).save(image_body, format='PNG')
+
+    with LocalHttpServer() as server:
+        server.add_response('/image.png', image_body.getvalue())
+        html = '<html><head><title>Title</title></head><body>' \
+            '<img src="{0}" width="100%" height="auto">' \
+            '<img src="{0}?v=2" width="30px" height="20px">' \
+            '</body></html>'.format(server.get_url('/image.png'))
+        server.add_response('/page', html.encode('utf-8'),
+                            headers={'Content-Type': 'text/html'})
+        _extractor = extractor.Extractor(server.get_url('/page'))
+
+        content_list = _extractor.extract_html().content_list
+
+    assert (content_list[1].img_width, content_list[1].img_height) \
+        == (300, 200)
+    # sizes given in the markup are not probed
+    assert (content_list[2].img_width, content_list[2].img_height) \
+        == (30, 20)
@@ -0,0 +1,82 @@
+"""
+    This script is for unit testing of the fetch cache
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+from extraction.fetch_cache import FetchCache, parse_cache_control
+from extraction.fetcher import HtmlFetcher
+from tests.test_extraction.local_http_server import LocalHttpServer
+
+__HTML = b'<html><head><title>Title</title></head><body></body></html>'
+
+
+def test_cache_control_is_parsed():
+    assert parse_cache_control('public, max-age=60, no-cache') \
+        == {'public': '', 'max-age': '60', 'no-cache': ''}
+    assert parse_cache_control(None) == {}
+
+
+def test_fresh_page_is_served_without_request(tmp_path):
+    fetcher = HtmlFetcher(fetch_cache=FetchCache(str(tmp_path)))
+
+    with LocalHttpServer() as server:
+        server.add_response('/page', __HTML,
+                            headers={'Cache-Control': 'max-age=600'})
+        url = server.get_url('/page')
+
+        first_result = fetcher.fetch(url)
+        second_result = fetcher.fetch(url)
+
+        assert len(server.requests) == 1
+
+    assert first_result.cache_status == 'miss'
+    assert second_result.cache_status == 'hit'
+    assert second_result.body == __HTML
+
+
+def test_stale_page_is_revalidated_with_etag(tmp_path):
+    fetcher = HtmlFetcher(fetch_cache=FetchCache(str(tmp_path)))
+
+    with LocalHttpServer() as server:
+        server.add_response('/page', __HTML,
+                            headers={'ETag': '"v1"',
+                                     'Cache-Control': 'no-cache',
+                                     'Content-Type': 'text/html; '
+                                                     'charset=utf-8'})
+        url = server.get_url('/page')
+
+        fetcher.fetch(url)
+        fetch_result = fetcher.fetch(url)
+
+        assert server.requests[1][1]['If-None-Match'] == '"v1"'
+
+    assert fetch_result.cache_status == 'revalidated'
+    assert fetch_result.body == __HTML
+    assert fetch_result.charset == 'utf-8'
+
+
+def test_no_store_page_is_not_cached(tmp_path):
+    fetch_cache = FetchCache(str(tmp_path))
+
+    assert not fetch_cache.put('http://a.com', __HTML, None,
+                               {'ETag': '"v1"', 'Cache-Control': 'no-store'})
+    assert not fetch_cache.put('http://b.com', __HTML, None, {})
+    assert fetch_cache.get('http://a.com') is None
+    assert fetch_cache.get('http://b.com') is None
+
+
+def test_least_recently_used_page_is_evicted(tmp_path):
+    fetch_cache = FetchCache(str(tmp_path), max_size=2 * len(__HTML))
+    headers = {'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+
+    fetch_cache.put('http://a.com', __HTML, None, headers)
+    fetch_cache.put('http://b.com', __HTML, None, headers)
+    # reading a page marks it as recently used
+    fetch_cache.get('http://a.com')
+    fetch_cache.put('http://c.com', __HTML, None, headers)
+
+    assert fetch_cache.get('http://b.com') is None
+    assert fetch_cache.get('http://a.com').body == __HTML
+    assert fetch_cache.get('http://c.com').last_modified \
+        == headers['Last-Modified']
+    assert fetch_cache.get_size() == 2 * len(__HTML)
@@ -0,0 +1,98 @@
+"""
+    This script is for unit testing of the html fetcher
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import gzip
+import time
+
+import pytest
+
+from error.stampifier_error import (WebsiteConnectionError,
+                                    WebsiteTimeoutError,
+                                    WebsiteTooLargeError)
+from extraction.fetcher import HtmlFetcher
+from tests.test_extraction.local_http_server import LocalHttpServer
+
+__HTML = '<html><head><title>Café</title></head><body></body></html>'
+
+
+def test_body_and_declared_charset_are_returned():
+    with LocalHttpServer() as server:
+        server.add_response(
+            '/page', __HTML.encode('latin-1'),
+            headers={'Content-Type': 'text/html; charset="ISO-8859-1"'})
+
+        fetch_result = HtmlFetcher().fetch(server.get_url('/page'))
+
+    assert fetch_result.status_code == 200
+    assert fetch_result.charset == 'iso-8859-1'
+    assert fetch_result.body.decode(fetch_result.charset) == __HTML
+    assert fetch_result.get_metrics()['body_size'] \
+        == len(__HTML.encode('latin-1'))
+
+
+def test_charset_is_none_when_not_declared():
+    assert HtmlFetcher.get_declared_charset(
+        {'Content-Type': 'text/html'}) is None
+    assert HtmlFetcher.get_declared_charset({}) is None
+
+
+def test_gzip_encoded_body_is_decoded():
+    with LocalHttpServer() as server:
+        server.add_response(
+            '/page', gzip.compress(__HTML.encode('utf-8')),
+            headers={'Content-Type': 'text/html; charset=utf-8',
+                     'Content-Encoding': 'gzip'})
+
+        fetch_result = HtmlFetcher().fetch(server.get_url('/page'))
+
+        accept_encoding = server.requests[0][1]['Accept-Encoding']
+
+    assert fetch_result.body == __HTML.encode('utf-8')
+    assert 'gzip' in accept_encoding
+
+
+def test_body_larger_than_limit_is_rejected():
+    with LocalHttpServer() as server:
+        server.add_response('/declared', b'x' * 1024)
+        # without a Content-Length the limit is enforced while streaming
+        server.add_response('/streamed', b'x' * 1024,
+                            headers={'Content-Length': None})
+        fetcher = HtmlFetcher(max_body_size=512)
+
+        with pytest.raises(WebsiteTooLargeError):
+            fetcher.fetch(server.get_url('/declared'))
+        with pytest.raises(WebsiteTooLargeError):
+            fetcher.fetch(server.get_url('/streamed'))
+
+
+def test_slow_website_times_out():
+    with LocalHttpServer() as server:
+        server.add_response('/slow', b'<html></html>', delay=1)
+
+        with pytest.raises(WebsiteTimeoutError):
+            HtmlFetcher(read_timeout=0.2).fetch(server.get_url('/slow'))
+
+
+def test_slowly_dripped_body_times_out():
+    with LocalHttpServer() as server:
+        # every byte arrives well within the read timeout
+        server.add_response('/drip', b'<html></html>' * 4, drip_delay=0.4)
+        fetcher = HtmlFetcher(read_timeout=2, max_fetch_time=1.0)
+
+        start_time = time.perf_counter()
+        with pytest.raises(WebsiteTimeoutError):
+            fetcher.fetch(server.get_url('/drip'))
+        assert time.perf_counter() - start_time < 1.5
+
+
+def test_unreachable_url_raises_connection_error():
+    with pytest.raises(WebsiteConnectionError):
+        HtmlFetcher().fetch('www.google.com')
+
+    with LocalHttpServer() as server:
+        url = server.get_url('/page')
+
+    with pytest.raises(WebsiteConnectionError):
+        HtmlFetcher().fetch(url)
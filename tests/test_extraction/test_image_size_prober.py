@@ -0,0 +1,91 @@
+"""
+    This script is for unit testing of image_size_prober
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import io
+import time
+
+import pytest
+from PIL import Image
+
+from extraction.image_size_prober import ImageSizeProber, get_image_size
+from tests.test_extraction.local_http_server import LocalHttpServer
+from utils.persistent_cache import PersistentCache
+
+
+def get_image_body(image_format, size, **save_options):
+    body = io.BytesIO()
+    Image.new('RGB', size, (255, 0, 0)).save(
+        body, format=image_format, **save_options)
+    return body.getvalue()
+
+
+@pytest.mark.parametrize('image_format, save_options', [
+    ('PNG', {}),
+    ('GIF', {}),
+    ('JPEG', {}),
+    ('JPEG', {'progressive': True, 'exif': b'Exif\x00\x00' + b'\x00' * 2000}),
+    ('WEBP', {}),
+    ('WEBP', {'lossless': True})])
+def test_size_is_read_from_the_header(image_format, save_options):
+    body = get_image_body(image_format, (321, 123), **save_options)
+
+    assert get_image_size(body[:2048 + 200]) == (321, 123)
+
+
+def test_unknown_or_truncated_headers_have_no_size():
+    assert get_image_size(b'<svg xmlns="http://www.w3.org/2000/svg"/>') \
+        is None
+    assert get_image_size(get_image_body('PNG', (10, 10))[:20]) is None
+
+
+def get_prober(tmp_path, **kwargs):
+    database_path = str(tmp_path / 'cache.sqlite3')
+    return ImageSizeProber(
+        size_cache=PersistentCache('sizes', ttl=60, max_entries=10,
+                                   database_path=database_path),
+        size_error_cache=PersistentCache('errors', ttl=60, max_entries=10,
+                                         database_path=database_path),
+        **kwargs)
+
+
+def test_images_are_probed_once(tmp_path):
+    prober = get_prober(tmp_path, probe_size=1024)
+
+    with LocalHttpServer() as server:
+        server.add_response('/image.jpg', get_image_body('JPEG', (640, 480)))
+        server.add_response('/not-an-image', b'x' * 4096)
+        image_urls = [server.get_url('/image.jpg'),
+                      server.get_url('/not-an-image'),
+                      server.get_url('/missing.png'),
+                      'data:image/png;base64,AAAA']
+
+        expected_sizes = {image_urls[0]: (640, 480),
+                          image_urls[1]: (0, 0),
+                          image_urls[2]: (0, 0),
+                          image_urls[3]: (0, 0)}
+        assert prober.get_image_sizes(image_urls) == expected_sizes
+        assert prober.get_image_sizes(image_urls) == expected_sizes
+
+        assert len(server.requests) == 3
+        assert all(headers['Range'] == 'bytes=0-1023'
+                   for _, headers in server.requests)
+
+
+def test_slow_images_have_an_unknown_size_which_is_not_cached(tmp_path):
+    prober = get_prober(tmp_path, max_probe_time=0.5)
+
+    with LocalHttpServer() as server:
+        body = get_image_body('PNG', (640, 480))
+        server.add_response('/slow.png', body, delay=1.5)
+        image_url = server.get_url('/slow.png')
+
+        start_time = time.perf_counter()
+        assert prober.get_image_sizes([image_url]) == {image_url: (0, 0)}
+        assert time.perf_counter() - start_time < 1
+
+        # the size is probed again, in time now
+        server.add_response('/slow.png', body)
+        assert prober.get_image_sizes([image_url]) \
+            == {image_url: (640, 480)}
@@ -3,6 +3,9 @@
     Use pytest to run this script
     Command to run: /stampify$ python -m pytest
 """
+from unittest.mock import patch
+
+import bs4
 import pytest
 
 from data_models.text import Text
@@ -47,6 +50,31 @@ def test_tag_should_return_none(input_node, expected):
     assert actual_text_content is expected
 
 
+def test_text_of_nested_empty_tags_is_computed_once():
+    soup = bs4.BeautifulSoup(
+        '<p class="outer"> <span> <span> <b> </b> </span> </span> </p>',
+        'lxml')
+    text_extractor = TextExtractor()
+    get_text = bs4.element.Tag.get_text
+
+    with patch.object(bs4.element.Tag, 'get_text', autospec=True,
+                      side_effect=get_text) as mocked_get_text:
+        # nodes are offered in the order of the DFS
+        for node in [soup.find('p')] + soup.find('p').find_all(True):
+            assert text_extractor.validate_and_extract(node) is None
+
+    assert mocked_get_text.call_count == 1
+
+
+def test_non_text_tag_builds_no_text():
+    soup = bs4.BeautifulSoup('<div><p>Some text</p></div>', 'lxml')
+
+    with patch.object(bs4.element.Tag, 'get_text') as mocked_get_text:
+        assert TextExtractor().validate_and_extract(soup.find('div')) is None
+
+    mocked_get_text.assert_not_called()
+
+
 def __assert_text(actual_text, expected_text):
     """This is custom assert to compare actual and
        expected text content"""
@@ -17,9 +17,9 @@ __soup = test_utils.soup('video.html')
 expected_output_1 = Video(['http://www.google.com/video1.mp4'], 100, 100)
 
 expected_output_2 = Video(['http://www.google.com/movie1.mp4',
-                           'http://www.google.com/movie1.ogg'], 320, 240)
+                           'http://www.google.com/movie1.ogg'], 240, 320)
 
-expected_output_3 = Video(['http://www.google.com/movie1.mp4'], 320, 240)
+expected_output_3 = Video(['http://www.google.com/movie1.mp4'], 240, 320)
 
 expected_output_4 = Video(['http://www.google.com/embed_video1.mp4'], 0, 0)
 
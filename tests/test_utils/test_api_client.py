@@ -0,0 +1,81 @@
+"""
+    This script is for unit testing of the api client
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from error.stampifier_error import ApiUnavailableError, BadRequestError
+from utils.api_client import ApiClient, CircuitBreaker
+
+
+def _get_client(responses, failure_threshold=5):
+    session = Mock()
+    session.post.side_effect = responses
+    session_pool = Mock()
+    session_pool.get_session.return_value = session
+    return ApiClient('test', session_pool=session_pool,
+                     circuit_breaker=CircuitBreaker(failure_threshold, 30))
+
+
+def _response(status_code):
+    return Mock(status_code=status_code, headers={})
+
+
+@patch('utils.api_client.time.sleep')
+def test_server_errors_are_retried(mocked_sleep):
+    client = _get_client([_response(503), RequestsConnectionError(),
+                          _response(200)])
+
+    assert client.post('url', data='{}').status_code == 200
+    assert mocked_sleep.call_count == 2
+    assert client.metrics.as_dict()['retries'] == 2
+    assert client.metrics.as_dict()['errors'] == 0
+
+
+@patch('utils.api_client.time.sleep')
+def test_client_errors_are_not_retried(mocked_sleep):
+    client = _get_client([_response(400)])
+
+    with pytest.raises(BadRequestError):
+        client.post('url', data='{}')
+    assert mocked_sleep.call_count == 0
+    assert client.metrics.as_dict()['errors'] == 1
+
+
+@patch('utils.api_client.time.sleep')
+def test_failing_api_is_short_circuited(mocked_sleep):
+    client = _get_client([_response(500)] * 8, failure_threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(ApiUnavailableError):
+            client.post('url', data='{}')
+
+    with pytest.raises(ApiUnavailableError) as error:
+        client.post('url', data='{}')
+
+    assert 'circuit is open' in error.value.message
+    assert client.session_pool.get_session().post.call_count == 8
+    assert client.metrics.as_dict()['short_circuits'] == 1
+
+
+@patch('utils.api_client.time.monotonic')
+def test_unexpected_error_of_trial_call_reopens_circuit(mocked_monotonic):
+    mocked_monotonic.return_value = 0
+    client = _get_client([ValueError('bad url'), _response(200)],
+                         failure_threshold=1)
+    client.circuit_breaker.record_failure()
+
+    # the circuit is half-open for the trial call
+    mocked_monotonic.return_value = 30
+    with pytest.raises(ValueError):
+        client.post('url', data='{}')
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+    assert client.metrics.as_dict()['errors'] == 1
+
+    mocked_monotonic.return_value = 60
+    assert client.post('url', data='{}').status_code == 200
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
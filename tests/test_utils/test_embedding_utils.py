@@ -0,0 +1,29 @@
+"""
+    This script is for unit testing of the embedding utilities
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import numpy as np
+
+from utils.embedding_utils import get_normalized_embedding_matrix
+
+
+def test_embeddings_are_normalized_rows_of_a_float32_matrix():
+    matrix = get_normalized_embedding_matrix(
+        [[3.0, 4.0], np.array([0.0, 2.0])])
+
+    assert matrix.dtype == np.float32
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert np.allclose(matrix, [[0.6, 0.8], [0.0, 1.0]])
+
+
+def test_missing_and_zero_embeddings_are_rows_of_zeros():
+    matrix = get_normalized_embedding_matrix([None, [0.0, 0.0], [1.0, 0.0]])
+
+    assert np.array_equal(matrix, [[0, 0], [0, 0], [1, 0]])
+
+
+def test_dimension_is_used_when_no_embedding_gives_it():
+    assert get_normalized_embedding_matrix([None], 4).shape == (1, 4)
+    assert get_normalized_embedding_matrix([], 4).shape == (0, 4)
+    assert get_normalized_embedding_matrix([[1.0, 0.0]], 4).shape == (1, 2)
@@ -0,0 +1,37 @@
+"""
+    This script is for unit testing of the LRU cache
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+from unittest.mock import patch
+
+from utils.lru_cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.get_stats() \
+        == {'hits': 3, 'misses': 1, 'evictions': 1, 'size': 2}
+
+
+@patch('utils.lru_cache.time.monotonic')
+def test_expired_entry_is_missing(mocked_monotonic):
+    cache = LRUCache(2, ttl=60)
+
+    mocked_monotonic.return_value = 100
+    cache.put('a', 1)
+    mocked_monotonic.return_value = 159
+    assert cache.get('a') == 1
+    mocked_monotonic.return_value = 160
+
+    assert cache.get('a', 'default') == 'default'
+    assert len(cache) == 0
@@ -0,0 +1,47 @@
+"""
+    This script is for unit testing of the persistent cache
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+from unittest.mock import patch
+
+from utils.persistent_cache import PersistentCache
+
+
+def _get_cache(tmp_path, namespace='test', ttl=60, max_entries=10):
+    return PersistentCache(namespace, ttl, max_entries,
+                           database_path=str(tmp_path / 'cache.sqlite3'))
+
+
+def test_values_are_shared_between_instances(tmp_path):
+    _get_cache(tmp_path).put_many({'a': {'colors': [(1, 2, 3)]}, 'b': 2})
+
+    cache = _get_cache(tmp_path)
+
+    assert cache.get_many(['a', 'b', 'c']) \
+        == {'a': {'colors': [[1, 2, 3]]}, 'b': 2}
+    assert _get_cache(tmp_path, namespace='other').get('a') is None
+    assert cache.get_stats() \
+        == {'hits': 2, 'misses': 1, 'stores': 0, 'evictions': 0}
+
+
+@patch('utils.persistent_cache.time.time')
+def test_expired_and_least_recently_used_entries_are_evicted(
+        mocked_time, tmp_path):
+    cache = _get_cache(tmp_path, ttl=60, max_entries=2)
+
+    mocked_time.return_value = 100
+    cache.put('a', 1)
+    mocked_time.return_value = 101
+    cache.put('b', 2)
+    mocked_time.return_value = 102
+    assert cache.get('a') == 1
+    mocked_time.return_value = 103
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get_many(['a', 'c']) == {'a': 1, 'c': 3}
+
+    mocked_time.return_value = 163
+    assert cache.get('c') is None
+    assert cache.get_stats()['evictions'] == 1
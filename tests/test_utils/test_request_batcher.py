@@ -0,0 +1,48 @@
+"""
+    This script is for unit testing of the request batcher
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+import pytest
+
+from utils.request_batcher import RequestBatcher
+
+
+def test_concurrent_items_are_merged_and_deduplicated():
+    batches = []
+
+    def process_batch(group, items):
+        batches.append((group, list(items)))
+        return ['{}:{}'.format(group, item) for item in items]
+
+    batcher = RequestBatcher(process_batch, max_batch_size=3, max_wait=0.2)
+
+    futures = [batcher.submit(1, item) for item in ['a', 'b', 'a']]
+    futures.append(batcher.submit(2, 'a'))
+
+    assert [future.result(5) for future in futures] \
+        == ['1:a', '1:b', '1:a', '2:a']
+    assert futures[0] is futures[2]
+    assert sorted(batches) == [(1, ['a', 'b']), (2, ['a'])]
+
+
+def test_full_batch_is_processed_without_waiting():
+    batcher = RequestBatcher(lambda group, items: items,
+                             max_batch_size=2, max_wait=60)
+
+    futures = [batcher.submit(None, item) for item in range(2)]
+
+    assert [future.result(5) for future in futures] == [0, 1]
+
+
+def test_error_is_set_on_every_future_of_the_batch():
+    def process_batch(group, items):
+        raise ValueError('api failed')
+
+    batcher = RequestBatcher(process_batch, max_batch_size=4, max_wait=0.01)
+
+    futures = [batcher.submit(None, item) for item in range(2)]
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(5)
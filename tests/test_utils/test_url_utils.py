@@ -0,0 +1,15 @@
+"""
+    This script is for unit testing of the url utilities
+    Use pytest to run this script
+    Command to run: /stampify$ python -m pytest
+"""
+from utils.url_utils import normalize_url
+
+
+def test_equivalent_urls_are_normalized_alike():
+    assert normalize_url('HTTPS://Img.CDN.com:443/a.jpg?w=2&h=1#top') \
+        == normalize_url('https://img.cdn.com/a.jpg?h=1&w=2') \
+        == 'https://img.cdn.com/a.jpg?h=1&w=2'
+    assert normalize_url('//img.cdn.com') == 'http://img.cdn.com/'
+    assert normalize_url('http://img.cdn.com:8080/a.jpg') \
+        == 'http://img.cdn.com:8080/a.jpg'
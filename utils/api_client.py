@@ -0,0 +1,266 @@
+"""This script provides the client used to call the Google Cloud APIs
+
+Every API gets one ApiClient shared by the whole process, which
+    * reuses keep-alive connections from a pool of sessions
+    * bounds every call with a timeout and an overall deadline
+    * retries 429 and 5xx responses and connection failures with
+        jittered exponential backoff
+    * stops calling an API that keeps failing (circuit breaker)
+    * records latency and error metrics for every API"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+from requests.exceptions import RequestException
+
+from error.stampifier_error import ApiUnavailableError, BadRequestError
+from utils.http_session import SessionPool
+
+LOGGER = logging.getLogger(__name__)
+
+API_SESSIONS = SessionPool(pool_connections=4, pool_maxsize=16)
+
+RETRYABLE_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+
+def get_api_url(endpoint_variable, default_endpoint, api_key):
+    """Returns the url to call with the api key, the endpoint is
+    read from the environment variable if it is set (for eg. to
+    point at the local stand-in of benchmarks.api_stand_in)"""
+
+    endpoint = os.environ.get(endpoint_variable) or default_endpoint
+    return '{}?key={}'.format(endpoint, api_key)
+
+
+class CircuitBreaker:
+    """This class stops calls to an API after failure_threshold
+    consecutive failures. After reset_timeout seconds a single trial
+    call is let through, its result closes or reopens the circuit."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failure_count = 0
+        self._opened_at = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Returns True if a call may be made now"""
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and \
+                    time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Closes the circuit"""
+
+        with self._lock:
+            self.state = self.CLOSED
+            self._failure_count = 0
+
+    def record_failure(self):
+        """Counts the failure, opening the circuit if needed"""
+
+        with self._lock:
+            self._failure_count += 1
+            if self.state == self.HALF_OPEN \
+                    or self._failure_count >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ApiMetrics:
+    """This class counts the calls made to an API and their latency"""
+
+    # weight of the latest call in the recent latency
+    RECENT_LATENCY_WEIGHT = 0.2
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.short_circuits = 0
+        self.total_latency = 0
+        self.max_latency = 0
+        # exponentially weighted moving average of the latency
+        self.recent_latency = None
+        self._lock = threading.Lock()
+
+    def record_call(self, latency, is_error):
+        """Records one finished call, including its retries"""
+
+        with self._lock:
+            self.calls += 1
+            self.errors += int(is_error)
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            if self.recent_latency is None:
+                self.recent_latency = latency
+            else:
+                self.recent_latency += self.RECENT_LATENCY_WEIGHT \
+                    * (latency - self.recent_latency)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_short_circuit(self):
+        with self._lock:
+            self.short_circuits += 1
+
+    def as_dict(self):
+        """Returns the metrics as a dict"""
+
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'retries': self.retries,
+                'short_circuits': self.short_circuits,
+                'mean_latency': self.total_latency / self.calls
+                if self.calls else 0,
+                'max_latency': self.max_latency,
+                'recent_latency': self.recent_latency
+            }
+
+
+class ApiClient:
+    """This class makes the POST requests to one API"""
+
+    # every created client, to export the metrics of all the apis
+    CLIENTS = dict()
+
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 10
+    DEADLINE = 20
+    MAX_RETRIES = 3
+    BACKOFF_BASE = 0.25
+    BACKOFF_CAP = 4
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+
+    def __init__(self, name,
+                 session_pool=API_SESSIONS,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 deadline=DEADLINE,
+                 max_retries=MAX_RETRIES,
+                 circuit_breaker=None):
+        self.name = name
+        self.session_pool = session_pool
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            self.FAILURE_THRESHOLD, self.RESET_TIMEOUT)
+        self.metrics = ApiMetrics()
+        ApiClient.CLIENTS[name] = self
+
+    def post(self, url, data):
+        """Returns the successful response to the POST request
+
+        Raises BadRequestError for a response which is not retried
+        (for eg. 400) and ApiUnavailableError when the api did not
+        succeed within the retries and the deadline or its circuit
+        is open"""
+
+        if not self.circuit_breaker.allow_request():
+            self.metrics.record_short_circuit()
+            raise ApiUnavailableError(self.name, 'circuit is open')
+
+        start_time = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                failure, response = self.__send(url, data, start_time)
+            except Exception:
+                # for eg. a ValueError for a malformed url, the
+                # trial call of a half-open circuit must not
+                # leave it half-open for ever
+                self.circuit_breaker.record_failure()
+                self.metrics.record_call(
+                    time.monotonic() - start_time, is_error=True)
+                raise
+
+            if failure is None:
+                self.circuit_breaker.record_success()
+                self.metrics.record_call(
+                    time.monotonic() - start_time, is_error=False)
+                return response
+
+            if failure == 'status' \
+                    and response.status_code not in RETRYABLE_STATUS_CODES:
+                # the api is up, the request itself is wrong
+                self.circuit_breaker.record_success()
+                self.metrics.record_call(
+                    time.monotonic() - start_time, is_error=True)
+                raise BadRequestError(response.status_code)
+
+            delay = self.__get_backoff_delay(attempt, response)
+            remaining_time = self.deadline - (time.monotonic() - start_time)
+            if attempt >= self.max_retries or delay >= remaining_time:
+                self.circuit_breaker.record_failure()
+                self.metrics.record_call(
+                    time.monotonic() - start_time, is_error=True)
+                if failure == 'status':
+                    failure = 'response code {}'.format(response.status_code)
+                raise ApiUnavailableError(self.name, failure)
+
+            LOGGER.debug('Retrying %s api in %.2fs after %s',
+                         self.name, delay, failure)
+            self.metrics.record_retry()
+            time.sleep(delay)
+            attempt += 1
+
+    def __send(self, url, data, start_time):
+        """Makes one attempt, returns (reason of failure, response)"""
+
+        remaining_time = max(
+            self.deadline - (time.monotonic() - start_time), 0.01)
+        connect_timeout, read_timeout = self.timeout
+        try:
+            response = self.session_pool.get_session().post(
+                url, data=data,
+                timeout=(min(connect_timeout, remaining_time),
+                         min(read_timeout, remaining_time)))
+        except RequestException as error:
+            return type(error).__name__, None
+
+        if response.status_code != 200:
+            return 'status', response
+        return None, response
+
+    def __get_backoff_delay(self, attempt, response):
+        """Returns the full jitter delay before the next attempt,
+        at least the Retry-After asked for by the api"""
+
+        delay = random.uniform(
+            0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** attempt))
+
+        retry_after = None
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+        if isinstance(retry_after, str) and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+
+        return delay
+
+
+def get_api_metrics():
+    """Returns the metrics of every api client by its name"""
+
+    return {name: dict(client.metrics.as_dict(),
+                       circuit=client.circuit_breaker.state)
+            for name, client in ApiClient.CLIENTS.items()}
@@ -0,0 +1,17 @@
+"""This script contains helper utilities for the on-disk caches"""
+
+import os
+import tempfile
+
+# directory under which every on-disk cache stores its files
+CACHE_DIR_VARIABLE = 'STAMPIFY_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'stampify_cache')
+
+
+def get_cache_dir(cache_name):
+    """Returns (and creates) the directory of the named cache"""
+
+    cache_dir = os.path.join(
+        os.environ.get(CACHE_DIR_VARIABLE) or DEFAULT_CACHE_DIR, cache_name)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
@@ -0,0 +1,27 @@
+"""This script contains helper utilities for the sentence embeddings"""
+
+import numpy as np
+
+
+def get_normalized_embedding_matrix(embeddings, dimension=None):
+    """Returns the embeddings as the rows of a contiguous float32
+    matrix of unit norm, so that cosine similarities are matmuls
+
+    Missing (None) embeddings and rows of zeros are left as rows of
+    zeros, which have a similarity of 0 with everything (like
+    cosine_similarity). dimension is only used when no embedding
+    gives it."""
+
+    embeddings = list(embeddings)
+    dimension = next((len(embedding) for embedding in embeddings
+                      if embedding is not None), dimension or 0)
+
+    matrix = np.zeros((len(embeddings), dimension), dtype=np.float32)
+    for row, embedding in enumerate(embeddings):
+        if embedding is not None:
+            matrix[row] = embedding
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+    return matrix
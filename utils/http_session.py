@@ -0,0 +1,51 @@
+"""This script provides pooled HTTP sessions, one per thread
+
+requests.Session is not thread-safe, so instead of one global
+session shared by all Flask/gunicorn threads, every thread gets
+its own session with keep-alive connection pools."""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# urllib3 only advertises (and decodes) brotli when
+# the brotli package is installed
+DEFAULT_HEADERS = {
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+
+
+class SessionPool:
+    """This class creates and stores a pooled session for every thread"""
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, headers=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self._thread_local = threading.local()
+
+    def get_session(self):
+        """Returns the session of the calling thread"""
+
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._create_session()
+            self._thread_local.session = session
+        return session
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.headers)
+        return session
+
+
+HTTP_SESSIONS = SessionPool()
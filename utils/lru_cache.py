@@ -0,0 +1,74 @@
+"""This script provides a thread-safe in-memory LRU cache
+    with an optional time to live for its entries"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """This class stores at most max_size entries, evicting the least
+    recently used one when full. Entries older than ttl seconds are
+    treated as missing. Hits, misses and evictions are counted."""
+
+    def __init__(self, max_size, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (value, time of insertion)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Returns the value for the key, default if it is
+        not cached or has expired"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.__has_expired(entry):
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Stores the value for the key"""
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry, the counters are kept"""
+
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """Returns the counters and the size of the cache as a dict"""
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries)
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __has_expired(self, entry):
+        return self.ttl is not None \
+            and time.monotonic() - entry[1] >= self.ttl
@@ -0,0 +1,192 @@
+"""This script provides a persistent key-value cache backed by SQLite
+
+The cache is shared by all the processes on the machine. Values are
+stored as JSON, so tuples are read back as lists. Any database error
+is logged and treated as a cache miss, the cache never fails a
+request."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from utils.cache_utils import get_cache_dir
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_NAME = 'persistent'
+DATABASE_NAME = 'cache.sqlite3'
+
+CREATE_TABLE_QUERY = '''
+    CREATE TABLE IF NOT EXISTS entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )'''
+CREATE_INDEX_QUERY = '''
+    CREATE INDEX IF NOT EXISTS entries_by_last_used
+    ON entries (namespace, last_used)'''
+
+# SQLite limits the number of variables in a query
+MAX_KEYS_PER_QUERY = 500
+
+
+class PersistentCache:
+    """This class stores JSON values for string keys in a namespace.
+
+    * entries older than ttl seconds are treated as missing
+    * once the namespace has more than max_entries entries
+        the least recently used ones are deleted
+    * hits, misses, stores and evictions are counted per process
+    """
+
+    def __init__(self, namespace, ttl, max_entries, database_path=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # resolved on first use so the cache
+        # directory can be configured after import
+        self._database_path = database_path
+        # sqlite connections cannot be shared between threads
+        self._thread_local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the value for the key, None if it is missing"""
+
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """Returns a dict with the values of the keys which are cached"""
+
+        keys = list(dict.fromkeys(keys))
+        values = dict()
+        now = time.time()
+
+        try:
+            connection = self.__get_connection()
+            for start in range(0, len(keys), MAX_KEYS_PER_QUERY):
+                batch = keys[start:start + MAX_KEYS_PER_QUERY]
+                rows = connection.execute(
+                    'SELECT key, value FROM entries WHERE namespace = ? '
+                    'AND expires_at > ? AND key IN ({})'.format(
+                        ', '.join('?' * len(batch))),
+                    [self.namespace, now] + batch).fetchall()
+                for key, value in rows:
+                    values[key] = json.loads(value)
+
+            if values:
+                with connection:
+                    connection.executemany(
+                        'UPDATE entries SET last_used = ? '
+                        'WHERE namespace = ? AND key = ?',
+                        [(now, self.namespace, key) for key in values])
+        except (sqlite3.Error, ValueError):
+            LOGGER.warning('Could not read from cache %s',
+                           self.namespace, exc_info=True)
+            values = dict()
+
+        with self._stats_lock:
+            self.hits += len(values)
+            self.misses += len(keys) - len(values)
+
+        return values
+
+    def put(self, key, value):
+        """Stores the value for the key"""
+
+        self.put_many({key: value})
+
+    def put_many(self, values):
+        """Stores the values of a dict mapping keys to values"""
+
+        if not values:
+            return
+
+        now = time.time()
+        try:
+            connection = self.__get_connection()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO entries '
+                    '(namespace, key, value, expires_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    [(self.namespace, key, json.dumps(value),
+                      now + self.ttl, now)
+                     for key, value in values.items()])
+                evicted_count = self.__evict(connection, now)
+        except (sqlite3.Error, TypeError, ValueError):
+            LOGGER.warning('Could not write to cache %s',
+                           self.namespace, exc_info=True)
+            return
+
+        with self._stats_lock:
+            self.stores += len(values)
+            self.evictions += evicted_count
+
+    def clear(self):
+        """Removes every entry of the namespace"""
+
+        try:
+            connection = self.__get_connection()
+            with connection:
+                connection.execute('DELETE FROM entries WHERE namespace = ?',
+                                   (self.namespace,))
+        except sqlite3.Error:
+            LOGGER.warning('Could not clear cache %s',
+                           self.namespace, exc_info=True)
+
+    def get_stats(self):
+        """Returns the counters of the cache as a dict"""
+
+        with self._stats_lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions
+            }
+
+    def __evict(self, connection, now):
+        """Deletes the expired entries and the least recently used
+        ones above max_entries, returns the count of deleted entries"""
+
+        deleted_count = connection.execute(
+            'DELETE FROM entries WHERE namespace = ? AND expires_at <= ?',
+            (self.namespace, now)).rowcount
+
+        entry_count = connection.execute(
+            'SELECT COUNT(*) FROM entries WHERE namespace = ?',
+            (self.namespace,)).fetchone()[0]
+        if entry_count > self.max_entries:
+            deleted_count += connection.execute(
+                'DELETE FROM entries WHERE rowid IN ('
+                'SELECT rowid FROM entries WHERE namespace = ? '
+                'ORDER BY last_used LIMIT ?)',
+                (self.namespace, entry_count - self.max_entries)).rowcount
+
+        return deleted_count
+
+    def __get_connection(self):
+        connection = getattr(self._thread_local, 'connection', None)
+        if connection is None:
+            if self._database_path is None:
+                self._database_path = os.path.join(
+                    get_cache_dir(CACHE_NAME), DATABASE_NAME)
+            connection = sqlite3.connect(self._database_path, timeout=5)
+            # readers do not block the writer of another process
+            connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                connection.execute(CREATE_TABLE_QUERY)
+                connection.execute(CREATE_INDEX_QUERY)
+            self._thread_local.connection = connection
+        return connection
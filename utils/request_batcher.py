@@ -0,0 +1,106 @@
+"""This script provides a batcher which merges the work submitted by
+    concurrent requests of the process into shared batches"""
+
+import concurrent.futures as cf
+import logging
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RequestBatcher:
+    """This class collects items submitted from any thread for up to
+    max_wait seconds and processes them together.
+
+    * items are grouped by a key, only items of the same group are
+        processed together (for eg. images with the same request options)
+    * a group is processed as soon as it has max_batch_size items
+    * an item which is already waiting or being processed is not
+        submitted again, the caller shares the pending future
+    * process_batch(group, items) returns the results in the order of
+        the items, its exception is set on the future of every item
+    """
+
+    def __init__(self, process_batch, max_batch_size, max_wait,
+                 max_workers=4, name='request-batcher'):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        # group -> items waiting to be processed, in submission order
+        self._waiting_items = dict()
+        # (group, item) -> future, for items waiting or being processed
+        self._pending_futures = dict()
+        self._first_wait_time = None
+        self._condition = threading.Condition()
+        self._executor = cf.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name)
+        self._dispatcher = None
+
+    def submit(self, group, item):
+        """Returns the future of the result for the item"""
+
+        with self._condition:
+            future = self._pending_futures.get((group, item))
+            if future is not None:
+                return future
+
+            future = cf.Future()
+            self._pending_futures[(group, item)] = future
+            self._waiting_items.setdefault(group, []).append(item)
+            if self._first_wait_time is None:
+                self._first_wait_time = time.monotonic()
+
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self.__dispatch, name=self.name, daemon=True)
+                self._dispatcher.start()
+            self._condition.notify()
+
+        return future
+
+    def __dispatch(self):
+        """Hands the batches to the executor once they are full
+        or the oldest waiting item has waited for max_wait"""
+
+        while True:
+            with self._condition:
+                while not self._waiting_items:
+                    self._condition.wait()
+
+                remaining_wait = self.max_wait \
+                    - (time.monotonic() - self._first_wait_time)
+                if remaining_wait > 0 and not any(
+                        len(items) >= self.max_batch_size
+                        for items in self._waiting_items.values()):
+                    self._condition.wait(remaining_wait)
+                    continue
+
+                waiting_items = self._waiting_items
+                self._waiting_items = dict()
+                self._first_wait_time = None
+
+            for group, items in waiting_items.items():
+                for start in range(0, len(items), self.max_batch_size):
+                    self._executor.submit(
+                        self.__process, group,
+                        items[start:start + self.max_batch_size])
+
+    def __process(self, group, items):
+        try:
+            results = self.process_batch(group, items)
+            error = None
+        except Exception as exception:  # pylint: disable=broad-except
+            results = None
+            error = exception
+
+        with self._condition:
+            futures = [self._pending_futures.pop((group, item))
+                       for item in items]
+
+        for index, future in enumerate(futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[index])
@@ -1,4 +1,6 @@
 """This script contains helper utilities for stampify"""
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 import validators
 
 
@@ -12,3 +14,34 @@ def valid_url(url):
         return url
 
     return None
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """Returns a canonical form of the URL for use as a cache key
+
+    The scheme and host are lowercased, default ports and the
+    fragment are dropped and the query parameters are sorted."""
+
+    if url.startswith('//'):
+        url = 'http:{}'.format(url)
+
+    parsed_url = urlsplit(url.strip())
+    scheme = parsed_url.scheme.lower()
+    netloc = (parsed_url.hostname or '').lower()
+
+    try:
+        port = parsed_url.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = '{}:{}'.format(netloc, port)
+    if parsed_url.username:
+        netloc = '@'.join((parsed_url.netloc.rsplit('@', 1)[0], netloc))
+
+    query = urlencode(sorted(parse_qsl(parsed_url.query,
+                                       keep_blank_values=True)))
+
+    return urlunsplit((scheme, netloc, parsed_url.path or '/', query, ''))